@@ -1,9 +1,20 @@
 # Standardní knihovny
 import os
+import re
 import sys
+import html
 import json
+import math
 import shutil
 import sqlite3
+import zipfile
+import unicodedata
+import threading
+import weakref
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, CancelledError, as_completed, wait as futures_wait
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict, deque
 from datetime import datetime
 from functools import lru_cache
 
@@ -13,23 +24,23 @@ import PyPDF2
 # PyQt5 importy
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QMessageBox, QLineEdit, QTextEdit, QFileDialog, QListWidgetItem, 
-    QTreeWidgetItem, QInputDialog, QGridLayout, QTreeWidget, QListWidget, 
+    QTreeWidgetItem, QTreeWidgetItemIterator, QInputDialog, QGridLayout, QTreeWidget, QListWidget, 
     QScrollArea, QCheckBox, QWidget, QHBoxLayout, QVBoxLayout, QLabel, 
     QPushButton, QDesktopWidget, QStackedWidget, QButtonGroup, QSlider, 
     QComboBox, QFrame, QDialog, QSpinBox, QSizePolicy, QProgressBar, QTabWidget, QGroupBox,
-    QAbstractItemView, QRadioButton
+    QAbstractItemView, QRadioButton, QDoubleSpinBox
 )
 from PyQt5.QtCore import (
-    Qt, QPoint, QRectF, QSize, QObject, pyqtSignal, QThread, QTimer
+    Qt, QPoint, QRectF, QSize, QObject, pyqtSignal, QThread, QTimer, QThreadPool, QRunnable
 )
 from PyQt5.QtGui import (
     QPainter, QColor, QPainterPath, QLinearGradient, QBrush, 
     QPixmap, QIcon, QPen, QFont, QPalette, QStandardItemModel, 
-    QStandardItem, QFontMetrics, QCursor
+    QStandardItem, QFontMetrics, QCursor, QImage
 )
 
 # Pomocné Qt moduly
-from PyQt5 import QtWidgets, QtGui, QtCore
+from PyQt5 import QtWidgets, QtGui, QtCore, sip
 
 QApplication.setAttribute(Qt.AA_EnableHighDpiScaling)  # Podpora DPI škálování
 QApplication.setAttribute(Qt.AA_UseStyleSheetPropagationInWidgetStyles)
@@ -1035,80 +1046,2669 @@ class StyleHelper:
             return input_field.text()
         return None
 
+class _FoldTable(dict):
+    """Převodní tabulka pro str.translate, znaky se doplňují při prvním výskytu"""
+    def __init__(self, lower):
+        super().__init__()
+        self.lower = lower
+
+    def __missing__(self, code):
+        char = chr(code)
+        base = unicodedata.normalize('NFD', char)[0]
+        if self.lower:
+            base = base.lower()
+        # Každý znak se převede právě na jeden znak
+        folded = base if len(base) == 1 else char
+        self[code] = folded
+        return folded
+
+_FOLD_TABLE = _FoldTable(lower=True)
+_STRIP_DIACRITICS_TABLE = _FoldTable(lower=False)
+
+def fold_text(text, lower=True):
+    """
+    Odstraní z textu diakritiku a převede ho na malá písmena ("Měření" -> "mereni").
+    Délka textu se nemění, pozice nálezu ve složeném textu tak platí i v původním.
+    """
+    if not text:
+        return ""
+    return text.translate(_FOLD_TABLE if lower else _STRIP_DIACRITICS_TABLE)
+
+def highlight_match(text, start, end, context_size=50):
+    """Vytvoří výňatek textu se zvýrazněným úsekem start:end"""
+    return highlight_matches(text, [(start, end)], context_size)
+
+def highlight_matches(text, spans, context_size=50, max_windows=1):
+    """
+    Vytvoří výňatek z nejvýše max_windows úseků kolem nálezů (spans jsou
+    dvojice start, end). Přednost mají úseky s nejvíce různými nálezy,
+    zvýrazní se všechny nálezy uvnitř vybraných úseků.
+    """
+    if not text or not spans:
+        return ""
+
+    windows = []
+    for start, end in spans:
+        window_start = max(0, start - context_size)
+        window_end = min(len(text), end + context_size)
+        distinct = {text[s:e].lower() for s, e in spans if s >= window_start and e <= window_end}
+        windows.append((len(distinct), window_start, window_end))
+    chosen = sorted(sorted(windows, key=lambda window: -window[0])[:max_windows],
+                    key=lambda window: window[1])
+
+    # Překrývající se úseky se spojí
+    merged = []
+    for _, window_start, window_end in chosen:
+        if merged and window_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], window_end)
+        else:
+            merged.append([window_start, window_end])
+
+    parts = []
+    for window_start, window_end in merged:
+        pieces = []
+        position = window_start
+        for start, end in spans:
+            if start >= position and end <= window_end:
+                pieces.append(text[position:start])
+                pieces.append(f"{SearchIndex.HIGHLIGHT_START}{text[start:end]}{SearchIndex.HIGHLIGHT_END}")
+                position = end
+        pieces.append(text[position:window_end])
+        parts.append("".join(pieces))
+
+    prefix = "..." if merged[0][0] > 0 else ""
+    suffix = "..." if merged[-1][1] < len(text) else ""
+    return prefix + " ... ".join(parts) + suffix
+
+class SharedConnection(sqlite3.Connection):
+    """Dlouhodobé připojení jednoho vlákna, počítá zapůjčené handly"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.users = 0
+        self.pid = os.getpid()
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+class ConnectionHandle:
+    """
+    Zapůjčené sdílené připojení, chová se jako sqlite3.Connection.
+    close() ho jen vrátí, neuložené změny se zahodí stejně jako při
+    skutečném zavření. Nevrácený handle se vrátí při uvolnění z paměti.
+    """
+    __slots__ = ('_conn',)
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            Database.release(self._conn)
+            self._conn = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+class Database:
+    """
+    Dlouhodobá připojení k SQLite databázím, jedno na vlákno a soubor.
+    Databáze běží v režimu WAL, čtení na pozadí tak neblokuje zápis
+    a zápis čeká na uvolnění zámku nejvýše BUSY_TIMEOUT milisekund.
+    """
+    BUSY_TIMEOUT = 5000
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        f"PRAGMA busy_timeout = {BUSY_TIMEOUT}",
+        "PRAGMA cache_size = -16000",       # 16 MB
+        "PRAGMA mmap_size = 268435456",     # 256 MB
+        "PRAGMA temp_store = MEMORY",
+    )
+
+    _local = threading.local()
+    # Všechna otevřená připojení kvůli close_all()
+    _connections = weakref.WeakSet()
+    _lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, db_path='publications.db'):
+        """Zapůjčí připojení aktuálního vlákna k databázi, při prvním použití ho otevře"""
+        if not hasattr(cls._local, 'connections'):
+            cls._local.connections = {}
+        key = os.path.abspath(db_path)
+        with cls._lock:
+            conn = cls._local.connections.get(key)
+            # Po fork() patří zděděné připojení rodičovskému procesu
+            if conn is None or conn.closed or conn.pid != os.getpid():
+                conn = sqlite3.connect(db_path, timeout=cls.BUSY_TIMEOUT / 1000,
+                                       check_same_thread=False, factory=SharedConnection)
+                for pragma in cls.PRAGMAS:
+                    conn.execute(pragma)
+                # LOWER() v SQLite zná jen ASCII, porovnává se složený text
+                conn.create_function("fold", 1, fold_text, deterministic=True)
+                cls._local.connections[key] = conn
+                cls._connections.add(conn)
+            conn.users += 1
+        return ConnectionHandle(conn)
+
+    @staticmethod
+    def attach(conn, db_path, alias):
+        """Připojí ke sdílenému připojení další databázi, pokud už připojená není"""
+        attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+        if alias not in attached:
+            conn.execute(f"ATTACH DATABASE ? AS {alias}", (db_path,))
+
+    @classmethod
+    def release(cls, conn):
+        """Vrátí zapůjčené připojení (volá ConnectionHandle.close)"""
+        with cls._lock:
+            if conn.closed:
+                return
+            conn.users = max(conn.users - 1, 0)
+            if conn.users == 0:
+                if conn.in_transaction:
+                    conn.rollback()
+
+    @classmethod
+    def close_all(cls):
+        """
+        Zavře všechna připojení před výměnou souborů databáze při importu
+        nebo obnově zálohy. Vlákna pracující s databází musí být předem
+        zastavena (MainWindow.suspend_background_work), zapůjčené připojení
+        je chyba a soubory se pak nesmí měnit.
+        """
+        with cls._lock:
+            busy = [conn for conn in cls._connections if not conn.closed and conn.users > 0]
+            if busy:
+                raise sqlite3.OperationalError(
+                    f"Databáze se stále používá ({len(busy)} otevřených připojení)"
+                )
+            for conn in list(cls._connections):
+                if not conn.closed:
+                    conn.close()
+
+    @classmethod
+    def snapshot(cls, db_path, target_path):
+        """
+        Zkopíruje databázi do samostatného souboru přes Connection.backup().
+        Kopie obsahuje i změny dosud uložené jen v souboru -wal a je
+        v režimu rollback žurnálu, takže nepotřebuje žádné další soubory.
+        """
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        source = sqlite3.connect(db_path, timeout=cls.BUSY_TIMEOUT / 1000)
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target)
+            target.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            target.close()
+            source.close()
+
+    @classmethod
+    def replace_file(cls, source_path, db_path):
+        """
+        Nahradí soubor databáze jiným (import, obnova zálohy). Připojení musí
+        být zavřená, zbylé soubory -wal a -shm se smažou, aby je SQLite
+        nepoužil s novým souborem.
+        """
+        for path in (db_path, f"{db_path}-wal", f"{db_path}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.copy2(source_path, db_path)
+
+class SchemaMigrations:
+    """
+    Verzované úpravy schématu databází. Číslo poslední provedené úpravy je
+    v PRAGMA user_version, každá úprava tak proběhne jen jednou a v jedné
+    transakci s novým číslem verze. Po úpravách se spustí ANALYZE, aby
+    plánovač dotazů znal nové indexy.
+    """
+    CATEGORY_TYPES = ('books', 'magazines', 'datasheets', 'others')
+
+    # Databáze, jejichž verze se v tomto procesu už ověřila
+    _checked = set()
+    _lock = threading.Lock()
+
+    @classmethod
+    def upgrade(cls, db_path, migrations):
+        """Provede na databázi úpravy (názvy metod) novější než její user_version"""
+        key = os.path.abspath(db_path)
+        if key in cls._checked:
+            return
+        with cls._lock:
+            if key in cls._checked:
+                return
+            conn = Database.connect(db_path)
+            cursor = conn.cursor()
+            try:
+                version = cursor.execute("PRAGMA user_version").fetchone()[0]
+                for target, name in enumerate(migrations, start=1):
+                    if target <= version:
+                        continue
+                    cursor.execute("BEGIN")
+                    getattr(cls, name)(cursor)
+                    cursor.execute(f"PRAGMA user_version = {target}")
+                    conn.commit()
+                    print(f"Databáze {db_path}: úprava schématu {target} ({name})")
+                if version < len(migrations):
+                    cursor.execute("ANALYZE")
+                    conn.commit()
+                cls._checked.add(key)
+            except sqlite3.Error as e:
+                print(f"Chyba při úpravě schématu databáze {db_path}: {e}")
+                conn.rollback()
+            finally:
+                conn.close()
+
+    @classmethod
+    def publications(cls, db_path='publications.db'):
+        cls.upgrade(db_path, cls.PUBLICATION_MIGRATIONS)
+
+    @classmethod
+    def categories(cls, db_path='categories.db'):
+        cls.upgrade(db_path, cls.CATEGORY_MIGRATIONS)
+
+    @classmethod
+    def upgrade_all(cls):
+        """Po výměně databází (import, obnova zálohy) ověří jejich verzi znovu"""
+        with cls._lock:
+            cls._checked.clear()
+        cls.publications()
+        cls.categories()
+
+    @staticmethod
+    def _columns(cursor, table):
+        cursor.execute(f"PRAGMA table_info({table})")
+        return [column[1] for column in cursor.fetchall()]
+
+    # Databáze publikací
+
+    @staticmethod
+    def _create_publications(cursor):
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS publications (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                author TEXT,
+                year INTEGER,
+                category_id INTEGER,
+                category_type TEXT
+            )
+        ''')
+
+    @staticmethod
+    def _add_descriptions(cursor):
+        # Popisy ze souborů description.txt se převedou do sloupce
+        if 'description' not in SchemaMigrations._columns(cursor, 'publications'):
+            cursor.execute("ALTER TABLE publications ADD COLUMN description TEXT")
+        DescriptionStore.convert_files(cursor)
+
+    @staticmethod
+    def _create_pdf_text_cache(cursor):
+        # Starší podoba tabulky stránek neměla vlastní ID potřebné pro fulltext,
+        # cache se proto jednoduše zahodí a naplní znovu
+        columns = SchemaMigrations._columns(cursor, 'pdf_text_pages')
+        if columns and 'id' not in columns:
+            cursor.execute("DROP TABLE pdf_text_pages")
+            cursor.execute("DROP TABLE IF EXISTS pdf_text_files")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pdf_text_files (
+                pub_id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                page_count INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pdf_text_pages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                pub_id INTEGER NOT NULL,
+                page_num INTEGER NOT NULL,
+                text TEXT,
+                folded TEXT,
+                UNIQUE (pub_id, page_num)
+            )
+        ''')
+        # Složený text (bez diakritiky, malými písmeny) se počítá jednou při uložení,
+        # starší záznamy se doplní
+        if 'folded' not in SchemaMigrations._columns(cursor, 'pdf_text_pages'):
+            cursor.execute("ALTER TABLE pdf_text_pages ADD COLUMN folded TEXT")
+            cursor.execute("SELECT id, text FROM pdf_text_pages")
+            cursor.executemany("UPDATE pdf_text_pages SET folded = ? WHERE id = ?",
+                               [(fold_text(text), page_id) for page_id, text in cursor.fetchall()])
+
+    @staticmethod
+    def _create_publication_files(cursor):
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS publication_files (
+                pub_id INTEGER PRIMARY KEY,
+                pdf_path TEXT,
+                pdf_size INTEGER,
+                pdf_mtime_ns INTEGER,
+                cover_path TEXT,
+                cover_size INTEGER,
+                cover_mtime_ns INTEGER,
+                description_path TEXT,
+                description_size INTEGER,
+                description_mtime_ns INTEGER
+            )
+        ''')
+
+    @staticmethod
+    def _index_publications(cursor):
+        # Výpis kategorie (id, title) i omezení vyhledávání na kategorii
+        # se obslouží jen z indexu, id je rowid a je v indexu vždy
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_publications_category
+            ON publications (category_type, category_id, title)
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_publications_year ON publications (year)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_publications_author ON publications (author)")
+
+    PUBLICATION_MIGRATIONS = (
+        '_create_publications',
+        '_add_descriptions',
+        '_create_pdf_text_cache',
+        '_create_publication_files',
+        '_index_publications',
+    )
+
+    # Databáze kategorií
+
+    @staticmethod
+    def _create_categories(cursor):
+        for category_type in SchemaMigrations.CATEGORY_TYPES:
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {category_type}_categories (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    parent_id INTEGER,
+                    FOREIGN KEY (parent_id) REFERENCES {category_type}_categories (id)
+                )
+            ''')
+
+    @staticmethod
+    def _add_sort_order(cursor):
+        for category_type in SchemaMigrations.CATEGORY_TYPES:
+            if 'sort_order' in SchemaMigrations._columns(cursor, f'{category_type}_categories'):
+                continue
+            cursor.execute(f"""
+                ALTER TABLE {category_type}_categories
+                ADD COLUMN sort_order INTEGER DEFAULT 0
+            """)
+            # Výchozí pořadí podle ID
+            cursor.execute(f"""
+                UPDATE {category_type}_categories
+                SET sort_order = (
+                    SELECT COUNT(*)
+                    FROM {category_type}_categories AS t2
+                    WHERE t2.id <= {category_type}_categories.id
+                )
+            """)
+
+    @staticmethod
+    def _index_categories(cursor):
+        for category_type in SchemaMigrations.CATEGORY_TYPES:
+            # Strom kategorií (id, name podle parent_id a sort_order) se čte jen z indexu
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_{category_type}_categories_tree
+                ON {category_type}_categories (parent_id, sort_order, name)
+            ''')
+            # Vyhledání kategorie podle jména
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_{category_type}_categories_name
+                ON {category_type}_categories (name, parent_id)
+            ''')
+
+    @staticmethod
+    def _spread_sort_order(cursor):
+        # Klíče pořadí s rozestupem, přesun mezi sousedy pak zapíše jediný řádek
+        for category_type in SchemaMigrations.CATEGORY_TYPES:
+            cursor.execute(f"""
+                SELECT id, parent_id FROM {category_type}_categories
+                ORDER BY parent_id, sort_order, id
+            """)
+            updates, position, previous_parent = [], 0, object()
+            for cat_id, parent_id in cursor.fetchall():
+                position = position + 1 if parent_id == previous_parent else 1
+                previous_parent = parent_id
+                updates.append((position * CategoryManager.ORDER_GAP, cat_id))
+            cursor.executemany(f"UPDATE {category_type}_categories SET sort_order = ? WHERE id = ?", updates)
+
+    @staticmethod
+    def _create_category_remap(cursor):
+        # Nedokončené přeřazení publikací po přesunu nebo smazání kategorií
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS category_remap (
+                old_type TEXT NOT NULL,
+                old_id INTEGER NOT NULL,
+                new_type TEXT NOT NULL,
+                new_id INTEGER,
+                PRIMARY KEY (old_type, old_id)
+            )
+        """)
+
+    CATEGORY_MIGRATIONS = (
+        '_create_categories',
+        '_add_sort_order',
+        '_index_categories',
+        '_spread_sort_order',
+        '_create_category_remap',
+    )
+
+class LazySnippet:
+    """
+    Nález v popisu nebo na stránce PDF (publikace, stránka, vzor nálezu).
+    Text se načte až pro odesílané výsledky (prefetch ve vlákně vyhledávání),
+    výňatek se podle aktuálního nastavení sestaví při zobrazení (str()).
+    """
+    __slots__ = ('source', 'pub_id', 'page', 'pattern', 'folded', 'db_path', '_text', '_rendered')
+
+    # Nastavení výňatků sdílené všemi výsledky (mění se v nastavení vyhledávání)
+    context_size = 50
+    max_windows = 1
+    # Víc nálezů v jednom textu se pro výběr úseků neprochází
+    MAX_SPANS = 50
+
+    def __init__(self, source, pub_id, pattern, page=None, folded=True, db_path='publications.db'):
+        self.source = source  # 'description' nebo 'pdf'
+        self.pub_id = pub_id
+        self.page = page
+        self.pattern = pattern
+        self.folded = folded  # Vzor se hledá ve složeném textu
+        self.db_path = db_path
+        self._text = None
+        self._rendered = None
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def terms_pattern(terms):
+        """Vzor pro složený text, který najde kterýkoli z termů"""
+        terms = sorted({term for term in terms if term}, key=len, reverse=True)
+        if not terms:
+            return None
+        return re.compile("|".join(re.escape(term) for term in terms))
+
+    @classmethod
+    def query_pattern(cls, query, alternatives=None):
+        """Vzor pro slova dotazu, s alternatives i pro podobná slova z tolerance překlepů"""
+        terms = [fold_text(term).replace('"', '') for term in query.split()]
+        for term in list(terms):
+            terms.extend((alternatives or {}).get(term, ()))
+        return cls.terms_pattern(tuple(terms))
+
+    @staticmethod
+    def prefetch(snippets):
+        """
+        Načte texty výňatků jedním připojením a sestaví je. Volá se mimo
+        vlákno GUI, zobrazení výsledků pak z databáze nečte.
+        """
+        by_db = {}
+        for snippet in snippets:
+            if snippet._text is None:
+                by_db.setdefault(snippet.db_path, []).append(snippet)
+        for db_path, pending in by_db.items():
+            conn = Database.connect(db_path)
+            try:
+                for snippet in pending:
+                    snippet._text = snippet._query_text(conn.cursor())
+            finally:
+                conn.close()
+        for snippet in snippets:
+            snippet.render()
+
+    def render(self):
+        """Sestaví výňatek podle aktuálního nastavení, výsledek si pamatuje"""
+        settings = (self.context_size, self.max_windows)
+        if self._rendered is None or self._rendered[0] != settings:
+            self._rendered = (settings, self._build())
+        return self._rendered[1]
+
+    def _build(self):
+        if self.pattern is None:
+            return ""
+        text, folded = self._load_text()
+        if not text:
+            return ""
+        haystack = (folded or fold_text(text)) if self.folded else text
+        spans = []
+        for match in self.pattern.finditer(haystack):
+            if match.end() > match.start():
+                spans.append(match.span())
+                if len(spans) >= self.MAX_SPANS:
+                    break
+        return highlight_matches(text, spans, self.context_size, self.max_windows)
+
+    def _load_text(self):
+        """Vrátí (text, složený text) zdroje nálezu, bez prefetch ho načte z databáze"""
+        if self._text is None:
+            conn = Database.connect(self.db_path)
+            try:
+                self._text = self._query_text(conn.cursor())
+            finally:
+                conn.close()
+        return self._text
+
+    def _query_text(self, cursor):
+        """Přečte (text, složený text) zdroje nálezu otevřeným kurzorem"""
+        if self.source == 'pdf':
+            cursor.execute(
+                "SELECT text, folded FROM pdf_text_pages WHERE pub_id = ? AND page_num = ?",
+                (self.pub_id, self.page)
+            )
+            return cursor.fetchone() or (None, None)
+        try:
+            cursor.execute(
+                "SELECT description, description_folded FROM publications_fts WHERE rowid = ?",
+                (self.pub_id,)
+            )
+            row = cursor.fetchone()
+            if row:
+                return row
+        except sqlite3.OperationalError:
+            # Bez FTS5 se popis čte přímo z tabulky publikací
+            pass
+        return SearchIndex.read_description(self.pub_id, self.db_path), None
+
+    def __str__(self):
+        return self.render()
+
+    def __repr__(self):
+        return f"LazySnippet({self.source!r}, {self.pub_id!r}, page={self.page!r})"
+
+def extract_pdf_pages(pdf_path):
+    """
+    Extrahuje text všech stránek PDF souboru.
+
+    Returns:
+        list: Text jednotlivých stránek, nebo None pokud soubor nelze otevřít
+    """
+    pages = []
+    try:
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for page_num in range(len(pdf_reader.pages)):
+                try:
+                    pages.append(pdf_reader.pages[page_num].extract_text() or "")
+                except Exception as e:
+                    print(f"Error extracting text from page {page_num + 1}: {e}")
+                    pages.append("")
+    except Exception as e:
+        print(f"Error opening PDF {pdf_path}: {e}")
+        return None
+    return pages
+
+def create_pdf_executor(max_workers, initializer=None):
+    """
+    Vytvoří pool procesů pro extrakci textu PDF. Procesy se spouštějí
+    metodou spawn - fork vícevláknové Qt aplikace může v potomkovi
+    uváznout na zámku, který v okamžiku forku drželo jiné vlákno.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=initializer
+    )
+
+def terminate_pdf_executor(executor):
+    """
+    Ukončí pool procesů bez čekání. Úlohy, které ještě nezačaly, se zruší
+    a procesy zpracovávající rozběhnuté úlohy se násilně ukončí.
+    """
+    # Seznam procesů je potřeba vzít před shutdown(), který ho uvolní
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+class PdfTextCache:
+    """
+    Trvalá cache textu stránek PDF uložená v databázi publikací.
+    Záznam platí, dokud se nezmění cesta, velikost ani čas úpravy souboru.
+    Nečitelný soubor se zaznamená bez stránek, znovu se zkusí až po změně.
+    """
+    # page_count záznamu souboru, který se nepodařilo otevřít
+    FAILED = -1
+
+    def __init__(self, db_path='publications.db'):
+        self.db_path = db_path
+        SchemaMigrations.publications(db_path)
+
+    @staticmethod
+    def _file_signature(pdf_path):
+        """Vrátí klíč souboru (cesta, velikost, mtime) nebo None"""
+        try:
+            stat = os.stat(pdf_path)
+        except OSError:
+            return None
+        path = os.path.normcase(os.path.abspath(pdf_path))
+        return path, stat.st_size, stat.st_mtime_ns
+
+    def is_cached(self, pub_id, pdf_path):
+        """Zjistí, zda je text PDF v cache a odpovídá souboru na disku"""
+        signature = self._file_signature(pdf_path)
+        if signature is None:
+            return False
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT path, size, mtime_ns FROM pdf_text_files WHERE pub_id = ?
+        """, (pub_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row is not None and tuple(row) == signature
+
+    def stale_files(self, pdf_files):
+        """Vrátí PDF soubory, jejichž text v cache chybí nebo je zastaralý"""
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT pub_id, path, size, mtime_ns FROM pdf_text_files")
+        cached = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+        conn.close()
+
+        stale = []
+        for pub_id, pdf_path in pdf_files:
+            # Velikost a čas úpravy z disku - soubor mohl být nahrazen mimo aplikaci
+            signature = self._file_signature(pdf_path)
+            if signature is not None and cached.get(pub_id) != signature:
+                stale.append((pub_id, pdf_path))
+        return stale
+
+    def get_pages(self, pub_id, pdf_path):
+        """
+        Vrátí text stránek PDF. Soubor se parsuje jen při první potřebě
+        nebo po jeho změně, jinak se text čte z databáze.
+        """
+        signature = self._file_signature(pdf_path)
+        if signature is None:
+            return []
+
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT path, size, mtime_ns FROM pdf_text_files WHERE pub_id = ?
+        """, (pub_id,))
+        row = cursor.fetchone()
+        if row is not None and tuple(row) == signature:
+            cursor.execute("""
+                SELECT text FROM pdf_text_pages
+                WHERE pub_id = ?
+                ORDER BY page_num
+            """, (pub_id,))
+            pages = [text or "" for (text,) in cursor.fetchall()]
+            conn.close()
+            return pages
+        conn.close()
+
+        print(f"Extracting text from PDF: {pdf_path}")
+        pages = extract_pdf_pages(pdf_path)
+        self.store_pages(pub_id, pdf_path, pages, signature)
+        return pages or []
+
+    def store_pages(self, pub_id, pdf_path, pages, signature=None):
+        """Uloží extrahovaný text stránek do cache (pages None = soubor nelze přečíst)"""
+        signature = signature or self._file_signature(pdf_path)
+        if signature is None:
+            return
+        path, size, mtime_ns = signature
+        page_count = len(pages) if pages is not None else self.FAILED
+        pages = pages or []
+
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM pdf_text_pages WHERE pub_id = ?", (pub_id,))
+            cursor.executemany("""
+                INSERT INTO pdf_text_pages (pub_id, page_num, text, folded)
+                VALUES (?, ?, ?, ?)
+            """, [(pub_id, page_num + 1, text, fold_text(text)) for page_num, text in enumerate(pages)])
+            cursor.execute("""
+                INSERT OR REPLACE INTO pdf_text_files (pub_id, path, size, mtime_ns, page_count)
+                VALUES (?, ?, ?, ?, ?)
+            """, (pub_id, path, size, mtime_ns, page_count))
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Chyba při ukládání textu PDF do cache: {e}")
+            conn.rollback()
+        finally:
+            conn.close()
+
+    def invalidate(self, pub_id):
+        """Odstraní uložený text PDF dané publikace"""
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM pdf_text_pages WHERE pub_id = ?", (pub_id,))
+        cursor.execute("DELETE FROM pdf_text_files WHERE pub_id = ?", (pub_id,))
+        conn.commit()
+        conn.close()
+
+class FileManifest:
+    """
+    Evidence souborů publikací (PDF, obálka, popis) v databázi publikací.
+    Dotaz na soubor se vyřizuje z paměti bez přístupu na disk, aktuálnost
+    udržují úpravy publikací a kontrola složky publications přes os.scandir.
+    """
+    KINDS = ('pdf', 'cover', 'description')
+
+    # Sdílená mapa pub_id -> {druh: (cesta, velikost, mtime_ns)} pro celý proces
+    _entries = None
+    _lock = threading.Lock()
+    # První načtení proběhne jen jednou, ostatní vlákna na něj počkají
+    _load_lock = threading.Lock()
+
+    def __init__(self, db_path='publications.db', base_dir='publications'):
+        self.db_path = db_path
+        self.base_dir = base_dir
+        if FileManifest._entries is None:
+            with FileManifest._load_lock:
+                if FileManifest._entries is None:
+                    SchemaMigrations.publications(db_path)
+                    self._load()
+
+    def _load(self):
+        """Načte evidenci z databáze, při prázdné tabulce projde složku publikací"""
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM publication_files")
+        rows = cursor.fetchall()
+        conn.close()
+
+        entries = {}
+        for row in rows:
+            entries[row[0]] = {
+                kind: (row[1 + i * 3], row[2 + i * 3], row[3 + i * 3]) if row[1 + i * 3] else None
+                for i, kind in enumerate(self.KINDS)
+            }
+        with FileManifest._lock:
+            FileManifest._entries = entries
+
+        if not entries:
+            self.reconcile()
+
+    @staticmethod
+    def _file_kind(name):
+        """Druh souboru publikace podle názvu, nebo None"""
+        name = name.lower()
+        if name.endswith('.pdf'):
+            return 'pdf'
+        if name.startswith('cover'):
+            return 'cover'
+        if name == 'description.txt':
+            return 'description'
+        return None
+
+    @classmethod
+    def list_files(cls, pub_dir, kind):
+        """Vrátí cesty všech souborů daného druhu ve složce publikace (přímo z disku)"""
+        try:
+            with os.scandir(pub_dir) as entries:
+                return [os.path.join(pub_dir, entry.name) for entry in entries
+                        if entry.is_file() and cls._file_kind(entry.name) == kind]
+        except OSError:
+            return []
+
+    @classmethod
+    def _scan_directory(cls, pub_dir):
+        """Projde složku jedné publikace a vrátí její soubory podle druhu"""
+        found = {kind: None for kind in cls.KINDS}
+        try:
+            with os.scandir(pub_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    kind = cls._file_kind(entry.name)
+                    if kind is None:
+                        continue
+                    if found[kind] is None:
+                        stat = entry.stat()
+                        found[kind] = (os.path.join(pub_dir, entry.name), stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            pass
+        return found
+
+    def _write_entries(self, cursor, changed, removed):
+        """Zapíše změněné a odstraněné záznamy do databáze"""
+        for pub_id, files in changed.items():
+            values = [pub_id]
+            for kind in self.KINDS:
+                values.extend(files[kind] or (None, None, None))
+            cursor.execute('''
+                INSERT OR REPLACE INTO publication_files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', values)
+        for pub_id in removed:
+            cursor.execute("DELETE FROM publication_files WHERE pub_id = ?", (pub_id,))
+
+    def update_publication(self, pub_id):
+        """Aktualizuje evidenci souborů jedné publikace po jejich změně"""
+        pub_dir = f"{self.base_dir}/{pub_id}"
+        files = self._scan_directory(pub_dir)
+        exists = os.path.isdir(pub_dir)
+
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        try:
+            if exists:
+                self._write_entries(cursor, {pub_id: files}, [])
+            else:
+                self._write_entries(cursor, {}, [pub_id])
+            conn.commit()
+        finally:
+            conn.close()
+
+        with FileManifest._lock:
+            if exists:
+                FileManifest._entries[pub_id] = files
+            else:
+                FileManifest._entries.pop(pub_id, None)
+
+    def reconcile(self):
+        """
+        Porovná evidenci se složkou publikací a uloží rozdíly. Porovnává se
+        s kopií evidence z doby před procházením složky, publikace upravené
+        během něj (update_publication) se nepřepíšou ani neodstraní.
+
+        Returns:
+            list: ID publikací, jejichž soubory se změnily
+        """
+        with FileManifest._lock:
+            current = dict(FileManifest._entries or {})
+
+        scanned = {}
+        try:
+            with os.scandir(self.base_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir() and entry.name.isdigit():
+                        scanned[int(entry.name)] = self._scan_directory(f"{self.base_dir}/{entry.name}")
+        except OSError:
+            pass
+
+        def unchanged(pub_id):
+            # Záznam, který se od kopie změnil, je novější než procházení
+            return (FileManifest._entries or {}).get(pub_id) is current.get(pub_id)
+
+        with FileManifest._lock:
+            changed = {pub_id: files for pub_id, files in scanned.items()
+                       if current.get(pub_id) != files and unchanged(pub_id)}
+            removed = [pub_id for pub_id in current if pub_id not in scanned and unchanged(pub_id)]
+
+        if changed or removed:
+            conn = Database.connect(self.db_path)
+            cursor = conn.cursor()
+            try:
+                self._write_entries(cursor, changed, removed)
+                conn.commit()
+            finally:
+                conn.close()
+
+        with FileManifest._lock:
+            if FileManifest._entries is None:
+                FileManifest._entries = {}
+            for pub_id, files in changed.items():
+                if unchanged(pub_id):
+                    FileManifest._entries[pub_id] = files
+            for pub_id in removed:
+                if unchanged(pub_id):
+                    FileManifest._entries.pop(pub_id, None)
+        if changed or removed:
+            # Soubory se změnily mimo aplikaci
+            DataGeneration.bump()
+        return list(changed)
+
+    def reload(self):
+        """Znovu načte evidenci (např. po importu jiné databáze) a ověří ji proti disku"""
+        SchemaMigrations.publications(self.db_path)
+        self._load()
+        return self.reconcile()
+
+    def get_entry(self, pub_id, kind):
+        """Vrátí (cesta, velikost, mtime_ns) souboru daného druhu, nebo None"""
+        files = FileManifest._entries.get(pub_id)
+        return files[kind] if files else None
+
+    def get_path(self, pub_id, kind):
+        """Vrátí cestu k souboru daného druhu, nebo None"""
+        entry = self.get_entry(pub_id, kind)
+        return entry[0] if entry else None
+
+    def get_pdf(self, pub_id):
+        return self.get_path(pub_id, 'pdf')
+
+    def get_cover(self, pub_id):
+        return self.get_path(pub_id, 'cover')
+
+    def get_description(self, pub_id):
+        return self.get_path(pub_id, 'description')
+
+    def pdf_files(self):
+        """Vrátí seznam (pub_id, cesta k PDF) všech evidovaných publikací"""
+        with FileManifest._lock:
+            entries = list(FileManifest._entries.items())
+        return sorted(
+            (pub_id, files['pdf'][0])
+            for pub_id, files in entries
+            if files['pdf']
+        )
+
+class DescriptionStore:
+    """
+    Popisy publikací ve sloupci publications.description. Starší soubory
+    description.txt se do databáze převedou jednou hromadnou migrací,
+    soubor je dál jen volitelný export v UTF-8.
+    """
+    # Pořadí zkoušených kódování při převodu starších souborů
+    ENCODINGS = ('utf-8-sig', 'windows-1250')
+    FILE_NAME = 'description.txt'
+
+    def __init__(self, db_path='publications.db', base_dir='publications'):
+        self.db_path = db_path
+        self.base_dir = base_dir
+        SchemaMigrations.publications(db_path)
+
+    @classmethod
+    def read_file(cls, path):
+        """Načte textový soubor, kódování se rozpozná podle obsahu"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        for encoding in cls.ENCODINGS:
+            try:
+                return data.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+        print(f"Neznámé kódování souboru {path}, neplatné znaky budou nahrazeny")
+        return data.decode('utf-8', errors='replace')
+
+    def file_path(self, pub_id):
+        return os.path.join(self.base_dir, str(pub_id), self.FILE_NAME)
+
+    @classmethod
+    def convert_files(cls, cursor, base_dir='publications'):
+        """
+        Převede popisy ze souborů do sloupce description (úprava schématu).
+        Převádí se jen řádky s popisem NULL.
+        """
+        cursor.execute("SELECT id FROM publications WHERE description IS NULL")
+        updates = []
+        for (pub_id,) in cursor.fetchall():
+            path = os.path.join(base_dir, str(pub_id), cls.FILE_NAME)
+            try:
+                description = cls.read_file(path) if os.path.isfile(path) else ""
+            except OSError as e:
+                print(f"Chyba při čtení popisu publikace {pub_id}: {e}")
+                description = ""
+            updates.append((description, pub_id))
+        cursor.executemany("UPDATE publications SET description = ? WHERE id = ?", updates)
+        if updates:
+            print(f"Převedeno {len(updates)} popisů publikací do databáze")
+
+    def get(self, pub_id):
+        """Vrátí popis publikace, prázdný řetězec pokud chybí"""
+        conn = Database.connect(self.db_path)
+        try:
+            row = conn.execute("SELECT description FROM publications WHERE id = ?", (pub_id,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Chyba při načítání popisu publikace {pub_id}: {e}")
+            row = None
+        finally:
+            conn.close()
+        return (row[0] or "") if row else ""
+
+    def export_publication(self, pub_id, description):
+        """Zapíše popis publikace do souboru description.txt v UTF-8"""
+        os.makedirs(os.path.dirname(self.file_path(pub_id)), exist_ok=True)
+        with open(self.file_path(pub_id), 'w', encoding='utf-8') as f:
+            f.write(description)
+
+    def export_all(self):
+        """Zapíše popisy všech publikací do souborů, vrátí jejich počet"""
+        conn = Database.connect(self.db_path)
+        try:
+            rows = conn.execute(
+                "SELECT id, description FROM publications WHERE description IS NOT NULL AND description != ''"
+            ).fetchall()
+        finally:
+            conn.close()
+        for pub_id, description in rows:
+            self.export_publication(pub_id, description)
+        return len(rows)
+
+def create_scope_table(cursor, pub_ids):
+    """Naplní dočasnou tabulku search_scope povolenými ID publikací pro omezení dotazu"""
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS search_scope (id INTEGER PRIMARY KEY)")
+    cursor.execute("DELETE FROM search_scope")
+    cursor.executemany("INSERT INTO search_scope (id) VALUES (?)", [(pub_id,) for pub_id in pub_ids])
+
+class SearchIndex:
+    """
+    Fulltextový index (SQLite FTS5) nad názvy, autory, popisy a stránkami PDF.
+    Pokud SQLite nepodporuje FTS5, je index nedostupný a vyhledává se sekvenčně.
+    """
+    HIGHLIGHT_START = "<span style='color: #FFD700; font-weight: bold;'>"
+    HIGHLIGHT_END = "</span>"
+
+    # Zvyšuje se při každé změně indexu publikací (např. pro slovník překlepů)
+    revision = 0
+
+    def __init__(self, db_path='publications.db'):
+        self.db_path = db_path
+        self.trigram_available = False
+        self.available = self.init_tables()
+
+    def init_tables(self):
+        """Vytvoří FTS5 tabulky a triggery, vrátí False pokud FTS5 chybí"""
+        # Tabulka stránek PDF musí existovat dřív než triggery nad ní
+        SchemaMigrations.publications(self.db_path)
+
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'pdf_pages_fts'")
+            pdf_index_exists = cursor.fetchone() is not None
+
+            # Starší index neobsahoval složený text, znovu ho naplní sync()
+            cursor.execute("PRAGMA table_info(publications_fts)")
+            columns = [column[1] for column in cursor.fetchall()]
+            if columns and 'title_folded' not in columns:
+                cursor.execute("DROP TABLE publications_fts")
+
+            # Index publikací - rowid odpovídá ID publikace. Složené kopie
+            # (bez diakritiky, malými písmeny) se neindexují, slouží k porovnání
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS publications_fts
+                USING fts5(title, author, description,
+                           title_folded UNINDEXED, author_folded UNINDEXED,
+                           description_folded UNINDEXED)
+            ''')
+            # Index stránek PDF čte text přímo z cache stránek
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS pdf_pages_fts
+                USING fts5(text, content='pdf_text_pages', content_rowid='id')
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS pdf_text_pages_ai AFTER INSERT ON pdf_text_pages BEGIN
+                    INSERT INTO pdf_pages_fts(rowid, text) VALUES (new.id, new.text);
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS pdf_text_pages_ad AFTER DELETE ON pdf_text_pages BEGIN
+                    INSERT INTO pdf_pages_fts(pdf_pages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS pdf_text_pages_au AFTER UPDATE ON pdf_text_pages BEGIN
+                    INSERT INTO pdf_pages_fts(pdf_pages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+                    INSERT INTO pdf_pages_fts(rowid, text) VALUES (new.id, new.text);
+                END
+            ''')
+
+            # Stránky uložené před vznikem indexu je potřeba zaindexovat
+            if not pdf_index_exists:
+                cursor.execute("INSERT INTO pdf_pages_fts(pdf_pages_fts) VALUES ('rebuild')")
+
+            self.trigram_available = self._init_trigram_tables(cursor)
+
+            conn.commit()
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 není k dispozici, použije se sekvenční vyhledávání: {e}")
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+    def _init_trigram_tables(self, cursor):
+        """
+        Vytvoří trigramové indexy nad složeným textem pro hledání libovolné
+        části slova ("hc595" v "SN74HC595N"). Vrátí False, pokud SQLite
+        trigramový tokenizer nepodporuje.
+        """
+        try:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'publications_trigram'")
+            publications_exists = cursor.fetchone() is not None
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'pdf_pages_trigram'")
+            pages_exists = cursor.fetchone() is not None
+
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS publications_trigram
+                USING fts5(title, description, tokenize='trigram')
+            ''')
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS pdf_pages_trigram
+                USING fts5(folded, tokenize='trigram', content='pdf_text_pages', content_rowid='id')
+            ''')
+        except sqlite3.OperationalError as e:
+            print(f"Trigramový index není k dispozici: {e}")
+            return False
+
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS pdf_text_pages_trigram_ai AFTER INSERT ON pdf_text_pages BEGIN
+                INSERT INTO pdf_pages_trigram(rowid, folded) VALUES (new.id, new.folded);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS pdf_text_pages_trigram_ad AFTER DELETE ON pdf_text_pages BEGIN
+                INSERT INTO pdf_pages_trigram(pdf_pages_trigram, rowid, folded) VALUES ('delete', old.id, old.folded);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS pdf_text_pages_trigram_au AFTER UPDATE ON pdf_text_pages BEGIN
+                INSERT INTO pdf_pages_trigram(pdf_pages_trigram, rowid, folded) VALUES ('delete', old.id, old.folded);
+                INSERT INTO pdf_pages_trigram(rowid, folded) VALUES (new.id, new.folded);
+            END
+        ''')
+
+        # Naplnění z již uloženého textu
+        if not publications_exists:
+            cursor.execute('''
+                INSERT INTO publications_trigram (rowid, title, description)
+                SELECT rowid, title_folded, description_folded FROM publications_fts
+            ''')
+        if not pages_exists:
+            cursor.execute("INSERT INTO pdf_pages_trigram(pdf_pages_trigram) VALUES ('rebuild')")
+        return True
+
+    @staticmethod
+    def build_match_query(query, alternatives=None):
+        """
+        Převede zadaný text na FTS5 dotaz, každé slovo se hledá jako prefix.
+        S alternatives (složené slovo -> podobná slova) stačí shoda s některým z nich.
+        """
+        groups = []
+        for term in query.split():
+            term = term.replace('"', '')
+            if not term:
+                continue
+            similar = (alternatives or {}).get(fold_text(term))
+            if similar:
+                groups.append("(" + " OR ".join([f'"{term}"*', *(f'"{word}"' for word in similar)]) + ")")
+            else:
+                groups.append(f'"{term}"*')
+        return " ".join(groups)
+
+    def infix_terms(self, query):
+        """
+        Vrátí složené termy dotazu pro hledání části textu, nebo None,
+        pokud trigramový index chybí.
+        """
+        if not self.trigram_available:
+            return None
+        terms = [fold_text(term).replace('"', '') for term in query.split()]
+        terms = [term for term in terms if term]
+        return terms or None
+
+    @staticmethod
+    def build_infix_query(terms):
+        """
+        Sestaví trigramový dotaz, každý term se hledá jako část textu.
+        Termy kratší než tři znaky trigramový index nenajde, vynechají se.
+        """
+        return " AND ".join(f'"{term}"' for term in terms if len(term) >= 3)
+
+    @staticmethod
+    def infix_conditions(terms, column):
+        """
+        Podmínky LIKE pro termy kratší než tři znaky, hledané jako část
+        složeného textu ve sloupci column.
+
+        Returns:
+            tuple: (seznam podmínek SQL, parametry)
+        """
+        conditions, params = [], []
+        for term in terms:
+            if len(term) < 3:
+                escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                conditions.append(f"{column} LIKE ? ESCAPE '\\'")
+                params.append(f"%{escaped}%")
+        return conditions, params
+
+    @staticmethod
+    def read_description(pub_id, db_path='publications.db'):
+        """Načte popis publikace z databáze"""
+        return DescriptionStore(db_path).get(pub_id)
+
+    def _index_publication(self, cursor, pub_id):
+        """Přeindexuje jednu publikaci v rámci otevřeného kurzoru"""
+        self._remove_publication(cursor, pub_id)
+        SearchIndex.revision += 1
+        cursor.execute("SELECT title, author, description FROM publications WHERE id = ?", (pub_id,))
+        row = cursor.fetchone()
+        if row:
+            title, author, description = row[0] or "", row[1] or "", row[2] or ""
+            cursor.execute('''
+                INSERT INTO publications_fts
+                    (rowid, title, author, description, title_folded, author_folded, description_folded)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (pub_id, title, author, description,
+                  fold_text(title), fold_text(author), fold_text(description)))
+            if self.trigram_available:
+                cursor.execute('''
+                    INSERT INTO publications_trigram (rowid, title, description) VALUES (?, ?, ?)
+                ''', (pub_id, fold_text(title), fold_text(description)))
+
+    def _remove_publication(self, cursor, pub_id):
+        """Odstraní publikaci ze všech indexů"""
+        SearchIndex.revision += 1
+        cursor.execute("DELETE FROM publications_fts WHERE rowid = ?", (pub_id,))
+        if self.trigram_available:
+            cursor.execute("DELETE FROM publications_trigram WHERE rowid = ?", (pub_id,))
+
+    def update_publication(self, pub_id):
+        """Aktualizuje záznam publikace v indexu po přidání nebo úpravě"""
+        if not self.available:
+            return
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        try:
+            self._index_publication(cursor, pub_id)
+            conn.commit()
+        except Exception as e:
+            print(f"Chyba při indexování publikace {pub_id}: {e}")
+            conn.rollback()
+        finally:
+            conn.close()
+
+    def sync(self, check_changes=False):
+        """
+        Doplní chybějící publikace do indexu a odstraní neexistující.
+        S check_changes přeindexuje i publikace, jejichž údaje nebo popis
+        se od poslední indexace změnily.
+        """
+        if not self.available:
+            return
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT id, title, author, description FROM publications")
+            publications = {row[0]: (row[1] or "", row[2] or "", row[3] or "") for row in cursor.fetchall()}
+            cursor.execute("SELECT rowid, title, author, description FROM publications_fts")
+            indexed = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+
+            for pub_id in publications.keys() - indexed.keys():
+                self._index_publication(cursor, pub_id)
+            for pub_id in indexed.keys() - publications.keys():
+                self._remove_publication(cursor, pub_id)
+
+            if check_changes:
+                for pub_id in publications.keys() & indexed.keys():
+                    if publications[pub_id] != indexed[pub_id]:
+                        self._index_publication(cursor, pub_id)
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Chyba při synchronizaci indexu: {e}")
+            conn.rollback()
+        finally:
+            conn.close()
+
+    def search_publications(self, query, column, pub_ids=None, limit=None, alternatives=None):
+        """
+        Vyhledá publikace v jednom sloupci indexu seřazené podle bm25.
+        Volitelně jen mezi pub_ids, nejvýše limit řádků a s podobnými
+        slovy pro překlepy (alternatives).
+
+        Returns:
+            list: Řádky (id, title, author, year, snippet), výňatek z popisu
+            je LazySnippet sestavený až při zobrazení
+        """
+        # Části slov (např. "hc595") najde jen trigramový index
+        terms = None if alternatives else self.infix_terms(query)
+        if terms is not None:
+            return self._search_publications_infix(terms, column, pub_ids, limit)
+
+        match = self.build_match_query(query, alternatives)
+        if not match:
+            return []
+
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        scope_filter = ""
+        if pub_ids is not None:
+            create_scope_table(cursor, pub_ids)
+            scope_filter = "AND p.id IN (SELECT id FROM search_scope)"
+        cursor.execute(f'''
+            SELECT p.id, p.title, p.author, p.year
+            FROM publications_fts
+            JOIN publications p ON p.id = publications_fts.rowid
+            WHERE publications_fts MATCH ? {scope_filter}
+            ORDER BY bm25(publications_fts, 10.0, 5.0, 1.0)
+            LIMIT ?
+        ''', (f"{column} : ({match})", -1 if limit is None else limit))
+        rows = cursor.fetchall()
+        conn.close()
+
+        pattern = LazySnippet.query_pattern(query, alternatives)
+        return [(*row, LazySnippet('description', row[0], pattern, db_path=self.db_path))
+                for row in rows]
+
+    def search_pdf_pages(self, query, pub_id=None, pub_ids=None, limit=None, alternatives=None):
+        """
+        Vyhledá stránky PDF seřazené podle bm25, volitelně jen v jedné publikaci
+        nebo mezi pub_ids, nejvýše limit řádků a s podobnými slovy pro překlepy.
+
+        Returns:
+            list: Řádky (id, title, author, year, page, snippet)
+        """
+        terms = None if alternatives else self.infix_terms(query)
+        if terms is not None:
+            return self._search_pdf_pages_infix(terms, pub_id, pub_ids, limit)
+
+        match = self.build_match_query(query, alternatives)
+        if not match:
+            return []
+
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+
+        params = [match]
+        pub_filter = ""
+        if pub_id is not None:
+            pub_filter = "AND t.pub_id = ?"
+            params.append(pub_id)
+        elif pub_ids is not None:
+            create_scope_table(cursor, pub_ids)
+            pub_filter = "AND t.pub_id IN (SELECT id FROM search_scope)"
+        params.append(-1 if limit is None else limit)
+
+        cursor.execute(f'''
+            SELECT p.id, p.title, p.author, p.year, t.page_num
+            FROM pdf_pages_fts
+            JOIN pdf_text_pages t ON t.id = pdf_pages_fts.rowid
+            JOIN publications p ON p.id = t.pub_id
+            WHERE pdf_pages_fts MATCH ? {pub_filter}
+            ORDER BY bm25(pdf_pages_fts)
+            LIMIT ?
+        ''', params)
+        rows = cursor.fetchall()
+        conn.close()
+
+        pattern = LazySnippet.query_pattern(query, alternatives)
+        return [(*row, LazySnippet('pdf', row[0], pattern, page=row[4], db_path=self.db_path))
+                for row in rows]
+
+    def _search_publications_infix(self, terms, column, pub_ids, limit):
+        """
+        Varianta search_publications nad trigramovým indexem. Termy kratší
+        než tři znaky se ověří přes LIKE ve složeném textu kandidátů.
+        """
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        conditions, params = self.infix_conditions(terms, f"g.{column}")
+        match = self.build_infix_query(terms)
+        if match:
+            conditions.insert(0, "publications_trigram MATCH ?")
+            params.insert(0, f"{column} : ({match})")
+        if pub_ids is not None:
+            create_scope_table(cursor, pub_ids)
+            conditions.append("p.id IN (SELECT id FROM search_scope)")
+        order = "bm25(publications_trigram, 10.0, 1.0)" if match else "p.id"
+        params.append(-1 if limit is None else limit)
+        cursor.execute(f'''
+            SELECT p.id, p.title, p.author, p.year
+            FROM publications_trigram g
+            JOIN publications p ON p.id = g.rowid
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {order}
+            LIMIT ?
+        ''', params)
+        rows = cursor.fetchall()
+        conn.close()
+
+        pattern = LazySnippet.terms_pattern(tuple(terms))
+        return [(*row, LazySnippet('description', row[0], pattern, db_path=self.db_path))
+                for row in rows]
+
+    def _search_pdf_pages_infix(self, terms, pub_id, pub_ids, limit):
+        """
+        Varianta search_pdf_pages nad trigramovým indexem. Termy kratší
+        než tři znaky se ověří přes LIKE ve složeném textu stránky.
+        """
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+
+        conditions, params = self.infix_conditions(terms, "t.folded")
+        match = self.build_infix_query(terms)
+        source = "pdf_text_pages t"
+        order = "t.pub_id, t.page_num"
+        if match:
+            source = "pdf_pages_trigram g JOIN pdf_text_pages t ON t.id = g.rowid"
+            order = "bm25(pdf_pages_trigram)"
+            conditions.insert(0, "pdf_pages_trigram MATCH ?")
+            params.insert(0, match)
+        if pub_id is not None:
+            conditions.append("t.pub_id = ?")
+            params.append(pub_id)
+        elif pub_ids is not None:
+            create_scope_table(cursor, pub_ids)
+            conditions.append("t.pub_id IN (SELECT id FROM search_scope)")
+        params.append(-1 if limit is None else limit)
+
+        cursor.execute(f'''
+            SELECT p.id, p.title, p.author, p.year, t.page_num
+            FROM {source}
+            JOIN publications p ON p.id = t.pub_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {order}
+            LIMIT ?
+        ''', params)
+        rows = cursor.fetchall()
+        conn.close()
+
+        pattern = LazySnippet.terms_pattern(tuple(terms))
+        return [(*row, LazySnippet('pdf', row[0], pattern, page=row[4], db_path=self.db_path))
+                for row in rows]
+
+    def boolean_leaf_ids(self, field, text, phrase, fields):
+        """
+        Vrátí ID publikací, které obsahují jeden term dotazu BooleanQuery.
+        Pole None znamená všechna prohledávaná pole (fields). Termy od tří
+        znaků se hledají jako část textu v trigramovém indexu, kratší a pole
+        autor jako začátek slova (fráze jako souvislý text).
+        """
+        if field == 'pdf':
+            columns = []
+        elif field:
+            columns = [field]
+        else:
+            columns = [name for name in fields if name != 'pdf']
+        search_pdf = field == 'pdf' or (field is None and 'pdf' in fields)
+        folded = fold_text(text).replace('"', '')
+        infix = self.trigram_available and len(folded) >= 3
+
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        pub_ids = set()
+        try:
+            infix_columns = [column for column in columns if column != 'author'] if infix else []
+            word_columns = [column for column in columns if column not in infix_columns]
+            if infix_columns:
+                cursor.execute(
+                    "SELECT rowid FROM publications_trigram WHERE publications_trigram MATCH ?",
+                    (f"{{{' '.join(infix_columns)}}} : \"{folded}\"",)
+                )
+                pub_ids.update(row[0] for row in cursor.fetchall())
+            if word_columns:
+                match = f'"{folded}"' if phrase else f'"{folded}"*'
+                cursor.execute(
+                    "SELECT rowid FROM publications_fts WHERE publications_fts MATCH ?",
+                    (f"{{{' '.join(word_columns)}}} : {match}",)
+                )
+                pub_ids.update(row[0] for row in cursor.fetchall())
+            if search_pdf:
+                if infix:
+                    cursor.execute('''
+                        SELECT DISTINCT t.pub_id FROM pdf_pages_trigram g
+                        JOIN pdf_text_pages t ON t.id = g.rowid
+                        WHERE pdf_pages_trigram MATCH ?
+                    ''', (f'"{folded}"',))
+                else:
+                    cursor.execute('''
+                        SELECT DISTINCT t.pub_id FROM pdf_pages_fts f
+                        JOIN pdf_text_pages t ON t.id = f.rowid
+                        WHERE pdf_pages_fts MATCH ?
+                    ''', (f'"{folded}"' if phrase else f'"{folded}"*',))
+                pub_ids.update(row[0] for row in cursor.fetchall())
+        finally:
+            conn.close()
+        return pub_ids
+
+    def can_prefilter_infix(self, query):
+        """Zda lze celý výraz předvybrat trigramovým indexem jako část textu"""
+        return self.trigram_available and '"' not in query and len(fold_text(query)) >= 3
+
+    def iter_documents(self, query=None, column=None, pub_ids=None, infix=False):
+        """
+        Prochází uložené názvy a popisy publikací. S dotazem vrací jen
+        kandidáty nalezené v daném sloupci indexu - s infix trigramovým
+        indexem jako část textu, jinak slovním indexem seřazené podle bm25.
+
+        Yields:
+            tuple: (id, title, description, title_folded, description_folded)
+        """
+        conditions, params = [], []
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        if query is not None and infix:
+            conditions.append("rowid IN (SELECT rowid FROM publications_trigram WHERE publications_trigram MATCH ?)")
+            params.append(f'{column} : "{fold_text(query)}"')
+        elif query is not None:
+            match = self.build_match_query(query)
+            if not match:
+                conn.close()
+                return
+            conditions.append("publications_fts MATCH ?")
+            params.append(f"{column} : ({match})")
+        if pub_ids is not None:
+            create_scope_table(cursor, pub_ids)
+            conditions.append("rowid IN (SELECT id FROM search_scope)")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "bm25(publications_fts, 10.0, 5.0, 1.0)" if query is not None and not infix else "rowid"
+        try:
+            yield from cursor.execute(f'''
+                SELECT rowid, title, description, title_folded, description_folded
+                FROM publications_fts {where} ORDER BY {order}
+            ''', params)
+        finally:
+            conn.close()
+
+    def iter_pdf_pages(self, query=None, pub_id=None, pub_ids=None, infix=False):
+        """
+        Prochází uložený text stránek PDF. S dotazem vrací jen stránky
+        nalezené fulltextovým indexem (s infix trigramovým jako část textu).
+
+        Yields:
+            tuple: (pub_id, page_num, text, folded)
+        """
+        conditions, params = [], []
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        if query is not None and infix:
+            conditions.append("t.id IN (SELECT rowid FROM pdf_pages_trigram WHERE pdf_pages_trigram MATCH ?)")
+            params.append(f'"{fold_text(query)}"')
+        elif query is not None:
+            match = self.build_match_query(query)
+            if not match:
+                conn.close()
+                return
+            conditions.append("t.id IN (SELECT rowid FROM pdf_pages_fts WHERE pdf_pages_fts MATCH ?)")
+            params.append(match)
+        if pub_id is not None:
+            conditions.append("t.pub_id = ?")
+            params.append(pub_id)
+        elif pub_ids is not None:
+            create_scope_table(cursor, pub_ids)
+            conditions.append("t.pub_id IN (SELECT id FROM search_scope)")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        try:
+            yield from cursor.execute(f'''
+                SELECT t.pub_id, t.page_num, t.text, t.folded FROM pdf_text_pages t
+                {where} ORDER BY t.pub_id, t.page_num
+            ''', params)
+        finally:
+            conn.close()
+
+class TextMatcher:
+    """
+    Hledaný výraz zkompilovaný jednou pro celé vyhledávání podle zvolených
+    režimů shody (velikost písmen, regulární výraz, celá slova). Bez
+    rozlišování velikosti písmen se porovnává složený text bez diakritiky.
+    """
+    def __init__(self, query, case_sensitive=False, use_regex=False, whole_word=False):
+        self.query = query
+        self.case_sensitive = case_sensitive
+        self.use_regex = use_regex
+        self.whole_word = whole_word
+
+        if use_regex:
+            # Ve vzoru se odstraní jen diakritika, malá písmena by změnila význam \D, \W...
+            pattern = query if case_sensitive else fold_text(query, lower=False)
+        else:
+            pattern = re.escape(query if case_sensitive else fold_text(query))
+        if whole_word:
+            pattern = rf"\b(?:{pattern})\b"
+        # Neplatný regulární výraz vyvolá re.error
+        self.pattern = re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+
+    @classmethod
+    def from_params(cls, search_params):
+        """Vytvoří matcher z parametrů vyhledávání, pro běžné hledání vrátí None"""
+        modes = {key: bool(search_params.get(key)) for key in ('case_sensitive', 'use_regex', 'whole_word')}
+        if not any(modes.values()):
+            return None
+        return cls(search_params.get('query', ''), **modes)
+
+    @property
+    def index_prefilter(self):
+        """
+        Zda lze kandidáty předvybrat fulltextovým indexem. Index hledá
+        od začátku slov, proto jen pro celá slova bez regulárního výrazu.
+        """
+        return self.whole_word and not self.use_regex
+
+    def first_match(self, text, folded=None):
+        """
+        Vrátí první neprázdný nález v textu, nebo None. Předem složený text
+        (folded) se použije místo skládání při každém dotazu.
+        """
+        if not text:
+            return None
+        if not self.case_sensitive:
+            text = folded if folded is not None else fold_text(text)
+        for match in self.pattern.finditer(text):
+            if match.end() > match.start():
+                return match
+        return None
+
+class RelevanceScorer:
+    """
+    Hodnocení relevance výsledku podle pole nálezu, četnosti termů, pozice
+    prvního výskytu a vzájemné blízkosti termů ve složeném textu.
+    """
+    DEFAULT_WEIGHTS = {
+        'title': 3.0,
+        'description': 1.5,
+        'pdf': 1.0,
+        'frequency': 1.0,
+        'position': 1.0,
+        'proximity': 1.0
+    }
+    # Výskyty nad tento počet už skóre nezvyšují
+    MAX_OCCURRENCES = 50
+
+    def __init__(self, query, weights=None):
+        self.weights = {**self.DEFAULT_WEIGHTS, **(weights or {})}
+        terms = [fold_text(term).replace('"', '') for term in query.split()]
+        self.terms = list(dict.fromkeys(term for term in terms if term))
+        self._patterns = [re.compile(re.escape(term)) for term in self.terms]
+
+    def score(self, result_type, folded):
+        """Vrátí skóre výsledku daného typu ('title', 'description', 'pdf') nad složeným textem"""
+        field_weight = self.weights.get(result_type, 1.0)
+        if not folded or not self.terms:
+            return field_weight
+
+        occurrences = []
+        for pattern in self._patterns:
+            positions = []
+            for match in pattern.finditer(folded):
+                positions.append(match.start())
+                if len(positions) >= self.MAX_OCCURRENCES:
+                    break
+            occurrences.append(positions)
+
+        found = [positions for positions in occurrences if positions]
+        if not found:
+            return field_weight
+
+        frequency = sum(math.log1p(len(positions)) for positions in found) / len(self.terms)
+        position = 1.0 / (1.0 + min(positions[0] for positions in found) / 100.0)
+        proximity = 0.0
+        if len(self.terms) > 1 and len(found) == len(self.terms):
+            terms_length = sum(len(term) for term in self.terms)
+            proximity = terms_length / max(self._shortest_window(occurrences), terms_length)
+
+        return field_weight * (
+            1.0
+            + self.weights['frequency'] * frequency
+            + self.weights['position'] * position
+            + self.weights['proximity'] * proximity
+        )
+
+    @staticmethod
+    def result_key(result_pair):
+        """Klíč výsledku nezávislý na identitě objektu (typ, ID, stránka)"""
+        result, result_type = result_pair
+        return (result_type, result[0], result[4] if result_type == 'pdf' else None)
+
+    def _shortest_window(self, occurrences):
+        """
+        Nejkratší úsek textu, který obsahuje výskyt všech termů. Úsek končí
+        koncem termu, který končí nejpozději - delší dřívější term může
+        přesahovat přes naposledy přidaný.
+        """
+        events = sorted(
+            (position, index)
+            for index, positions in enumerate(occurrences)
+            for position in positions
+        )
+        term_ends = [position + len(self.terms[index]) for position, index in events]
+        counts = [0] * len(occurrences)
+        covered = 0
+        best = None
+        start = 0
+        # Výskyty v úseku s klesajícím koncem, první končí nejpozději
+        ends = deque()
+        for current, (position, index) in enumerate(events):
+            while ends and term_ends[ends[-1]] <= term_ends[current]:
+                ends.pop()
+            ends.append(current)
+            if counts[index] == 0:
+                covered += 1
+            counts[index] += 1
+            while covered == len(occurrences):
+                first_position, first_index = events[start]
+                last_end = term_ends[ends[0]]
+                if best is None or last_end - first_position < best:
+                    best = last_end - first_position
+                counts[first_index] -= 1
+                if counts[first_index] == 0:
+                    covered -= 1
+                if ends[0] == start:
+                    ends.popleft()
+                start += 1
+        return best
+
+class BooleanQuery:
+    """
+    Dotaz s operátory AND, OR, NOT (nebo -slovo), závorkami, frázemi v
+    uvozovkách a prefixy polí (title:, author:, pdf:). Výraz se vyhodnotí
+    jako množinové operace nad ID publikací, každý term jedním dotazem do indexu.
+
+    Uzly stromu: ('term', pole, text, fráze), ('and', [uzly]), ('or', [uzly]), ('not', uzel)
+    """
+    FIELD_ALIASES = {
+        'title': 'title', 'nazev': 'title',
+        'author': 'author', 'autor': 'author',
+        'pdf': 'pdf'
+    }
+    OPERATORS = ('AND', 'OR', 'NOT')
+
+    _TOKEN_RE = re.compile(r'''
+        \s*(?:
+            (?P<lparen>\() |
+            (?P<rparen>\)) |
+            (?P<negparen>-(?=\()) |
+            (?P<neg>-)?(?:(?P<field>\w+):)?
+            (?:"(?P<phrase>[^"]*)"?|(?P<word>[^\s()"]+))
+        )''', re.VERBOSE)
+
+    def __init__(self, tree):
+        self.tree = tree
+
+    @classmethod
+    def _tokenize(cls, text):
+        """Rozdělí dotaz na závorky, operátory a termy"""
+        tokens = []
+        position = 0
+        text = text.strip()
+        while position < len(text):
+            match = cls._TOKEN_RE.match(text, position)
+            if not match or match.end() == position:
+                break
+            position = match.end()
+            if match.group('lparen'):
+                tokens.append(('(',))
+            elif match.group('rparen'):
+                tokens.append((')',))
+            elif match.group('negparen'):
+                tokens.append(('NOT',))
+            else:
+                field = match.group('field')
+                word = match.group('word')
+                phrase = match.group('phrase')
+                negated = bool(match.group('neg'))
+                # Neznámý prefix (např. "http:") je součástí slova
+                if field and fold_text(field) not in cls.FIELD_ALIASES:
+                    word = f"{field}:{word if word is not None else phrase}"
+                    phrase = None
+                    field = None
+                if not negated and not field and word in cls.OPERATORS:
+                    tokens.append((word,))
+                    continue
+                tokens.append(('term', negated, cls.FIELD_ALIASES.get(fold_text(field or '')),
+                               phrase if phrase is not None else word, phrase is not None))
+        return tokens
+
+    @classmethod
+    def is_structured(cls, text):
+        """Zda dotaz používá operátory, fráze, závorky nebo prefixy polí"""
+        if not text or not text.strip():
+            return False
+        for token in cls._tokenize(text):
+            if token[0] != 'term' or token[1] or token[2] or token[4]:
+                return True
+        return False
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Převede dotaz na strom. Při chybné syntaxi vyvolá ValueError
+        s popisem chyby.
+        """
+        tokens = cls._tokenize(text)
+        if not tokens:
+            raise ValueError("Prázdný dotaz")
+        position = [0]
+
+        def peek():
+            return tokens[position[0]][0] if position[0] < len(tokens) else None
+
+        def take():
+            token = tokens[position[0]]
+            position[0] += 1
+            return token
+
+        def parse_or():
+            items = [parse_and()]
+            while peek() == 'OR':
+                take()
+                items.append(parse_and())
+            return items[0] if len(items) == 1 else ('or', items)
+
+        def parse_and():
+            items = [parse_unary()]
+            while peek() not in (None, ')', 'OR'):
+                if peek() == 'AND':
+                    take()
+                items.append(parse_unary())
+            return items[0] if len(items) == 1 else ('and', items)
+
+        def parse_unary():
+            if peek() == 'NOT':
+                take()
+                return ('not', parse_unary())
+            return parse_primary()
+
+        def parse_primary():
+            kind = peek()
+            if kind is None:
+                raise ValueError("Neúplný dotaz - za operátorem chybí výraz")
+            if kind == '(':
+                take()
+                node = parse_or()
+                if peek() != ')':
+                    raise ValueError("Chybí uzavírací závorka")
+                take()
+                return node
+            if kind != 'term':
+                raise ValueError(f"Neočekávaný operátor nebo závorka: {kind}")
+            _, negated, field, value, phrase = take()
+            if not value.strip():
+                raise ValueError("Prázdná fráze nebo term")
+            node = ('term', field, value.strip(), phrase)
+            return ('not', node) if negated else node
+
+        tree = parse_or()
+        if position[0] < len(tokens):
+            raise ValueError("Nadbytečná uzavírací závorka")
+        return cls(tree)
+
+    @classmethod
+    def from_keywords(cls, keywords, match_type):
+        """
+        Sestaví dotaz z klíčových slov pokročilého vyhledávání (oddělených
+        čárkou) podle způsobu shody, nebo None pro prázdná klíčová slova.
+        """
+        if not keywords or not keywords.strip():
+            return None
+        if match_type == "Dotazovací jazyk":
+            return cls.parse(keywords)
+        if match_type == "Přesná fráze":
+            return cls(('term', None, keywords.strip().replace('"', ''), True))
+        terms = []
+        for keyword in keywords.split(','):
+            keyword = keyword.strip().replace('"', '')
+            if keyword:
+                terms.append(('term', None, keyword, ' ' in keyword))
+        if not terms:
+            return None
+        if len(terms) == 1:
+            return cls(terms[0])
+        return cls(('or' if match_type == "Libovolné slovo" else 'and', terms))
+
+    @classmethod
+    def from_search_params(cls, search_params, allow_query=True):
+        """
+        Vrátí (dotaz, klíčová slova) z parametrů vyhledávání. Dotaz se jako
+        BooleanQuery bere jen s operátory, frázemi nebo poli (allow_query=False
+        ho vynechá, např. při režimech shody). Chybná syntaxe vyvolá ValueError.
+        """
+        query = search_params.get('query', '')
+        boolean_query = None
+        if allow_query and cls.is_structured(query):
+            boolean_query = cls.parse(query)
+        keywords_query = cls.from_keywords(search_params.get('keywords'), search_params.get('match_type'))
+        return boolean_query, keywords_query
+
+    def positive_terms(self, node=None, negated=False):
+        """Vrátí (pole, text) termů, které nejsou negované - pro výňatky a relevanci"""
+        node = self.tree if node is None else node
+        if node[0] == 'term':
+            return [] if negated else [(node[1], node[2])]
+        if node[0] == 'not':
+            return self.positive_terms(node[1], not negated)
+        return [term for child in node[1] for term in self.positive_terms(child, negated)]
+
+    def uses_field(self, field, node=None):
+        """Zda některý term dotazu míří na zadané pole"""
+        node = self.tree if node is None else node
+        if node[0] == 'term':
+            return node[1] == field
+        if node[0] == 'not':
+            return self.uses_field(field, node[1])
+        return any(self.uses_field(field, child) for child in node[1])
+
+    def evaluate(self, leaf_ids, universe, node=None):
+        """
+        Vyhodnotí strom jako množinové operace. leaf_ids(pole, text, fráze)
+        vrací množinu ID publikací pro jeden term, universe jsou všechna
+        přípustná ID (pro negaci).
+        """
+        node = self.tree if node is None else node
+        kind = node[0]
+        if kind == 'term':
+            return leaf_ids(node[1], node[2], node[3]) & universe
+        if kind == 'not':
+            return universe - self.evaluate(leaf_ids, universe, node[1])
+        if kind == 'or':
+            result = set()
+            for child in node[1]:
+                result |= self.evaluate(leaf_ids, universe, child)
+            return result
+
+        # AND - negace se odečtou až od průniku kladných podmínek
+        positive = [child for child in node[1] if child[0] != 'not']
+        negative = [child[1] for child in node[1] if child[0] == 'not']
+        result = None
+        for child in positive:
+            child_ids = self.evaluate(leaf_ids, universe, child)
+            result = child_ids if result is None else result & child_ids
+            if not result:
+                return set()
+        if result is None:
+            result = set(universe)
+        for child in negative:
+            result -= self.evaluate(leaf_ids, universe, child)
+        return result
+
+    def combine(self, other):
+        """Spojí dva dotazy operátorem AND"""
+        if other is None:
+            return self
+        return BooleanQuery(('and', [self.tree, other.tree]))
+
+def edit_distance(first, second, max_distance=None):
+    """
+    Levenshteinova vzdálenost dvou slov. S max_distance se výpočet ukončí,
+    jakmile je jisté, že vzdálenost limit překročí (vrátí max_distance + 1).
+    """
+    if len(first) < len(second):
+        first, second = second, first
+    if max_distance is not None and len(first) - len(second) > max_distance:
+        return max_distance + 1
+
+    previous = list(range(len(second) + 1))
+    for i, char_first in enumerate(first, 1):
+        current = [i]
+        for j, char_second in enumerate(second, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_first != char_second)
+            ))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+class FuzzyVocabulary:
+    """
+    Slovník slov z názvů, autorů a popisů pro hledání s překlepy (metoda
+    SymSpell). Ke každému slovu se předem uloží jeho varianty s vypuštěnými
+    znaky, podobná slova se pak najdou několika dotazy do slovníku místo
+    porovnávání s celým slovníkem. Po změně indexu se nový slovník sestaví
+    na pozadí a do té doby se používá předchozí.
+    """
+    MIN_WORD_LENGTH = 3
+    MAX_DISTANCE = 2
+    PREFIX_LENGTH = 7
+    MAX_CANDIDATES = 10
+
+    # Sdílená instance pro celý proces: ((db_path, revize indexu), slovník)
+    _cache = None
+    _lock = threading.Lock()
+    # Slovník sestavuje vždy jen jedno vlákno, čtení _cache na něj nečeká
+    _build_lock = threading.Lock()
+    # Vlákno sestavení na pozadí, dokud neskončí
+    _refresh_thread = None
+
+    def __init__(self, frequencies):
+        self.frequencies = frequencies
+        # Varianta s vypuštěnými znaky -> slova, ze kterých vznikla
+        self.deletes = {}
+        for word in frequencies:
+            for variant in self._deletes(word[:self.PREFIX_LENGTH], self.MAX_DISTANCE):
+                self.deletes.setdefault(variant, []).append(word)
+
+    @staticmethod
+    def _deletes(word, max_distance):
+        """Vrátí slovo a všechny jeho varianty s nejvýše max_distance vypuštěnými znaky"""
+        variants = {word}
+        current = {word}
+        for _ in range(max_distance):
+            current = {variant[:i] + variant[i + 1:] for variant in current for i in range(len(variant))}
+            variants |= current
+        return variants
+
+    @classmethod
+    def load(cls, db_path='publications.db'):
+        """
+        Vrátí slovník pro vyhledávání. Zastaralý slovník se vrátí hned a nový
+        se sestaví na pozadí, bez čekání se neobejde jen úplně první sestavení
+        (proto se nevolá z vlákna GUI).
+        """
+        cached = cls._cache
+        if cached is not None and cached[0][0] == db_path:
+            if cached[0][1] != SearchIndex.revision:
+                cls.refresh_in_background(db_path)
+            return cached[1]
+        return cls.refresh(db_path)
+
+    @classmethod
+    def refresh_in_background(cls, db_path='publications.db'):
+        """Spustí sestavení slovníku v samostatném vlákně, pokud už neběží"""
+        def build():
+            try:
+                cls.refresh(db_path)
+            except Exception as e:
+                print(f"Chyba při sestavování slovníku: {e}")
+            finally:
+                with cls._lock:
+                    if cls._refresh_thread is threading.current_thread():
+                        cls._refresh_thread = None
+
+        with cls._lock:
+            if cls._refresh_thread is not None:
+                return
+            cls._refresh_thread = threading.Thread(target=build, daemon=True)
+            cls._refresh_thread.start()
+
+    @classmethod
+    def wait_for_refresh(cls):
+        """
+        Počká na dokončení sestavení slovníku - vlákna spuštěného na pozadí,
+        i když ještě nezačalo, i sestavení volaného přímo z jiného vlákna
+        """
+        with cls._lock:
+            thread = cls._refresh_thread
+        if thread is not None:
+            thread.join()
+        with cls._build_lock:
+            pass
+
+    @classmethod
+    def refresh(cls, db_path='publications.db'):
+        """Sestaví slovník podle aktuálního indexu, pokud je zastaralý, a vrátí ho"""
+        with cls._build_lock:
+            key = (db_path, SearchIndex.revision)
+            if cls._cache is not None and cls._cache[0] == key:
+                return cls._cache[1]
+
+            conn = Database.connect(db_path)
+            cursor = conn.cursor()
+            # Slova se berou přímo z indexu, jsou tedy už bez diakritiky a malými písmeny
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS temp.publications_vocab
+                USING fts5vocab(main, publications_fts, row)
+            ''')
+            cursor.execute("SELECT term, doc FROM temp.publications_vocab WHERE length(term) >= ?",
+                           (cls.MIN_WORD_LENGTH,))
+            frequencies = {term: doc for term, doc in cursor.fetchall() if not term.isdigit()}
+            conn.close()
+
+            vocabulary = cls(frequencies)
+            # Výměna hotového slovníku, čtenáři dosud používali předchozí
+            cls._cache = (key, vocabulary)
+            return vocabulary
+
+    @staticmethod
+    def max_distance_for(word):
+        """Povolený počet překlepů podle délky slova"""
+        return 1 if len(word) <= 5 else 2
+
+    def __contains__(self, word):
+        return word in self.frequencies
+
+    def lookup(self, word, max_distance=None):
+        """
+        Najde slova slovníku do dané vzdálenosti od zadaného slova.
+
+        Returns:
+            list: (slovo, vzdálenost) seřazené podle vzdálenosti a četnosti
+        """
+        word = fold_text(word)
+        if len(word) < self.MIN_WORD_LENGTH:
+            return []
+        if max_distance is None:
+            max_distance = self.max_distance_for(word)
+        max_distance = min(max_distance, self.MAX_DISTANCE)
+
+        candidates = set()
+        for variant in self._deletes(word[:self.PREFIX_LENGTH], max_distance):
+            candidates.update(self.deletes.get(variant, ()))
+
+        # Shodné varianty jsou jen kandidáti, skutečná vzdálenost se ověří
+        candidates = [(candidate, distance) for candidate in candidates
+                      if (distance := edit_distance(word, candidate, max_distance)) <= max_distance]
+        candidates.sort(key=lambda item: (item[1], -self.frequencies[item[0]]))
+        return candidates[:self.MAX_CANDIDATES]
+
+class DataGeneration:
+    """
+    Počítadlo změn dat knihovny. Přidání, úprava, smazání, přesun i import
+    ho zvýší, a tím zneplatní všechny uložené výsledky vyhledávání.
+    """
+    current = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def bump(cls):
+        with cls._lock:
+            cls.current += 1
+
+class SearchResultCache:
+    """Omezená LRU cache výsledků vyhledávání sdílená všemi běhy SearchWorker"""
+
+    # Parametry, které ovlivňují výsledky (zobrazení a řazení ne, váhy
+    # relevance ano - podle nich se vybírá nejlepších max_results výsledků)
+    RESULT_PARAMS = (
+        'search_in_title', 'search_in_description', 'search_in_pdf',
+        'tab', 'category', 'subcategory', 'year_range', 'keywords', 'match_type',
+        'case_sensitive', 'use_regex', 'whole_word', 'fuzzy', 'max_results', 'ranking'
+    )
+
+    def __init__(self, max_entries=100):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def make_key(cls, search_params):
+        """Sestaví klíč z normalizovaného dotazu, prohledávaných polí a filtrů"""
+        query = " ".join(search_params.get('query', '').split())
+        if not search_params.get('case_sensitive') and not search_params.get('use_regex'):
+            query = fold_text(query)
+        params = []
+        for name in cls.RESULT_PARAMS:
+            value = search_params.get(name)
+            if isinstance(value, dict):
+                value = tuple(sorted(value.items()))
+            if value not in (None, False, ''):
+                params.append((name, value))
+        return (query, tuple(params))
+
+    def get(self, key):
+        """Vrátí (výsledky, zkráceno) pro klíč, nebo None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] != DataGeneration.current:
+                # Data se od uložení změnila
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key, results, truncated, generation):
+        """Uloží výsledky vyhledávání spuštěného při dané generaci dat"""
+        if generation != DataGeneration.current:
+            return
+        with self._lock:
+            self._entries[key] = (generation, list(results), truncated)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def prune(self):
+        """Odstraní zneplatněné záznamy a zkrátí cache na maximální velikost"""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[0] != DataGeneration.current]:
+                del self._entries[key]
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """Vrátí statistiku cache (počet záznamů, zásahy, úspěšnost v %)"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(100 * self.hits / lookups, 1) if lookups else 0.0
+            }
+
 class SearchManager:
     """
     Třída pro správu vyhledávání v aplikaci.
     Poskytuje metody pro různé typy vyhledávání a zpracování výsledků.
     """
+    # Cache výsledků sdílená všemi instancemi a běhy vyhledávání
+    result_cache = SearchResultCache()
+
     def __init__(self, db_path='publications.db'):
         self.db_path = db_path
-        # Cache pro optimalizaci vyhledávání
-        self._title_cache = {}
-        self._description_cache = {}
-        self._pdf_cache = {}
-
-    def search_by_title(self, query):
-        """Vyhledávání podle názvu publikace"""
+        # Evidence souborů publikací
+        self.file_manifest = FileManifest(db_path)
+        # Trvalá cache textu stránek PDF
+        self.pdf_text_cache = PdfTextCache(db_path)
+        # Fulltextový index nad publikacemi a stránkami PDF
+        self.search_index = SearchIndex(db_path)
+        # Doplnění indexu proběhne až ve vlákně prvního vyhledávání
+        self._index_synced = False
+        # Sdílená mapa ID -> (id, title, author, year) pro sestavení výsledků
+        self._metadata = None
+
+    def search_by_title(self, query, pub_ids=None, limit=None, matcher=None, alternatives=None):
+        """
+        Vyhledávání podle názvu publikace (volitelně jen v pub_ids a s limitem).
+        S matcherem se použijí zvolené režimy shody, s alternatives i podobná slova.
+        """
         print(f"Searching titles for: {query}")
-        conn = sqlite3.connect(self.db_path)
+        if matcher is not None:
+            return self.match_publications(matcher, 'title', pub_ids, limit)
+        if self.search_index.available:
+            rows = self.search_index.search_publications(query, 'title', pub_ids, limit, alternatives)
+            print(f"Found {len(rows)} matches in titles")
+            return rows
+
+        conn = Database.connect(self.db_path)
         cursor = conn.cursor()
-        
-        cursor.execute("""
+
+        scope_filter = ""
+        if pub_ids is not None:
+            create_scope_table(cursor, pub_ids)
+            scope_filter = "AND id IN (SELECT id FROM search_scope)"
+        cursor.execute(f"""
             SELECT id, title, author, year
             FROM publications
-            WHERE LOWER(title) LIKE LOWER(?)
-        """, (f'%{query}%',))
+            WHERE fold(title) LIKE ? {scope_filter}
+            LIMIT ?
+        """, (f'%{fold_text(query)}%', -1 if limit is None else limit))
+        
+        results = cursor.fetchall()
+        conn.close()
+
+        print(f"Found {len(results)} matches in titles")
         
+        # Kontext z popisu se sestaví až při zobrazení výsledku
+        pattern = self._literal_pattern(query)
+        return [(*result, LazySnippet('description', result[0], pattern, db_path=self.db_path))
+                for result in results]
+
+    def search_by_description(self, query, pub_ids=None, limit=None, matcher=None, alternatives=None):
+        """
+        Vyhledávání v popisech publikací (volitelně jen v pub_ids a s limitem).
+        S matcherem se použijí zvolené režimy shody, s alternatives i podobná slova.
+        """
+        print(f"Searching descriptions for: {query}")
+        if matcher is not None:
+            return self.match_publications(matcher, 'description', pub_ids, limit)
+        if self.search_index.available:
+            rows = self.search_index.search_publications(query, 'description', pub_ids, limit, alternatives)
+            print(f"Found {len(rows)} matches in descriptions")
+            return rows
+
+        # Bez indexu jeden dotaz nad sloupcem popisu, soubory se nečtou
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+
+        scope_filter = ""
+        if pub_ids is not None:
+            create_scope_table(cursor, pub_ids)
+            scope_filter = "AND id IN (SELECT id FROM search_scope)"
+        cursor.execute(f"""
+            SELECT id, title, author, year
+            FROM publications
+            WHERE fold(description) LIKE ? {scope_filter}
+            LIMIT ?
+        """, (f'%{fold_text(query)}%', -1 if limit is None else limit))
         results = cursor.fetchall()
         conn.close()
 
-        print(f"Found {len(results)} matches in titles")
-        
-        # Přidání kontextu z popisu pro každý výsledek
-        extended_results = []
-        for result in results:
-            pub_id = result[0]
-            desc_file = f"publications/{pub_id}/description.txt"
-            context = None
-            
-            if os.path.exists(desc_file):
-                try:
-                    with open(desc_file, 'r', encoding='utf-8') as f:
-                        description = f.read()
-                        if description:
-                            context = self._create_context_snippet(description, query)
-                except UnicodeDecodeError:
-                    with open(desc_file, 'r', encoding='windows-1250') as f:
-                        description = f.read()
-                        if description:
-                            context = self._create_context_snippet(description, query)
-            
-            extended_results.append((*result, context))
+        print(f"Found {len(results)} matches in descriptions")
+        pattern = self._literal_pattern(query)
+        return [(*result, LazySnippet('description', result[0], pattern, db_path=self.db_path))
+                for result in results]
+
+    def expand_fuzzy(self, query):
+        """
+        Ke slovům dotazu, která ve slovníku nejsou, najde podobná slova.
+
+        Returns:
+            dict: Složené slovo -> seznam podobných slov (prázdný bez indexu)
+        """
+        if not self.search_index.available:
+            return {}
+        vocabulary = FuzzyVocabulary.load(self.db_path)
+        alternatives = {}
+        for term in query.split():
+            folded = fold_text(term)
+            if folded and folded not in vocabulary:
+                similar = [word for word, _ in vocabulary.lookup(folded)]
+                if similar:
+                    alternatives[folded] = similar
+        return alternatives
+
+    def suggest_corrections(self, query, limit=3):
+        """Navrhne opravené dotazy pro "Měli jste na mysli" (nejbližší slova první)"""
+        terms = query.split()
+        alternatives = self.expand_fuzzy(query)
+        if not alternatives:
+            return []
+
+        suggestions = []
+        for rank in range(limit):
+            corrected = []
+            for term in terms:
+                similar = alternatives.get(fold_text(term))
+                corrected.append(similar[min(rank, len(similar) - 1)] if similar else term)
+            suggestion = " ".join(corrected)
+            if suggestion not in suggestions:
+                suggestions.append(suggestion)
+        return suggestions
+
+    def _prefilter(self, matcher):
+        """
+        Zvolí index pro předvýběr kandidátů matcheru. Vrací (dotaz, infix),
+        pro regulární výraz bez indexu (None, False).
+        """
+        if not matcher.use_regex and self.search_index.can_prefilter_infix(matcher.query):
+            return matcher.query, True
+        if matcher.index_prefilter:
+            return matcher.query, False
+        return None, False
+
+    def match_publications(self, matcher, column, pub_ids=None, limit=None, is_cancelled=None):
+        """
+        Vyhledá publikace podle matcheru v názvech ('title') nebo popisech
+        ('description'). Prochází uložený text, soubory se neotevírají.
+        """
+        if self._metadata is None:
+            self.refresh_metadata()
+        if self.search_index.available:
+            query, infix = self._prefilter(matcher)
+            documents = self.search_index.iter_documents(query, column, pub_ids, infix=infix)
+        else:
+            conn = Database.connect(self.db_path)
+            rows = conn.execute("SELECT id, title, description FROM publications ORDER BY id").fetchall()
+            conn.close()
+            documents = ((pub_id, title or "", description or "", None, None)
+                         for pub_id, title, description in rows
+                         if pub_ids is None or pub_id in pub_ids)
+
+        results = []
+        for index, (pub_id, title, description, title_folded, description_folded) in enumerate(documents):
+            if limit is not None and len(results) >= limit:
+                break
+            if is_cancelled and index % 500 == 0 and is_cancelled():
+                break
+            pub_info = self._get_publication_info(pub_id)
+            if not pub_info:
+                continue
+            if column == 'title':
+                matched = matcher.first_match(title, title_folded)
+            else:
+                matched = matcher.first_match(description, description_folded)
+            if matched:
+                results.append((*pub_info, self._matcher_snippet(matcher, 'description', pub_id)))
+
+        print(f"Found {len(results)} matches in {column}s")
+        return results
+
+    def match_pdf_pages(self, matcher, pub_id=None, pub_ids=None, limit=None, is_cancelled=None):
+        """
+        Vyhledá stránky PDF podle matcheru v uloženém textu stránek.
+
+        Returns:
+            list: Řádky (id, title, author, year, page, snippet)
+        """
+        if self.search_index.available:
+            query, infix = self._prefilter(matcher)
+            pages = self.search_index.iter_pdf_pages(query, pub_id, pub_ids, infix=infix)
+        else:
+            pdf_files = [pdf_file for pdf_file in self.get_all_pdf_files()
+                         if (pub_id is None or pdf_file[0] == pub_id)
+                         and (pub_ids is None or pdf_file[0] in pub_ids)]
+            pages = ((file_id, page_num, text, None)
+                     for file_id, pdf_path in pdf_files
+                     for page_num, text in enumerate(self.pdf_text_cache.get_pages(file_id, pdf_path), 1))
+
+        results = []
+        for index, (page_pub_id, page_num, text, folded) in enumerate(pages):
+            if limit is not None and len(results) >= limit:
+                break
+            if is_cancelled and index % 500 == 0 and is_cancelled():
+                break
+            if matcher.first_match(text, folded):
+                pub_info = self._get_publication_info(page_pub_id)
+                if pub_info:
+                    results.append((*pub_info, page_num,
+                                    self._matcher_snippet(matcher, 'pdf', page_pub_id, page_num)))
+        return results
+
+    def _matcher_snippet(self, matcher, source, pub_id, page=None):
+        """Odložený výňatek pro nález podle matcheru (vzor se hledá jako při vyhledávání)"""
+        return LazySnippet(source, pub_id, matcher.pattern, page=page,
+                           folded=not matcher.case_sensitive, db_path=self.db_path)
+
+    @staticmethod
+    def _literal_pattern(query):
+        """Vzor pro celý dotaz jako souvislý text (sekvenční hledání bez indexu)"""
+        return LazySnippet.terms_pattern((fold_text(query),))
+
+    def boolean_publication_ids(self, boolean_query, fields, pub_ids=None):
+        """
+        Vyhodnotí BooleanQuery nad indexem. Termy bez prefixu se hledají
+        v polích fields ('title', 'description', 'pdf').
+
+        Returns:
+            set: ID vyhovujících publikací (jen z pub_ids, pokud je zadáno)
+        """
+        if self._metadata is None:
+            self.refresh_metadata()
+        universe = set(self._metadata) if pub_ids is None else set(pub_ids) & set(self._metadata)
+        leaf_cache = {}
+        texts = {}
+
+        def scan_leaf_ids(field, text, phrase):
+            # Bez indexu se prochází složený text publikací a stránek PDF
+            if not texts:
+                conn = Database.connect(self.db_path)
+                texts['documents'] = {
+                    pub_id: {'title': fold_text(title), 'author': fold_text(author),
+                             'description': fold_text(description)}
+                    for pub_id, title, author, description
+                    in conn.execute("SELECT id, title, author, description FROM publications")
+                    if pub_id in universe
+                }
+                texts['pages'] = conn.execute("SELECT pub_id, folded FROM pdf_text_pages").fetchall()
+                conn.close()
+            term = fold_text(text)
+            columns = [field] if field and field != 'pdf' else ([] if field else
+                      [name for name in fields if name != 'pdf'])
+            found = {pub_id for pub_id, document in texts['documents'].items()
+                     if any(term in document[column] for column in columns)}
+            if field == 'pdf' or (field is None and 'pdf' in fields):
+                found.update(pub_id for pub_id, folded in texts['pages'] if folded and term in folded)
+            return found
+
+        def leaf_ids(field, text, phrase):
+            key = (field, text, phrase)
+            if key not in leaf_cache:
+                if self.search_index.available:
+                    leaf_cache[key] = self.search_index.boolean_leaf_ids(field, text, phrase, fields)
+                else:
+                    leaf_cache[key] = scan_leaf_ids(field, text, phrase)
+            return leaf_cache[key]
+
+        return boolean_query.evaluate(leaf_ids, universe)
+
+    def search_boolean(self, boolean_query, fields, pub_ids=None, limit=None):
+        """
+        Vyhledá publikace podle BooleanQuery. Každá publikace je ve výsledcích
+        jednou - jako nález v názvu, v popisu, nebo na první stránce PDF
+        s některým z kladných termů (v tomto pořadí).
+
+        Returns:
+            list: Dvojice (výsledek, typ)
+        """
+        pub_ids = self.boolean_publication_ids(boolean_query, fields, pub_ids)
+        if not pub_ids:
+            return []
+
+        positive = boolean_query.positive_terms()
+        any_terms = [fold_text(text) for field, text in positive if field is None]
+        title_terms = any_terms + [fold_text(text) for field, text in positive if field == 'title']
+        page_terms = any_terms + [fold_text(text) for field, text in positive if field == 'pdf']
+        pattern = LazySnippet.terms_pattern(tuple(fold_text(text) for _, text in positive))
+
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        create_scope_table(cursor, pub_ids)
+        cursor.execute("SELECT id, fold(title) FROM publications WHERE id IN (SELECT id FROM search_scope)")
+        titles = dict(cursor.fetchall())
+        descriptions = {}
+        if 'description' in fields and any_terms:
+            if self.search_index.available:
+                cursor.execute('''
+                    SELECT rowid, description_folded FROM publications_fts
+                    WHERE rowid IN (SELECT id FROM search_scope)
+                ''')
+                descriptions = dict(cursor.fetchall())
+            else:
+                cursor.execute('''
+                    SELECT id, fold(description) FROM publications
+                    WHERE id IN (SELECT id FROM search_scope)
+                ''')
+                descriptions = dict(cursor.fetchall())
+        first_pages = {}
+        if page_terms and ('pdf' in fields or boolean_query.uses_field('pdf')):
+            condition = " OR ".join("instr(folded, ?) > 0" for _ in page_terms)
+            cursor.execute(f'''
+                SELECT pub_id, MIN(page_num) FROM pdf_text_pages
+                WHERE pub_id IN (SELECT id FROM search_scope) AND ({condition})
+                GROUP BY pub_id
+            ''', page_terms)
+            first_pages = dict(cursor.fetchall())
+        conn.close()
+
+        title_pairs, description_pairs, pdf_pairs = [], [], []
+        for pub_id in sorted(pub_ids):
+            pub_info = self._get_publication_info(pub_id)
+            if not pub_info:
+                continue
+            snippet = LazySnippet('description', pub_id, pattern, db_path=self.db_path)
+            if 'title' in fields and any(term in titles.get(pub_id, "") for term in title_terms):
+                title_pairs.append(((*pub_info, snippet), 'title'))
+            elif any(term in (descriptions.get(pub_id) or "") for term in any_terms):
+                description_pairs.append(((*pub_info, snippet), 'description'))
+            elif pub_id in first_pages:
+                page = first_pages[pub_id]
+                pdf_pairs.append(((*pub_info, page,
+                                   LazySnippet('pdf', pub_id, pattern, page=page, db_path=self.db_path)), 'pdf'))
+            else:
+                # Shoda jen v autorovi nebo jen díky negaci
+                title_pairs.append(((*pub_info, snippet), 'title'))
 
-        return extended_results
+        results = title_pairs + description_pairs + pdf_pairs
+        print(f"Found {len(results)} matches for boolean query")
+        return results if limit is None else results[:limit]
 
-    def search_by_description(self, query):
-        """Vyhledávání v popisech publikací"""
-        print(f"Searching descriptions for: {query}")
-        results = []
-        for pub_id in self._get_all_publication_ids():
-            desc_file = f"publications/{pub_id}/description.txt"
-            if os.path.exists(desc_file):
-                try:
-                    with open(desc_file, 'r', encoding='utf-8') as f:
-                        description = f.read()
-                except UnicodeDecodeError:
-                    with open(desc_file, 'r', encoding='windows-1250') as f:
-                        description = f.read()
-                
-                if query.lower() in description.lower():
-                    snippet = self._create_context_snippet(description, query)
-                    pub_info = self._get_publication_info(pub_id)
-                    if pub_info:
-                        results.append((*pub_info, snippet))
-        
-        print(f"Found {len(results)} matches in descriptions")
-        return results
+    def narrow_results(self, pairs, query):
+        """
+        Zúží předchozí výsledky na ty, které obsahují všechny termy prodlouženého
+        dotazu. Prochází jen uložený text dříve nalezených publikací a stránek.
+
+        Returns:
+            list: Zúžené dvojice (výsledek, typ), nebo None, pokud zúžení nelze použít
+        """
+        terms = self.search_index.infix_terms(query)
+        if terms is None:
+            return None
+
+        documents, pages = self._load_folded_texts(pairs)
+        pattern = LazySnippet.terms_pattern(tuple(terms))
+        narrowed = []
+        for result, result_type in pairs:
+            if result_type == 'pdf':
+                folded = pages.get((result[0], result[4]))
+                if folded and all(term in folded for term in terms):
+                    snippet = LazySnippet('pdf', result[0], pattern, page=result[4], db_path=self.db_path)
+                    narrowed.append(((*result[:5], snippet), 'pdf'))
+                continue
+            if result[0] not in documents:
+                continue
+            title_folded, description_folded = documents[result[0]]
+            folded = title_folded if result_type == 'title' else description_folded
+            if all(term in (folded or "") for term in terms):
+                snippet = LazySnippet('description', result[0], pattern, db_path=self.db_path)
+                narrowed.append(((*result[:4], snippet), result_type))
+
+        print(f"Narrowed {len(pairs)} previous results to {len(narrowed)}")
+        return narrowed
+
+    def rank_results(self, pairs, query, weights=None):
+        """
+        Seřadí výsledky sestupně podle relevance (RelevanceScorer). Při shodě
+        skóre zůstává původní pořadí z indexu.
+        """
+        scorer = RelevanceScorer(query, weights)
+        if not pairs or not scorer.terms or not self.search_index.available:
+            return list(pairs)
+
+        documents, pages = self._load_folded_texts(pairs)
+        scores = []
+        for result, result_type in pairs:
+            if result_type == 'pdf':
+                folded = pages.get((result[0], result[4]))
+            else:
+                document = documents.get(result[0], (None, None))
+                folded = document[0] if result_type == 'title' else document[1]
+            scores.append(scorer.score(result_type, folded))
+
+        order = sorted(range(len(pairs)), key=lambda index: -scores[index])
+        return [pairs[index] for index in order]
+
+    def _load_folded_texts(self, pairs):
+        """
+        Načte uložený složený text výsledků jedním průchodem databází.
+
+        Returns:
+            tuple: ({id: (title_folded, description_folded)}, {(id, page): folded})
+        """
+        pub_ids = {result[0] for result, _ in pairs}
+        page_keys = {(result[0], result[4]) for result, result_type in pairs if result_type == 'pdf'}
+
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        create_scope_table(cursor, pub_ids)
+        cursor.execute('''
+            SELECT f.rowid, f.title_folded, f.description_folded
+            FROM publications_fts f
+            WHERE f.rowid IN (SELECT id FROM search_scope)
+        ''')
+        documents = {row[0]: row[1:] for row in cursor.fetchall()}
+        pages = {}
+        if page_keys:
+            cursor.execute('''
+                SELECT pub_id, page_num, folded
+                FROM pdf_text_pages
+                WHERE pub_id IN (SELECT id FROM search_scope)
+            ''')
+            pages = {(row[0], row[1]): row[2] for row in cursor.fetchall()
+                     if (row[0], row[1]) in page_keys}
+        conn.close()
+        return documents, pages
+
+    def get_publication_ids_in_years(self, year_from, year_to):
+        """Vrátí ID publikací vydaných v zadaném rozsahu let (podle indexu roku)"""
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM publications WHERE year BETWEEN ? AND ?", (year_from, year_to))
+        pub_ids = {row[0] for row in cursor.fetchall()}
+        conn.close()
+        return pub_ids
 
     def search_in_pdf(self, query):
         """
@@ -1116,126 +3716,162 @@ class SearchManager:
         """
         results = []
         print(f"Starting PDF search for query: {query}")
+
+        if self.search_index.available:
+            self.refresh_pdf_text(self.get_all_pdf_files())
+            results = self.search_index.search_pdf_pages(query)
+            print(f"PDF search completed. Found {len(results)} results")
+            return results
         
-        # Získání všech ID publikací
-        publication_ids = self._get_all_publication_ids()
-        print(f"Found {len(publication_ids)} publications to search")
+        # Získání všech publikací
+        self.refresh_metadata()
+        print(f"Found {len(self._metadata)} publications to search")
+        query_folded = fold_text(query)
+        pattern = self._literal_pattern(query)
         
-        for pub_id in publication_ids:
+        for pub_id, pub_info in self._metadata.items():
             pdf_file = self._find_pdf_file(pub_id)
             if pdf_file:
-                print(f"Processing PDF file: {pdf_file}")
-                try:
-                    with open(pdf_file, 'rb') as file:
-                        pdf_reader = PyPDF2.PdfReader(file)
-                        total_pages = len(pdf_reader.pages)
-                        print(f"PDF has {total_pages} pages")
-                        
-                        for page_num in range(total_pages):
-                            try:
-                                text = pdf_reader.pages[page_num].extract_text()
-                                if text and query.lower() in text.lower():
-                                    snippet = self._create_context_snippet(text, query)
-                                    pub_info = self._get_publication_info(pub_id)
-                                    if pub_info:
-                                        print(f"Found match in publication {pub_id} on page {page_num + 1}")
-                                        results.append((*pub_info, page_num + 1, snippet))
-                            except Exception as e:
-                                print(f"Error extracting text from page {page_num}: {e}")
-                                continue
-                                
-                except Exception as e:
-                    print(f"Error processing PDF {pdf_file}: {e}")
-                    continue
+                pages = self.pdf_text_cache.get_pages(pub_id, pdf_file)
+                for page_num, text in enumerate(pages):
+                    if text and query_folded in fold_text(text):
+                        snippet = LazySnippet('pdf', pub_id, pattern, page=page_num + 1, db_path=self.db_path)
+                        if pub_info:
+                            print(f"Found match in publication {pub_id} on page {page_num + 1}")
+                            results.append((*pub_info, page_num + 1, snippet))
                 
         print(f"PDF search completed. Found {len(results)} results")
         return results
 
     def _get_all_publication_ids(self):
         """Získá ID všech publikací z databáze."""
-        conn = sqlite3.connect(self.db_path)
+        conn = Database.connect(self.db_path)
         cursor = conn.cursor()
         cursor.execute("SELECT id FROM publications")
         ids = [row[0] for row in cursor.fetchall()]
         conn.close()
         return ids
 
-    def _get_publication_info(self, pub_id):
-        """Získá základní informace o publikaci."""
-        conn = sqlite3.connect(self.db_path)
+    def sync_index(self):
+        """Před prvním vyhledáváním doplní index o změny provedené mimo aplikaci"""
+        if not self._index_synced:
+            self.search_index.sync()
+            self._index_synced = True
+
+    def refresh_metadata(self):
+        """Načte základní údaje všech publikací jedním dotazem"""
+        conn = Database.connect(self.db_path)
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, title, author, year
-            FROM publications
-            WHERE id = ?
-        """, (pub_id,))
-        result = cursor.fetchone()
+        cursor.execute("SELECT id, title, author, year FROM publications")
+        self._metadata = {row[0]: row for row in cursor.fetchall()}
         conn.close()
-        return result
+
+    def _get_publication_info(self, pub_id):
+        """Získá základní informace o publikaci ze sdílené mapy metadat."""
+        if self._metadata is None:
+            self.refresh_metadata()
+        return self._metadata.get(pub_id)
 
     def _find_pdf_file(self, pub_id):
+        """Vrátí cestu k PDF souboru publikace podle evidence souborů."""
+        return self.file_manifest.get_pdf(pub_id)
+
+    def refresh_pdf_text(self, pdf_files, is_cancelled=None, progress_callback=None,
+                         executor=None, file_callback=None):
         """
-        Vylepšená verze hledání PDF souboru s lepším ošetřením cest.
+        Extrahuje text PDF souborů, které v cache chybí nebo se změnily,
+        aby je fulltextový index obsahoval. S předaným executorem se soubory
+        zpracují paralelně v samostatných procesech. Po uložení každého
+        souboru se volá file_callback(pub_id, pdf_path).
         """
-        # Získání absolutní cesty k adresáři publications
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        pub_dir = os.path.join(base_dir, "publications", str(pub_id))
-        
-        print(f"Checking for PDF in directory: {pub_dir}")
-        
-        if os.path.exists(pub_dir):
-            for file in os.listdir(pub_dir):
-                if file.endswith('.pdf'):
-                    pdf_path = os.path.join(pub_dir, file)
-                    print(f"Found PDF file: {pdf_path}")
-                    return pdf_path
-                    
-        print(f"No PDF file found for publication {pub_id}")
-        return None
+        stale_files = self.pdf_text_cache.stale_files(pdf_files)
+
+        if executor is not None and len(stale_files) > 1:
+            futures = {}
+            try:
+                for pub_id, pdf_path in stale_files:
+                    futures[executor.submit(extract_pdf_pages, pdf_path)] = (pub_id, pdf_path)
+            except RuntimeError:
+                # Pool byl mezitím ukončen zrušením vyhledávání
+                pass
+            # Text se ukládá hned, jak který soubor doběhne
+            for index, future in enumerate(as_completed(futures)):
+                if is_cancelled and is_cancelled():
+                    break
+                pub_id, pdf_path = futures[future]
+                try:
+                    pages = future.result()
+                except CancelledError:
+                    continue
+                except Exception as e:
+                    print(f"Error processing PDF {pdf_path}: {e}")
+                    continue
+                self.pdf_text_cache.store_pages(pub_id, pdf_path, pages)
+                if progress_callback:
+                    progress_callback(index + 1, len(stale_files))
+                if file_callback:
+                    file_callback(pub_id, pdf_path)
+            return
 
-    def _create_context_snippet(self, text, query, context_size=50):
+        for index, (pub_id, pdf_path) in enumerate(stale_files):
+            if is_cancelled and is_cancelled():
+                break
+            if progress_callback:
+                progress_callback(index + 1, len(stale_files))
+            self.pdf_text_cache.get_pages(pub_id, pdf_path)
+            if file_callback:
+                file_callback(pub_id, pdf_path)
+
+    def get_all_pdf_files(self, pub_ids=None):
+        """Získá seznam PDF souborů evidovaných publikací (volitelně jen z pub_ids)"""
+        if self._metadata is None:
+            self.refresh_metadata()
+        if pub_ids is not None:
+            return [(pub_id, pdf_path) for pub_id in sorted(pub_ids)
+                    if pub_id in self._metadata and (pdf_path := self.file_manifest.get_pdf(pub_id))]
+        return [(pub_id, pdf_path) for pub_id, pdf_path in self.file_manifest.pdf_files()
+                if pub_id in self._metadata]
+
+    def get_category_publication_ids(self, category_type, category, subcategory=None,
+                                     categories_db='categories.db'):
         """
-        Vytvoří výňatek textu s zvýrazněním nalezeného výrazu.
-        
-        Args:
-            text (str): Prohledávaný text
-            query (str): Hledaný výraz
-            context_size (int): Počet znaků před a za nalezeným výrazem
-            
+        Vrátí ID publikací v kategorii (nebo její podkategorii) včetně celého
+        podstromu kategorií. Strom se projde jedním rekurzivním dotazem.
+
         Returns:
-            str: Formátovaný výňatek textu s zvýrazněným nálezem
+            set: ID publikací (prázdná množina, pokud kategorie neexistuje)
         """
-        query_lower = query.lower()
-        text_lower = text.lower()
-        start_idx = text_lower.find(query_lower)
-        
-        if start_idx == -1:
-            return ""
-        
-        # Výpočet začátku a konce kontextu
-        snippet_start = max(0, start_idx - context_size)
-        snippet_end = min(len(text), start_idx + len(query) + context_size)
-        
-        # Příprava částí textu
-        prefix = "..." if snippet_start > 0 else ""
-        before_match = text[snippet_start:start_idx]
-        match = text[start_idx:start_idx + len(query)]  # Původní text (ne převedený na malá písmena)
-        after_match = text[start_idx + len(query):snippet_end]
-        suffix = "..." if snippet_end < len(text) else ""
-        
-        # Sestavení výsledku s HTML značkami pro zvýraznění
-        highlighted_text = f"{prefix}{before_match}<span style='color: #FFD700; font-weight: bold;'>{match}</span>{after_match}{suffix}"
-        
-        return highlighted_text
-    
-    def get_all_pdf_files(self):
-        """Získá seznam všech PDF souborů"""
-        pdf_files = []
-        for pub_id in self._get_all_publication_ids():
-            pdf_file = self._find_pdf_file(pub_id)
-            if pdf_file:
-                pdf_files.append((pub_id, pdf_file))
-        return pdf_files
+        if category_type not in ('books', 'magazines', 'datasheets', 'others'):
+            return set()
+
+        conn = Database.connect(self.db_path)
+        cursor = conn.cursor()
+        try:
+            Database.attach(conn, categories_db, 'cat')
+            if subcategory:
+                root_filter = """name = ? AND parent_id IN
+                    (SELECT id FROM cat.{0}_categories WHERE name = ? AND parent_id IS NULL)"""
+                root_params = (subcategory, category)
+            else:
+                root_filter = "name = ? AND parent_id IS NULL"
+                root_params = (category,)
+            cursor.execute(f"""
+                WITH RECURSIVE subtree(id) AS (
+                    SELECT id FROM cat.{category_type}_categories
+                    WHERE {root_filter.format(category_type)}
+                    UNION
+                    SELECT c.id FROM cat.{category_type}_categories c
+                    JOIN subtree s ON c.parent_id = s.id
+                )
+                SELECT p.id FROM publications p
+                WHERE p.category_type = ? AND p.category_id IN (SELECT id FROM subtree)
+            """, (*root_params, category_type))
+            return {row[0] for row in cursor.fetchall()}
+        except sqlite3.Error as e:
+            print(f"Chyba při hledání kategorie: {e}")
+            return set()
+        finally:
+            conn.close()
 
     def search_in_single_pdf(self, pdf_info, query):
         """
@@ -1246,55 +3882,20 @@ class SearchManager:
         print(f"\nSearching in PDF: {pdf_path}")
         print(f"Looking for query: '{query}'")
 
-        try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                total_pages = len(pdf_reader.pages)
-                
-                for page_num in range(total_pages):
-                    try:
-                        text = pdf_reader.pages[page_num].extract_text()
-                        if not text:
-                            continue
-                            
-                        text_lower = text.lower()
-                        query_lower = query.lower()
-                        start_pos = 0
-                        
-                        while True:
-                            pos = text_lower.find(query_lower, start_pos)
-                            if pos == -1:
-                                break
-                                
-                            # Vytvoření zvýrazněného kontextu
-                            context_size = 50
-                            snippet_start = max(0, pos - context_size)
-                            snippet_end = min(len(text), pos + len(query) + context_size)
-                            
-                            before = text[snippet_start:pos]
-                            match = text[pos:pos + len(query)]
-                            after = text[pos + len(query):snippet_end]
-                            
-                            prefix = "..." if snippet_start > 0 else ""
-                            suffix = "..." if snippet_end < len(text) else ""
-                            
-                            # Vytvoření HTML pro zvýraznění
-                            snippet = f"{prefix}{before}<span style='color: #FFD700; font-weight: bold;'>{match}</span>{after}{suffix}"
-                            
-                            pub_info = self._get_publication_info(pub_id)
-                            if pub_info:
-                                results.append((*pub_info, page_num + 1, snippet))
-                            
-                            start_pos = pos + len(query)
-                            
-                    except Exception as e:
-                        print(f"Error processing page {page_num + 1}: {str(e)}")
-                        continue
-                    
-        except Exception as e:
-            print(f"Error opening PDF {pdf_path}: {str(e)}")
+        pub_info = self._get_publication_info(pub_id)
+        if not pub_info:
             return results
 
+        pages = self.pdf_text_cache.get_pages(pub_id, pdf_path)
+        query_lower = fold_text(query)
+        pattern = self._literal_pattern(query)
+
+        # Jeden výsledek na stránku, výňatky se sestaví až při zobrazení
+        for page_num, text in enumerate(pages, 1):
+            if text and query_lower in fold_text(text):
+                results.append((*pub_info, page_num,
+                                LazySnippet('pdf', pub_id, pattern, page=page_num, db_path=self.db_path)))
+
         print(f"Found {len(results)} results in this PDF")
         return results
     
@@ -1315,24 +3916,28 @@ class SearchManager:
         
         return f"{prefix}{before}**{match}**{after}{suffix}"
 
-    def clear_cache(self):
-        """Vymaže všechny cache"""
-        self._title_cache.clear()
-        self._description_cache.clear()
-        self._pdf_cache.clear()
-
-    def optimize_cache(self):
-        """Optimalizuje velikost cache"""
-        # Omezení velikosti jednotlivých cache
-        max_cache_size = 1000
-        
-        for cache in [self._title_cache, self._description_cache, self._pdf_cache]:
-            while len(cache) > max_cache_size:
-                cache.pop(next(iter(cache)))
+    @classmethod
+    def clear_cache(cls):
+        """Vymaže uložené výsledky vyhledávání"""
+        cls.result_cache.clear()
+
+    @classmethod
+    def optimize_cache(cls):
+        """Odstraní zneplatněné výsledky a omezí velikost cache"""
+        cls.result_cache.prune()
+
+    @classmethod
+    def cache_stats(cls):
+        """Statistika cache výsledků (záznamy, zásahy, úspěšnost)"""
+        return cls.result_cache.stats()
     
 class SearchWidget(QWidget):
     # Signály pro komunikaci s ostatními komponentami
     search_results = pyqtSignal(list, str)  # Výsledky a typ vyhledávání
+    results_started = pyqtSignal(str)  # Začátek průběžného zobrazení výsledků
+    results_appended = pyqtSignal(list)  # Další dávka výsledků
+    results_finished = pyqtSignal(str, int)  # Konec výsledků, řazení a limit při zkrácení (0 = úplné)
+    results_ranked = pyqtSignal(list)  # Pořadí výsledků podle relevance (klíče výsledků)
     search_started = pyqtSignal()  # Signál pro začátek vyhledávání
     search_completed = pyqtSignal()  # Signál pro konec vyhledávání
 
@@ -1345,10 +3950,22 @@ class SearchWidget(QWidget):
         self.favorite_searches = []
         self.current_search_params = {}
         self.advanced_settings = {}
+        # Běžící workery nahrazené novějším vyhledáváním, dobíhají na pozadí
+        self._retired_workers = []
+        # Poslední dokončené vyhledávání (parametry, výsledky, zkrácení, generace dat)
+        self._last_results = None
+
+        # Živé vyhledávání se spouští až po odmlce v psaní
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.timeout.connect(self.run_live_search)
         
         # Načtení výchozího nastavení
         search_settings = self.settings_manager.get_setting('ui', 'search') if self.settings_manager else {}
         default_checkboxes = search_settings.get('default_checkboxes', {})
+        # Výňatky nálezů se sestavují až při zobrazení podle nastavení
+        LazySnippet.context_size = search_settings.get('context_size', 50)
+        LazySnippet.max_windows = search_settings.get('snippet_windows', 1)
         
         self.init_ui()
         
@@ -1403,6 +4020,10 @@ class SearchWidget(QWidget):
         self.search_input = QLineEdit()
         StyleHelper.apply_text_widget_style(self.search_input)
         self.search_input.setPlaceholderText("Zadejte hledaný text...")
+        self.search_input.setToolTip(
+            "Lze použít AND, OR, NOT (nebo -slovo), závorky, \"přesnou frázi\"\n"
+            "a prefixy polí title:, author:, pdf: (např. title:LM317 -obsolete)"
+        )
 
         # Panel pro tlačítka pokročilých funkcí
         advanced_button_panel = QHBoxLayout()
@@ -1448,6 +4069,13 @@ class SearchWidget(QWidget):
         self.status_label.setStyleSheet("color: white;")
         self.status_label.hide()
 
+        # Návrh opraveného dotazu, když vyhledávání nic nenajde
+        self.suggestion_label = QLabel("")
+        self.suggestion_label.setStyleSheet("color: white;")
+        self.suggestion_label.setWordWrap(True)
+        self.suggestion_label.linkActivated.connect(self.apply_suggestion)
+        self.suggestion_label.hide()
+
         # Tlačítko pro vyhledávání
         self.search_button = QPushButton("Vyhledat")
         StyleHelper.apply_button_style(self.search_button)
@@ -1467,6 +4095,7 @@ class SearchWidget(QWidget):
         search_layout.addWidget(checkboxes_frame)
         search_layout.addWidget(self.progress_bar)
         search_layout.addWidget(self.status_label)
+        search_layout.addWidget(self.suggestion_label)
         search_layout.addLayout(search_buttons_layout)
         
         # Přidání do hlavního layoutu
@@ -1511,6 +4140,7 @@ class SearchWidget(QWidget):
 
     def start_search(self):
         """Spustí vyhledávání s aktuálními parametry"""
+        self.live_timer.stop()
         query = self.search_input.text()
         
         if query:
@@ -1525,31 +4155,101 @@ class SearchWidget(QWidget):
             )
             return
 
+        # Neplatný regulární výraz nebo chybný dotaz se ohlásí ještě před spuštěním
+        params = {'query': query, **self.advanced_settings}
+        try:
+            matcher = TextMatcher.from_params(params)
+        except re.error as e:
+            StyleHelper.create_message_box(
+                "Upozornění",
+                f"Neplatný regulární výraz: {e}",
+                "warning",
+                self
+            )
+            return
+        try:
+            BooleanQuery.from_search_params(params, matcher is None)
+        except ValueError as e:
+            StyleHelper.create_message_box(
+                "Upozornění",
+                f"Chybný dotaz: {e}",
+                "warning",
+                self
+            )
+            return
+
+        self._launch_search(query)
+
+    def _ranking_weights(self):
+        """Vrátí váhy řazení podle relevance z nastavení, nebo None, je-li vypnuté"""
+        if not self.settings_manager:
+            return dict(RelevanceScorer.DEFAULT_WEIGHTS)
+        if not self.settings_manager.get_setting('ui', 'search', 'ranking_enabled', default=True):
+            return None
+        weights = self.settings_manager.get_setting('ui', 'search', 'ranking_weights', default={})
+        return {**RelevanceScorer.DEFAULT_WEIGHTS, **weights}
+
+    def run_live_search(self):
+        """Spustí živé vyhledávání v názvech a popisech po odmlce v psaní"""
+        query = self.search_input.text()
+        if not query.strip():
+            return
+        if not (self.cb_title.isChecked() or self.cb_description.isChecked()):
+            return
+        # Rozepsaný regulární výraz nebo dotaz se při psaní tiše přeskočí
+        params = {'query': query, **self.advanced_settings}
+        try:
+            BooleanQuery.from_search_params(params, TextMatcher.from_params(params) is None)
+        except (re.error, ValueError):
+            return
+        self._launch_search(query, live=True)
+
+    def _launch_search(self, query, live=False):
+        """
+        Sestaví parametry a spustí nový worker. Předchozí běžící worker se
+        zruší bez čekání. Živé vyhledávání neprochází PDF a neukládá se do historie.
+        """
+        self._retire_worker()
+
         # Sloučení základních a pokročilých parametrů vyhledávání
         self.current_search_params = {
             'query': query,
             'search_in_title': self.cb_title.isChecked(),
             'search_in_description': self.cb_description.isChecked(),
-            'search_in_pdf': self.cb_pdf.isChecked(),
+            'search_in_pdf': self.cb_pdf.isChecked() and not live,
             'timestamp': datetime.now(),
+            'pdf_workers': self.settings_manager.get_setting(
+                'ui', 'search', 'pdf_workers', default=os.cpu_count() or 1
+            ) if self.settings_manager else 1,
+            'ranking': self._ranking_weights(),
             **self.advanced_settings  # Přidání pokročilých nastavení
         }
 
-        self.search_worker = SearchWorker(self.current_search_params, self.search_manager)
+        self.search_worker = SearchWorker(
+            self.current_search_params, self.search_manager,
+            previous_results=self._narrowable_results(self.current_search_params)
+        )
+        self.search_worker.is_live = live
+        self.pending_sort = ''
+        self.truncated_limit = 0
+        self.pending_suggestions = []
         
         # Připojení signálů
         self.search_worker.progress.connect(self.update_progress)
         self.search_worker.result_found.connect(self.on_result_found)
+        self.search_worker.results_batch.connect(self.results_appended.emit)
         self.search_worker.search_completed.connect(self.on_search_completed)
         self.search_worker.status_message.connect(self.update_status)
         
         # Nastavení UI pro vyhledávání
+        self.suggestion_label.hide()
         self.progress_bar.setValue(0)
         self.progress_bar.show()
         self.status_label.show()
         self.search_button.hide()
         self.cancel_button.show()
         self.search_started.emit()
+        self.results_started.emit('combined')
         
         # Spuštění vyhledávání
         self.search_worker.start()
@@ -1591,8 +4291,10 @@ class SearchWidget(QWidget):
                 criteria.append("Rozlišovat velikost písmen")
             if settings.get('use_regex'):
                 criteria.append("Použít regulární výrazy")
-            if settings.get('partial_match'):
-                criteria.append("Povolit částečnou shodu")
+            if settings.get('whole_word'):
+                criteria.append("Pouze celá slova")
+            if settings.get('fuzzy'):
+                criteria.append("Tolerovat překlepy")
                 
             # Maximum výsledků
             if settings.get('max_results') and settings['max_results'] != 100:
@@ -1612,10 +4314,79 @@ class SearchWidget(QWidget):
 
     def cancel_search(self):
         """Zruší probíhající vyhledávání"""
+        self.live_timer.stop()
         if hasattr(self, 'search_worker'):
             self.search_worker.cancel()
             self.update_status("Vyhledávání se ukončuje...")
 
+    def _retire_worker(self):
+        """
+        Odpojí a zruší běžící worker, aniž by se na něj čekalo v GUI vlákně.
+        Worker dobíhá na pozadí a jeho výsledky se už nezobrazí.
+        """
+        worker = getattr(self, 'search_worker', None)
+        if worker is None or not worker.isRunning():
+            return
+        for signal in (worker.progress, worker.result_found, worker.results_batch,
+                       worker.search_completed, worker.status_message):
+            try:
+                signal.disconnect()
+            except TypeError:
+                pass
+        worker.cancel()
+        self._retired_workers.append(worker)
+        worker.finished.connect(self._forget_retired_worker)
+        if worker.isFinished():
+            self._retired_workers.remove(worker)
+
+    def stop_workers(self, timeout=3000):
+        """
+        Zruší aktivní i odpojené workery a počká na jejich doběhnutí
+        (při zavření aplikace), na každý nejvýše timeout milisekund.
+        """
+        self.live_timer.stop()
+        workers = list(self._retired_workers)
+        worker = getattr(self, 'search_worker', None)
+        if worker is not None:
+            workers.append(worker)
+        for worker in workers:
+            worker.cancel()
+        for worker in workers:
+            if not worker.wait(timeout):
+                print("Vyhledávání se nepodařilo včas ukončit")
+
+    def _forget_retired_worker(self):
+        """Uvolní odpojený worker po jeho doběhnutí"""
+        worker = self.sender()
+        if worker in self._retired_workers:
+            self._retired_workers.remove(worker)
+
+    def _narrowable_results(self, params):
+        """
+        Vrátí výsledky předchozího vyhledávání, pokud nový dotaz jen prodlužuje
+        ten předchozí a výsledky lze zúžit v paměti, jinak None.
+        """
+        if self._last_results is None:
+            return None
+        last_params, results, truncated, generation = self._last_results
+        if truncated or generation != DataGeneration.current:
+            return None
+        if any(params.get(mode) for mode in ('case_sensitive', 'use_regex', 'whole_word', 'fuzzy')):
+            return None
+        if any(BooleanQuery.is_structured(search.get('query', '')) for search in (last_params, params)):
+            return None
+
+        cache = self.search_manager.result_cache
+        old_query, old_params = cache.make_key(last_params)
+        new_query, new_params = cache.make_key(params)
+        if old_params != new_params or new_query == old_query or not new_query.startswith(old_query):
+            return None
+        # Předchozí výsledky musí pocházet z hledání částí slov (trigramy),
+        # jinak by zúžená množina neodpovídala novému hledání
+        if self.search_manager.search_index.infix_terms(last_params.get('query', '')) is None:
+            return None
+        return results
+
     def update_progress(self, value):
         """Aktualizuje progress bar"""
         self.progress_bar.setValue(value)
@@ -1634,6 +4405,15 @@ class SearchWidget(QWidget):
                     self.search_results_widget.switch_to_grid_view()
                 elif data == 'Seznam':
                     self.search_results_widget.switch_to_list_view()
+        elif command == 'sort':
+            # Řazení se provede až po doručení všech dávek
+            self.pending_sort = data
+        elif command == 'truncated':
+            self.truncated_limit = data
+        elif command == 'suggestions':
+            self.pending_suggestions = data
+        elif command == 'ranked':
+            self.results_ranked.emit(data)
         elif command == 'all':
             self.search_results.emit(data, 'combined')
         
@@ -1643,12 +4423,39 @@ class SearchWidget(QWidget):
         self.status_label.hide()
         self.cancel_button.hide()
         self.search_button.show()
+        self.results_finished.emit(getattr(self, 'pending_sort', ''), getattr(self, 'truncated_limit', 0))
         self.search_completed.emit()
-        
-        # Ukončení workeru
-        if hasattr(self, 'search_worker'):
-            self.search_worker.quit()
-            self.search_worker.wait()
+
+        worker = getattr(self, 'search_worker', None)
+        if worker is None or worker.is_cancelled:
+            return
+
+        # Výsledky se zapamatují pro zúžení při prodloužení dotazu
+        self._last_results = (
+            self.current_search_params, list(getattr(worker, '_collected', [])),
+            getattr(worker, 'truncated', False), getattr(worker, 'generation', None)
+        )
+
+        # Prázdný výsledek - nabídnout opravu překlepů, návrhy připravil SearchWorker
+        self.show_suggestions(getattr(self, 'pending_suggestions', []))
+
+    def show_suggestions(self, suggestions):
+        """Zobrazí "Měli jste na mysli" s podobnými dotazy ze slovníku publikací"""
+        if not suggestions:
+            self.suggestion_label.hide()
+            return
+        links = ", ".join(
+            f"<a href='{html.escape(suggestion, quote=True)}' style='color: #FFD700;'>{html.escape(suggestion)}</a>"
+            for suggestion in suggestions
+        )
+        self.suggestion_label.setText(f"Měli jste na mysli: {links}?")
+        self.suggestion_label.show()
+
+    def apply_suggestion(self, suggestion):
+        """Použije navržený dotaz a spustí vyhledávání znovu"""
+        self.suggestion_label.hide()
+        self.search_input.setText(suggestion)
+        self.start_search()
 
     def show_advanced_search(self):
         """Otevře dialog pro pokročilé vyhledávání"""
@@ -1676,8 +4483,14 @@ class SearchWidget(QWidget):
         self.start_search()
 
     def on_search_text_changed(self, text):
-        """Handler pro změnu textu ve vyhledávacím poli"""
-        pass
+        """Handler pro změnu textu ve vyhledávacím poli - plánuje živé vyhledávání"""
+        if not self.settings_manager or not self.settings_manager.get_setting(
+                'ui', 'search', 'live_search', default=False):
+            return
+        if not text.strip():
+            self.live_timer.stop()
+            return
+        self.live_timer.start(self.settings_manager.get_setting('ui', 'search', 'live_delay', default=300))
 
     def update_search_params(self):
         """Aktualizuje parametry vyhledávání"""
@@ -1709,6 +4522,11 @@ class SearchResultsWidget(QWidget):
         self.MAIN_WINDOW_CARD_WIDTH = 680  # Šířka karty pro seznam
         self.MAIN_WINDOW_GRID_CARD_WIDTH = 330  # Šířka karty pro mřížku
         self.CARD_SPACING = 10  # Spacing mezi kartami
+
+        self.current_view = 'list'
+        self._cards_layout = None  # Mřížka s kartami aktuálního zobrazení
+        self._cards = []  # Dvojice (výsledek, karta) v pořadí zobrazení
+        self._streaming_external = False
         
         self.init_ui()  
 
@@ -1762,26 +4580,238 @@ class SearchResultsWidget(QWidget):
         top_layout.addLayout(view_buttons_row)
         top_layout.addLayout(info_row)
 
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setStyleSheet("""
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_area.setStyleSheet("""
+            QScrollArea {
+                border: none;
+                background-color: transparent;
+            }
+        """)
+
+        self.results_container = QWidget()
+        self.results_layout = QVBoxLayout(self.results_container)
+        self.results_layout.setSpacing(10)
+        self.results_layout.setAlignment(Qt.AlignTop)
+        self.scroll_area.setWidget(self.results_container)
+
+        layout.addWidget(top_panel)
+        layout.addWidget(self.scroll_area)
+
+        self.list_view_btn.clicked.connect(self.switch_to_list_view)
+        self.grid_view_btn.clicked.connect(self.switch_to_grid_view)
+        self.sort_combo.currentTextChanged.connect(self.sort_results)
+
+    def begin_results(self, search_type):
+        """Připraví widget na průběžné přidávání výsledků"""
+        self.original_results = []
+        self._arrival_results = []
+        self.original_search_type = search_type
+
+        # S externím oknem se výsledky jen shromažďují a zobrazí na konci
+        main_window = self.window()
+        self._streaming_external = (
+            isinstance(main_window, QMainWindow)
+            and main_window.settings_manager.get_setting('ui', 'view', 'use_external_window')
+        )
+        if self._streaming_external:
+            return
+
+        if self.settings_manager:
+            default_view = self.settings_manager.get_setting('ui', 'view', 'default_view', default='Seznam')
+            self.current_view = 'grid' if default_view == 'Mřížka' else 'list'
+            self.list_view_btn.setChecked(self.current_view == 'list')
+            self.grid_view_btn.setChecked(self.current_view == 'grid')
+
+        self.sort_combo.blockSignals(True)
+        self.sort_combo.setCurrentText("Relevance")
+        self.sort_combo.blockSignals(False)
+
+        self._clear_results()
+        self.results_count.setText("Nalezeno: 0 výsledků")
+        self._create_cards_container()
+
+    def append_results(self, batch):
+        """Přidá dávku výsledků na konec aktuálního zobrazení"""
+        if not hasattr(self, 'original_results'):
+            self.begin_results('combined')
+        self.original_results.extend(batch)
+        self._arrival_results.extend(batch)
+        if self._streaming_external:
+            return
+
+        if self._cards_layout is None:
+            self._create_cards_container()
+        for result_pair in batch:
+            self._add_card(result_pair)
+        self.results_count.setText(f"Nalezeno: {len(self.original_results)} výsledků")
+
+    def finish_results(self, sort_by='', truncated_limit=0):
+        """Dokončí průběžné zobrazení - jednou seřadí výsledky a zobrazí filtry"""
+        if truncated_limit and not self._streaming_external:
+            self.results_count.setText(
+                f"Nalezeno: {len(self.original_results)} výsledků "
+                f"(zkráceno na limit {truncated_limit})"
+            )
+
+        if sort_by:
+            combo_text = {'Název': 'Názvu', 'Autor': 'Autora', 'Rok': 'Roku'}.get(sort_by, sort_by)
+            self.sort_combo.blockSignals(True)
+            self.sort_combo.setCurrentText(combo_text)
+            self.sort_combo.blockSignals(False)
+            self.sort_results(sort_by)
+
+        main_window = self.window()
+        if self._streaming_external:
+            self._streaming_external = False
+            if self.original_results:
+                main_window.open_search_results_window(self.original_results, self.original_search_type)
+            return
+
+        # Zobrazení filtrů pouze v hlavním okně
+        if isinstance(main_window, QMainWindow) and hasattr(main_window, 'filters_widget'):
+            if self.original_results:
+                main_window.bottom_right_layout.addWidget(main_window.filters_widget)
+                main_window.filters_widget.show()
+                main_window.filters_widget.raise_()
+            else:
+                main_window.filters_widget.hide()
+
+    def apply_ranking(self, result_keys):
+        """Přeskupí výsledky podle pořadí relevance z workeru"""
+        if not hasattr(self, 'original_results'):
+            return
+        rank = {key: index for index, key in enumerate(result_keys)}
+        arrival = getattr(self, '_arrival_results', self.original_results)
+        self._arrival_results = sorted(
+            arrival, key=lambda pair: rank.get(RelevanceScorer.result_key(pair), len(rank))
+        )
+        if self.sort_combo.currentText() == "Relevance":
+            self.sort_results("Relevance")
+
+    @staticmethod
+    def _year_sort_key(result_pair):
+        """Klíč pro řazení podle roku (neznámý rok na konec)"""
+        try:
+            return (0, int(str(result_pair[0][3])))
+        except (IndexError, ValueError, TypeError):
+            return (1, 0)
+
+    def sort_results(self, sort_by):
+        """
+        Seřadí výsledky. Existující karty se pouze přeskupí v mřížce,
+        nevytvářejí se znovu.
+        """
+        if not hasattr(self, 'original_results'):
+            return
+
+        if sort_by in ('Název', 'Názvu'):
+            key = lambda pair: str(pair[0][1] or '').lower()
+        elif sort_by in ('Autor', 'Autora'):
+            key = lambda pair: str(pair[0][2] or '').lower()
+        elif sort_by in ('Rok', 'Roku'):
+            key = self._year_sort_key
+        else:
+            key = None
+
+        arrival = getattr(self, '_arrival_results', self.original_results)
+        self.original_results = sorted(arrival, key=key) if key else list(arrival)
+
+        if self._cards_layout is None or len(self._cards) != len(self.original_results):
+            if not self._streaming_external:
+                self._display_current_view()
+            return
+
+        # Přeskupení existujících karet
+        if key:
+            self._cards.sort(key=lambda item: key(item[0]))
+        else:
+            order = {id(pair): index for index, pair in enumerate(arrival)}
+            self._cards.sort(key=lambda item: order.get(id(item[0]), 0))
+
+        columns = self._view_columns()
+        for _, card in self._cards:
+            self._cards_layout.removeWidget(card)
+        for index, (_, card) in enumerate(self._cards):
+            self._cards_layout.addWidget(card, index // columns, index % columns)
+
+    def _view_columns(self):
+        """Počet sloupců karet pro aktuální zobrazení a typ okna"""
+        if getattr(self, 'is_external_window', False):
+            return (self.external_grid_columns if self.current_view == 'grid'
+                    else self.external_list_columns)
+        return 2 if self.current_view == 'grid' else 1
+
+    def _create_card_for_view(self, result_data, result_type):
+        """Vytvoří kartu výsledku odpovídající aktuálnímu zobrazení"""
+        if self.current_view == 'grid':
+            if result_type == 'title':
+                card = self._create_title_grid_card(result_data)
+            elif result_type == 'description':
+                card = self._create_description_grid_card(result_data)
+            else:
+                card = self._create_pdf_grid_card(result_data)
+            card.setFixedWidth(self.MAIN_WINDOW_GRID_CARD_WIDTH)
+        else:
+            card = self._create_result_card(result_data, result_type)
+            card.setFixedWidth(self.MAIN_WINDOW_CARD_WIDTH)
+        return card
+
+    def _add_card(self, result_pair):
+        """Přidá kartu výsledku na další volnou pozici mřížky"""
+        card = self._create_card_for_view(*result_pair)
+        index = len(self._cards)
+        columns = self._view_columns()
+        self._cards_layout.addWidget(card, index // columns, index % columns)
+        self._cards.append((result_pair, card))
+
+    def _create_cards_container(self):
+        """Vytvoří posuvný kontejner s mřížkou pro karty výsledků"""
+        # Vytvoření hlavního kontejneru
+        main_container = QWidget()
+        main_layout = QVBoxLayout(main_container)
+        main_layout.setContentsMargins(10, 10, 10, 10)
+        main_layout.setSpacing(10)
+        
+        # Grid layout pro karty
+        grid_widget = QWidget()
+        grid_layout = QGridLayout(grid_widget)
+        grid_layout.setSpacing(20)
+        grid_layout.setContentsMargins(0, 0, 0, 0)
+        grid_layout.setAlignment(Qt.AlignTop)
+
+        main_layout.addWidget(grid_widget)
+        main_layout.addStretch()
+        
+        scroll_area = QScrollArea()
+        scroll_area.setWidget(main_container)
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded if hasattr(self, 'is_external_window') else Qt.ScrollBarAlwaysOff)
+        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        scroll_area.setStyleSheet("""
             QScrollArea {
                 border: none;
-                background-color: transparent;
+                background: transparent;
+            }
+            QScrollBar:vertical {
+                background: #444444;
+                width: 12px;
+                margin: 0px;
+            }
+            QScrollBar::handle:vertical {
+                background: #666666;
+                min-height: 20px;
+                border-radius: 6px;
+            }
+            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+                height: 0px;
             }
         """)
-
-        self.results_container = QWidget()
-        self.results_layout = QVBoxLayout(self.results_container)
-        self.results_layout.setSpacing(10)
-        self.results_layout.setAlignment(Qt.AlignTop)
-        self.scroll_area.setWidget(self.results_container)
-
-        layout.addWidget(top_panel)
-        layout.addWidget(self.scroll_area)
-
-        self.list_view_btn.clicked.connect(self.switch_to_list_view)
-        self.grid_view_btn.clicked.connect(self.switch_to_grid_view)
+        
+        self.results_layout.addWidget(scroll_area)
+        self._cards_layout = grid_layout
+        self._cards = []
+        return grid_layout
 
     def show_results(self, results, search_type):
         """Zobrazí výsledky vyhledávání"""
@@ -1798,6 +4828,7 @@ class SearchResultsWidget(QWidget):
 
         # Uložení původních výsledků
         self.original_results = results
+        self._arrival_results = list(results)
         self.original_search_type = search_type
         
         # Nastavení výchozího zobrazení podle settings_manager
@@ -1926,6 +4957,8 @@ class SearchResultsWidget(QWidget):
             item = self.results_layout.takeAt(0)
             if item.widget():
                 item.widget().deleteLater()
+        self._cards_layout = None
+        self._cards = []
         self.results_container.update()
 
     def clear_all_results(self):
@@ -2125,77 +5158,12 @@ class SearchResultsWidget(QWidget):
         """Zobrazí výsledky v mřížce"""
         if not hasattr(self, 'original_results') or not self.original_results:
             return
-                    
+
+        self.current_view = 'grid'
         self._clear_results()
-        
-        # Určení počtu sloupců podle typu okna
-        columns = 2  # Výchozí hodnota pro hlavní okno
-        if hasattr(self, 'is_external_window') and self.is_external_window:
-            columns = self.external_grid_columns
-        
-        # Vytvoření hlavního kontejneru
-        main_container = QWidget()
-        main_layout = QVBoxLayout(main_container)
-        main_layout.setContentsMargins(10, 10, 10, 10)
-        main_layout.setSpacing(10)
-        
-        # Grid layout pro karty
-        grid_widget = QWidget()
-        grid_layout = QGridLayout(grid_widget)
-        grid_layout.setSpacing(20)
-        grid_layout.setContentsMargins(0, 0, 0, 0)
-        grid_layout.setAlignment(Qt.AlignTop)
-        
-        # Rozmístění karet
-        row = 0
-        col = 0
-        
-        for result_data, result_type in self.original_results:
-            if result_type == 'title':
-                card = self._create_title_grid_card(result_data)
-            elif result_type == 'description':
-                card = self._create_description_grid_card(result_data)
-            elif result_type == 'pdf':
-                card = self._create_pdf_grid_card(result_data)
-                
-            card.setFixedWidth(self.MAIN_WINDOW_GRID_CARD_WIDTH)
-            grid_layout.addWidget(card, row, col)
-            
-            col += 1
-            if col >= columns:
-                col = 0
-                row += 1
-        
-        main_layout.addWidget(grid_widget)
-        main_layout.addStretch()
-        
-        scroll_area = QScrollArea()
-        scroll_area.setWidget(main_container)
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded if hasattr(self, 'is_external_window') else Qt.ScrollBarAlwaysOff)
-        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        scroll_area.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background: transparent;
-            }
-            QScrollBar:vertical {
-                background: #444444;
-                width: 12px;
-                margin: 0px;
-            }
-            QScrollBar::handle:vertical {
-                background: #666666;
-                min-height: 20px;
-                border-radius: 6px;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-        """)
-        
-        self.results_layout.addWidget(scroll_area)
-        
+        self._create_cards_container()
+        for result_pair in self.original_results:
+            self._add_card(result_pair)
     
     def _create_title_grid_card(self, result):
         """Vytvoří kartu pro výsledek vyhledávání v názvu"""
@@ -2544,32 +5512,23 @@ class SearchResultsWidget(QWidget):
     
     def open_pdf_at_page(self, pub_id, page_number):
         """Otevře PDF soubor na konkrétní stránce."""
-        pub_dir = f"publications/{pub_id}"
-        if os.path.exists(pub_dir):
-            for file in os.listdir(pub_dir):
-                if file.endswith('.pdf'):
-                    pdf_path = os.path.join(pub_dir, file)
-                    try:
-                        # Cesta k SumatraPDF
-                        sumatra_path = "C:\\Program Files\\SumatraPDF\\SumatraPDF.exe"
-                        if os.path.exists(sumatra_path):
-                            import subprocess
-                            subprocess.Popen([sumatra_path, '-page', str(page_number), pdf_path])
-                        else:
-                            os.startfile(pdf_path)
-                    except Exception as e:
-                        print(f"Chyba při otevírání PDF: {e}")
-                        os.startfile(pdf_path)
-                    break
+        pdf_path = FileManifest().get_pdf(pub_id)
+        if pdf_path:
+            try:
+                # Cesta k SumatraPDF
+                sumatra_path = "C:\\Program Files\\SumatraPDF\\SumatraPDF.exe"
+                if os.path.exists(sumatra_path):
+                    import subprocess
+                    subprocess.Popen([sumatra_path, '-page', str(page_number), pdf_path])
+                else:
+                    os.startfile(pdf_path)
+            except Exception as e:
+                print(f"Chyba při otevírání PDF: {e}")
+                os.startfile(pdf_path)
 
     def _find_cover_image(self, pub_id):
         """Najde cestu k náhledu publikace."""
-        pub_dir = f"publications/{pub_id}"
-        if os.path.exists(pub_dir):
-            for file in os.listdir(pub_dir):
-                if file.startswith("cover"):
-                    return os.path.join(pub_dir, file)
-        return None
+        return FileManifest().get_cover(pub_id)
     
     def switch_to_list_view(self):
         """Přepne na zobrazení seznamu"""
@@ -2582,67 +5541,9 @@ class SearchResultsWidget(QWidget):
         if not hasattr(self, 'original_results'):
             return
 
-        # Určení počtu sloupců podle typu okna
-        columns = 1  # Výchozí hodnota pro hlavní okno
-        if hasattr(self, 'is_external_window') and self.is_external_window:
-            columns = self.external_list_columns
-            
-        # Vytvoření hlavního kontejneru
-        main_container = QWidget()
-        main_layout = QVBoxLayout(main_container)
-        main_layout.setContentsMargins(10, 10, 10, 10)
-        main_layout.setSpacing(10)
-        
-        # Grid layout pro karty
-        grid_widget = QWidget()
-        grid_layout = QGridLayout(grid_widget)
-        grid_layout.setSpacing(20)
-        grid_layout.setContentsMargins(0, 0, 0, 0)
-        grid_layout.setAlignment(Qt.AlignTop)
-        
-        # Rozmístění karet do sloupců
-        row = 0
-        col = 0
-        
-        for result_data, result_type in self.original_results:
-            card = self._create_result_card(result_data, result_type)
-            card.setFixedWidth(self.MAIN_WINDOW_CARD_WIDTH)
-            grid_layout.addWidget(card, row, col)
-            
-            col += 1
-            if col >= columns:
-                col = 0
-                row += 1
-                
-        main_layout.addWidget(grid_widget)
-        main_layout.addStretch()
-        
-        scroll_area = QScrollArea()
-        scroll_area.setWidget(main_container)
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded if hasattr(self, 'is_external_window') else Qt.ScrollBarAlwaysOff)
-        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        scroll_area.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background: transparent;
-            }
-            QScrollBar:vertical {
-                background: #444444;
-                width: 12px;
-                margin: 0px;
-            }
-            QScrollBar::handle:vertical {
-                background: #666666;
-                min-height: 20px;
-                border-radius: 6px;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-        """)
-        
-        self.results_layout.addWidget(scroll_area)
+        self._create_cards_container()
+        for result_pair in self.original_results:
+            self._add_card(result_pair)
         
     def switch_to_grid_view(self):
         """Přepne na zobrazení mřížky"""
@@ -3633,7 +6534,10 @@ class AdvancedSearchWindow(QDialog, StyleHelper):
         keywords_layout.addWidget(self.keywords_input)
 
         self.match_type = QComboBox()
-        self.match_type.addItems(["Všechna slova", "Libovolné slovo", "Přesná fráze"])
+        self.match_type.addItems(["Všechna slova", "Libovolné slovo", "Přesná fráze", "Dotazovací jazyk"])
+        self.match_type.setToolTip(
+            "Dotazovací jazyk: AND, OR, NOT (nebo -slovo), závorky, \"fráze\" a pole title:, author:, pdf:"
+        )
         StyleHelper.apply_small_combobox_style(self.match_type)
 
         text_layout.addLayout(keywords_layout)
@@ -3674,6 +6578,9 @@ class AdvancedSearchWindow(QDialog, StyleHelper):
         self.case_sensitive = QCheckBox("Rozlišovat velikost písmen")
         self.use_regex = QCheckBox("Použít regulární výrazy") 
         self.partial_match = QCheckBox("Povolit částečnou shodu")
+        # Bez částečné shody se hledají jen celá slova
+        self.partial_match.setChecked(True)
+        self.fuzzy_match = QCheckBox("Tolerovat překlepy")
         
         checkbox_style = """
             QCheckBox {
@@ -3697,7 +6604,7 @@ class AdvancedSearchWindow(QDialog, StyleHelper):
             }
         """
         
-        for checkbox in [self.case_sensitive, self.use_regex, self.partial_match]:
+        for checkbox in [self.case_sensitive, self.use_regex, self.partial_match, self.fuzzy_match]:
             checkbox.setStyleSheet(checkbox_style)
             match_layout.addWidget(checkbox)
 
@@ -4014,8 +6921,10 @@ class AdvancedSearchWindow(QDialog, StyleHelper):
             criteria.append("Rozlišovat velikost písmen")
         if self.use_regex.isChecked():
             criteria.append("Použít regulární výrazy")
-        if self.partial_match.isChecked():
-            criteria.append("Povolit částečnou shodu")
+        if not self.partial_match.isChecked():
+            criteria.append("Pouze celá slova")
+        if self.fuzzy_match.isChecked():
+            criteria.append("Tolerovat překlepy")
         if self.max_results.value() != 100:
             criteria.append(f"Maximum výsledků: {self.max_results.value()}")
         
@@ -4150,6 +7059,7 @@ class AdvancedSearchWindow(QDialog, StyleHelper):
             'case_sensitive': self.case_sensitive.isChecked(),
             'use_regex': self.use_regex.isChecked(),
             'partial_match': self.partial_match.isChecked(),
+            'fuzzy': self.fuzzy_match.isChecked(),
             'max_results': self.max_results.value(),
             'view_type': self.view_type.currentText(),
             'sort_by': self.sort_by.currentText()
@@ -4187,7 +7097,8 @@ class AdvancedSearchWindow(QDialog, StyleHelper):
         # Nastavení způsobu vyhledávání
         self.case_sensitive.setChecked(settings.get('case_sensitive', False))
         self.use_regex.setChecked(settings.get('use_regex', False))
-        self.partial_match.setChecked(settings.get('partial_match', False))
+        self.partial_match.setChecked(settings.get('partial_match', True))
+        self.fuzzy_match.setChecked(settings.get('fuzzy', False))
         self.max_results.setValue(settings.get('max_results', 100))
 
         # Nastavení zobrazení
@@ -4224,8 +7135,10 @@ class AdvancedSearchWindow(QDialog, StyleHelper):
             filtered_settings['case_sensitive'] = True
         if settings.get('use_regex'):
             filtered_settings['use_regex'] = True
-        if settings.get('partial_match'):
-            filtered_settings['partial_match'] = True
+        if not settings.get('partial_match'):
+            filtered_settings['whole_word'] = True
+        if settings.get('fuzzy'):
+            filtered_settings['fuzzy'] = True
 
         # Zobrazení a řazení
         if settings.get('view_type') != 'Seznam':
@@ -4289,190 +7202,408 @@ class AdvancedSearchWindow(QDialog, StyleHelper):
 class SearchWorker(QThread):
     progress = pyqtSignal(int)  # Signál pro průběh (0-100)
     result_found = pyqtSignal(tuple)  # Signál pro nalezený výsledek
+    results_batch = pyqtSignal(list)  # Dávka výsledků z jednoho kroku nebo souboru
     search_completed = pyqtSignal()  # Signál pro dokončení
     status_message = pyqtSignal(str)  # Signál pro stavové zprávy
 
-    def __init__(self, search_params, search_manager):
+    def __init__(self, search_params, search_manager, previous_results=None):
         super().__init__()
         self.search_params = search_params
         self.search_manager = search_manager
+        # Výsledky předchozího dotazu, který nový dotaz jen prodlužuje
+        self.previous_results = previous_results
+        self.is_live = False
         self.is_cancelled = False
-        self._results_cache = {}
+        self.matcher = None
+        self.alternatives = None
+        # Dotaz s operátory a filtr klíčových slov (BooleanQuery, jinak None)
+        self.boolean_query = None
+        self.keywords_query = None
+        # Kandidáti pro výběr nejlepších výsledků podle relevance (jinak None)
+        self._pool = None
+        self._executor = None
         self.total_progress = 0
         self.current_progress = 0
 
     def run(self):
-        """Provede vyhledávání podle zadaných parametrů"""
+        """Provede vyhledávání a nalezené výsledky průběžně odesílá po dávkách"""
         try:
             query = self.search_params.get('query', '')
-            all_results = []
-
-            # Výpočet celkového počtu kroků
-            self.total_steps = 0
-            if self.search_params.get('search_in_title'):
-                self.total_steps += 1
-            if self.search_params.get('search_in_description'):
-                self.total_steps += 1
-            if self.search_params.get('search_in_pdf'):
-                self.total_steps += 1
-
-            self.current_step = 0
-
-            # Získání parametrů filtrování kategorií 
-            tab = self.search_params.get('tab')
-            category = self.search_params.get('category')
-            subcategory = self.search_params.get('subcategory')
-            allowed_pub_ids = None
-
-            if tab and category:
-                # Připojení k databázi kategorií
-                conn = sqlite3.connect('categories.db')
-                cursor = conn.cursor()
-                
-                category_type = {
-                    "Knihy": "books",
-                    "Časopisy": "magazines", 
-                    "Datasheets": "datasheets",
-                    "Ostatní": "others"
-                }.get(tab)
+            self.results_count = 0
+            self.truncated = False
+            self._collected = []
+
+            # Režimy shody (velikost písmen, regulární výraz, celá slova)
+            # se zkompilují jednou pro celé vyhledávání
+            try:
+                self.matcher = TextMatcher.from_params(self.search_params)
+            except re.error as e:
+                self.status_message.emit(f"Neplatný regulární výraz: {e}")
+                return
+
+            # Dotazovací jazyk (AND/OR/NOT, fráze, pole) a klíčová slova
+            try:
+                self.boolean_query, self.keywords_query = BooleanQuery.from_search_params(
+                    self.search_params, self.matcher is None
+                )
+            except ValueError as e:
+                self.status_message.emit(f"Chybný dotaz: {e}")
+                return
 
-                if category_type:
-                    try:
-                        if subcategory:
-                            # Získání ID podkategorie
-                            cursor.execute("""
-                                SELECT id FROM {}_categories 
-                                WHERE name = ? AND parent_id IN 
-                                    (SELECT id FROM {}_categories WHERE name = ?)
-                            """.format(category_type, category_type), (subcategory, category))
-                        else:
-                            # Získání ID kategorie
-                            cursor.execute("""
-                                SELECT id FROM {}_categories 
-                                WHERE name = ?
-                            """.format(category_type), (category,))
-                        
-                        category_id = cursor.fetchone()
-                        
-                        if category_id:
-                            # Přepnutí na databázi publikací
-                            cursor.close()
-                            conn.close()
-                            conn = sqlite3.connect('publications.db')
-                            cursor = conn.cursor()
-                            
-                            cursor.execute("""
-                                SELECT id FROM publications
-                                WHERE category_id = ? AND category_type = ?
-                            """, (category_id[0], category_type))
-                            allowed_pub_ids = {row[0] for row in cursor.fetchall()}
-                    except Exception as e:
-                        print(f"Chyba při hledání kategorie: {e}")
-                    finally:
-                        cursor.close()
-                        conn.close()
-
-            # Vyhledávání v názvech
-            if self.search_params.get('search_in_title'):
-                self.status_message.emit("Vyhledávání v názvech...")
-                print("\nSearching in titles")
-                title_results = self.search_manager.search_by_title(query)
-                if title_results:
-                    filtered_results = [r for r in title_results 
-                                        if not allowed_pub_ids or r[0] in allowed_pub_ids]
-                    for result in filtered_results:
-                        all_results.append((result, 'title'))
-                self.current_step += 1
-                self.update_progress()
-
-            # Vyhledávání v popisech
-            if self.search_params.get('search_in_description'):
-                self.status_message.emit("Vyhledávání v popisech...")
-                print("\nSearching in descriptions")
-                desc_results = self.search_manager.search_by_description(query)
-                if desc_results:
-                    filtered_results = [r for r in desc_results
-                                        if not allowed_pub_ids or r[0] in allowed_pub_ids]
-                    for result in filtered_results:
-                        all_results.append((result, 'description'))
-                self.current_step += 1
-                self.update_progress()
-
-            # Vyhledávání v PDF
-            if self.search_params.get('search_in_pdf'):
-                self.status_message.emit("Vyhledávání v PDF souborech...")
-                print("\nStarting PDF search")
-                pdf_files = self.search_manager.get_all_pdf_files()
-                
-                if allowed_pub_ids:
-                    pdf_files = [(pub_id, path) for pub_id, path in pdf_files 
-                                if pub_id in allowed_pub_ids]
-                
-                for pdf_file in pdf_files:
-                    if self.is_cancelled:
-                        break
-                    
-                    results_for_file = self.search_manager.search_in_single_pdf(
-                        pdf_file, 
-                        query
-                    )
-                    
-                    if results_for_file:
-                        for result in results_for_file:
-                            all_results.append((result, 'pdf'))
-
-                self.current_step += 1
-                self.update_progress()
-
-            # Filtrování podle roku
-            if year_range := self.search_params.get('year_range'):
-                filtered_results = []
-                for result_tuple in all_results:
-                    result, result_type = result_tuple
-                    try:
-                        if isinstance(result[3], (int, str)) and result[3]:
-                            year = int(str(result[3]))
-                            if year_range['from'] <= year <= year_range['to']:
-                                filtered_results.append(result_tuple)
-                    except (IndexError, ValueError, TypeError):
-                        continue
-                all_results = filtered_results
-                
-            # Aplikování limitu počtu výsledků
             max_results = self.search_params.get('max_results')
-            if max_results and isinstance(max_results, int):
-                all_results = all_results[:max_results]
+            self.max_results = max_results if isinstance(max_results, int) and max_results > 0 else None
 
-             # Nejdřív odešleme všechny výsledky
-            if all_results:
-                self.result_found.emit(('all', all_results))
-                
-            # Pak teprve aplikujeme nastavení zobrazení
+            # Typ zobrazení se nastaví ještě před prvními výsledky
             if view_type := self.search_params.get('view_type'):
                 self.result_found.emit(('view_type', view_type))
-                
-            # Řazení výsledků
+
+            # Stejné vyhledávání nad nezměněnými daty se vrátí z cache
+            result_cache = self.search_manager.result_cache
+            cache_key = result_cache.make_key(self.search_params)
+            self.generation = generation = DataGeneration.current
+            cached = result_cache.get(cache_key)
+            narrowed = None
+            ranking = self.search_params.get('ranking')
+            if cached is None and ranking and self.max_results is not None:
+                # S limitem se výsledky nejdřív seberou ze všech kroků
+                # a zobrazí se až nejlepší z nich
+                self._pool = []
+            if cached is None and self.previous_results is not None:
+                # Prodloužený dotaz stačí ověřit nad předchozími výsledky
+                self.status_message.emit("Zužování předchozích výsledků...")
+                narrowed = self.search_manager.narrow_results(self.previous_results, query)
+            if cached is not None:
+                results, self.truncated = cached
+                self.status_message.emit("Výsledky z mezipaměti")
+                self._emit_batch(results)
+                self.progress.emit(100)
+            elif narrowed is not None:
+                self._emit_batch(narrowed)
+                self.progress.emit(100)
+                self._apply_ranking(self._ranking_query(query), ranking)
+                if not self.is_cancelled:
+                    result_cache.put(cache_key, self._collected, self.truncated, generation)
+            else:
+                self._run_stages(query)
+                self._apply_ranking(self._ranking_query(query), ranking)
+                if not self.is_cancelled:
+                    result_cache.put(cache_key, self._collected, self.truncated, generation)
+
+            # Informace o zkrácení výsledků limitem
+            if self.truncated:
+                self.result_found.emit(('truncated', self.max_results))
+
+            # Prázdný výsledek - návrhy oprav překlepů (ne během psaní a u dotazů s operátory),
+            # slovník se prochází zde, mimo vlákno GUI
+            if (self.results_count == 0 and not self.is_live and self.boolean_query is None
+                    and query.strip() and not self.is_cancelled):
+                suggestions = self.search_manager.suggest_corrections(query)
+                if suggestions:
+                    self.result_found.emit(('suggestions', suggestions))
+
+            # Řazení proběhne jednou, nad již zobrazenými výsledky
             sort_by = self.search_params.get('sort_by')
-            if sort_by:
-                if sort_by == 'Název':
-                    all_results.sort(key=lambda x: x[0][1])
-                elif sort_by == 'Autor':
-                    all_results.sort(key=lambda x: x[0][2] or '')
-                elif sort_by == 'Rok':
-                    all_results.sort(key=lambda x: x[0][3] or 0)
-
-            # Odeslání všech výsledků najednou
-            print(f"\nSearch completed. Total results: {len(all_results)}")
-            if all_results:
-                self.result_found.emit(('all', all_results))
+            if sort_by and sort_by != 'Relevance' and not self.is_cancelled:
+                self.result_found.emit(('sort', sort_by))
+
+            print(f"\nSearch completed. Total results: {self.results_count}")
+
+        except Exception as e:
+            self.status_message.emit(f"Chyba při vyhledávání: {str(e)}")
+            print(f"Chyba vyhledávání: {str(e)}")
+            import traceback
+            traceback.print_exc()
+        finally:
+            self.search_completed.emit()
+
+    def _run_stages(self, query):
+        """Prohledá názvy, popisy a PDF podle parametrů vyhledávání"""
+        # Tolerance překlepů - slova dotazu se doplní podobnými slovy ze slovníku
+        self.alternatives = None
+        if self.search_params.get('fuzzy') and self.matcher is None and self.boolean_query is None:
+            self.alternatives = self.search_manager.expand_fuzzy(query)
+
+        # Metadata publikací se pro celé vyhledávání načtou jedním dotazem
+        self.search_manager.sync_index()
+        self.search_manager.refresh_metadata()
+
+        # Publikace mimo kategorii a rozsah let se vyřadí dřív,
+        # než se otevřou jejich soubory
+        scope_ids = self._resolve_allowed_pub_ids()
+        if year_range := self.search_params.get('year_range'):
+            year_ids = self.search_manager.get_publication_ids_in_years(
+                year_range['from'], year_range['to']
+            )
+            scope_ids = year_ids if scope_ids is None else scope_ids & year_ids
+
+        # Klíčová slova omezí okruh publikací jako další filtr
+        if self.keywords_query is not None:
+            scope_ids = self.search_manager.boolean_publication_ids(
+                self.keywords_query, ('title', 'author', 'description'), scope_ids
+            )
+
+        if self.boolean_query is not None:
+            self._run_boolean(scope_ids)
+            return
+
+        pdf_files = []
+        if self.search_params.get('search_in_pdf'):
+            # Při omezení kategorií se berou jen soubory jejích publikací
+            pdf_files = self.search_manager.get_all_pdf_files(pub_ids=scope_ids)
+
+        # Průběh se počítá po jednotlivých krocích a PDF souborech
+        self.total_steps = len(pdf_files)
+        if self.search_params.get('search_in_title'):
+            self.total_steps += 1
+        if self.search_params.get('search_in_description'):
+            self.total_steps += 1
+        self.current_step = 0
+
+        # Vyhledávání v názvech
+        if self.search_params.get('search_in_title') and self._should_continue():
+            self.status_message.emit("Vyhledávání v názvech...")
+            print("\nSearching in titles")
+            title_results = self.search_manager.search_by_title(
+                query, pub_ids=scope_ids, limit=self._stage_limit(), matcher=self.matcher,
+                alternatives=self.alternatives
+            )
+            self._emit_batch([(result, 'title') for result in title_results])
+            self._advance_progress()
+
+        # Vyhledávání v popisech
+        if self.search_params.get('search_in_description') and self._should_continue():
+            self.status_message.emit("Vyhledávání v popisech...")
+            print("\nSearching in descriptions")
+            desc_results = self.search_manager.search_by_description(
+                query, pub_ids=scope_ids, limit=self._stage_limit(), matcher=self.matcher,
+                alternatives=self.alternatives
+            )
+            self._emit_batch([(result, 'description') for result in desc_results])
+            self._advance_progress()
+
+        # Vyhledávání v PDF
+        if pdf_files and self._should_continue():
+            self.status_message.emit("Vyhledávání v PDF souborech...")
+            print("\nStarting PDF search")
+            self._search_pdf_files(query, pdf_files)
+
+    def _run_boolean(self, scope_ids):
+        """Vyhodnotí dotaz s operátory jako množinové operace nad indexem"""
+        fields = tuple(field for field, param in (('title', 'search_in_title'),
+                                                  ('description', 'search_in_description'),
+                                                  ('pdf', 'search_in_pdf'))
+                       if self.search_params.get(param))
+        self.total_steps = 2
+        self.current_step = 0
+
+        # Text nových a změněných PDF musí být v indexu dřív, než se dotaz vyhodnotí
+        if 'pdf' in fields or self.boolean_query.uses_field('pdf'):
+            pdf_files = self.search_manager.get_all_pdf_files(pub_ids=scope_ids)
+            stale_files = self.search_manager.pdf_text_cache.stale_files(pdf_files)
+            if stale_files:
+                pdf_workers = self.search_params.get('pdf_workers', 1)
+                if pdf_workers and pdf_workers > 1:
+                    self._executor = create_pdf_executor(pdf_workers)
+                try:
+                    self.search_manager.refresh_pdf_text(
+                        stale_files,
+                        is_cancelled=lambda: self.is_cancelled,
+                        progress_callback=lambda done, total: self.status_message.emit(
+                            f"Zpracování PDF souborů ({done}/{total})..."
+                        ),
+                        executor=self._executor
+                    )
+                finally:
+                    self._shutdown_executor()
+        self._advance_progress()
+
+        if not self._should_continue():
+            return
+        self.status_message.emit("Vyhodnocení dotazu...")
+        print("\nSearching with boolean query")
+        self._emit_batch(self.search_manager.search_boolean(
+            self.boolean_query, fields, pub_ids=scope_ids, limit=self._stage_limit()
+        ))
+        self._advance_progress()
+
+    def _ranking_query(self, query):
+        """Text pro hodnocení relevance - u dotazu s operátory jen kladné termy"""
+        if self.boolean_query is None:
+            return query
+        return " ".join(text for _, text in self.boolean_query.positive_terms())
+
+    def _resolve_allowed_pub_ids(self):
+        """
+        Vrátí množinu ID publikací ve zvolené kategorii včetně všech jejích
+        podkategorií, nebo None, pokud vyhledávání není omezeno kategorií
+        """
+        tab = self.search_params.get('tab')
+        category = self.search_params.get('category')
+        category_type = {
+            "Knihy": "books",
+            "Časopisy": "magazines",
+            "Datasheets": "datasheets",
+            "Ostatní": "others"
+        }.get(tab)
+
+        if not category_type or not category:
+            return None
+        return self.search_manager.get_category_publication_ids(
+            category_type, category, self.search_params.get('subcategory')
+        )
+
+    def _search_pdf_files(self, query, pdf_files):
+        """
+        Prohledá PDF soubory a výsledky odesílá po souborech. Soubory s textem
+        v cache se prohledají hned, ostatní jakmile doběhne jejich extrakce.
+        """
+        search_index = self.search_manager.search_index
+        stale_ids = {pub_id for pub_id, _ in self.search_manager.pdf_text_cache.stale_files(pdf_files)}
+        cached_files = [pdf_file for pdf_file in pdf_files if pdf_file[0] not in stale_ids]
+
+        def search_pages(pub_id=None, pub_ids=None):
+            # Se zvolenými režimy shody se prochází uložený text stránek
+            if self.matcher is not None:
+                return self.search_manager.match_pdf_pages(
+                    self.matcher, pub_id=pub_id, pub_ids=pub_ids, limit=self._stage_limit(),
+                    is_cancelled=lambda: self.is_cancelled
+                )
+            return search_index.search_pdf_pages(
+                query, pub_id=pub_id, pub_ids=pub_ids, limit=self._stage_limit(),
+                alternatives=self.alternatives
+            )
+
+        batch_search = search_index.available or self.matcher is not None
+        if batch_search:
+            results_by_pub = {}
+            for result in search_pages(pub_ids={pub_id for pub_id, _ in cached_files}):
+                results_by_pub.setdefault(result[0], []).append(result)
+
+        for pdf_file in cached_files:
+            if not self._should_continue():
+                return
+            if batch_search:
+                results_for_file = results_by_pub.get(pdf_file[0], [])
+            else:
+                results_for_file = self.search_manager.search_in_single_pdf(pdf_file, query)
+            self._emit_batch([(result, 'pdf') for result in results_for_file])
+            self._advance_progress()
+
+        def stop_extraction():
+            if not self._should_continue():
+                return True
+            if self._limit_reached():
+                # Zbylé soubory se kvůli limitu neparsují ani neprohledají,
+                # výsledky tedy mohou být neúplné
+                self.truncated = True
+                return True
+            return False
+
+        def on_file_processed(pub_id, pdf_path):
+            if not self._should_continue():
+                return
+            if batch_search:
+                results_for_file = search_pages(pub_id=pub_id)
+            else:
+                results_for_file = self.search_manager.search_in_single_pdf((pub_id, pdf_path), query)
+            self._emit_batch([(result, 'pdf') for result in results_for_file])
+            self._advance_progress()
+
+        # Nové a změněné soubory se extrahují, při více procesech paralelně
+        pdf_workers = self.search_params.get('pdf_workers', 1)
+        if pdf_workers and pdf_workers > 1:
+            self._executor = create_pdf_executor(pdf_workers)
+        try:
+            self.search_manager.refresh_pdf_text(
+                [pdf_file for pdf_file in pdf_files if pdf_file[0] in stale_ids],
+                is_cancelled=stop_extraction,
+                progress_callback=lambda done, total: self.status_message.emit(
+                    f"Zpracování PDF souborů ({done}/{total})..."
+                ),
+                executor=self._executor,
+                file_callback=on_file_processed
+            )
+        finally:
+            self._shutdown_executor()
+
+    def _apply_ranking(self, query, ranking):
+        """
+        Seřadí nalezené výsledky podle relevance. Sebrané kandidáty zkrátí na
+        nejlepších max_results, průběžně zobrazené výsledky jen přeskupí.
+        """
+        pool, self._pool = self._pool, None
+        if not ranking or self.is_cancelled:
+            return
+        self.status_message.emit("Řazení podle relevance...")
+        if pool is not None:
+            self._emit_batch(self.search_manager.rank_results(pool, query, ranking))
+            return
+
+        ranked = self.search_manager.rank_results(self._collected, query, ranking)
+        if ranked != self._collected:
+            self._collected = ranked
+            self.result_found.emit(('ranked', [RelevanceScorer.result_key(pair) for pair in ranked]))
+
+    def _stage_limit(self):
+        """
+        Počet řádků, který má vrátit další krok vyhledávání. O jeden víc než
+        zbývá do limitu, aby bylo poznat, že se výsledky musely zkrátit.
+        """
+        if self.max_results is None:
+            return None
+        if self._pool is not None:
+            # Každý krok dodá kandidáty až do celého limitu
+            return self.max_results + 1
+        return self.max_results - self.results_count + 1
+
+    def _should_continue(self):
+        """
+        Zjistí, zda pokračovat - vyhledávání nebylo zrušeno a žádný krok
+        nevrátil řádek navíc nad limit. Při přesně naplněném limitu další
+        krok ještě proběhne s limitem 1, aby se poznalo, zda jsou další výsledky.
+        """
+        if self.is_cancelled:
+            return False
+        if self._pool is not None:
+            return True
+        return not self.truncated
 
-        except Exception as e:
-            self.status_message.emit(f"Chyba při vyhledávání: {str(e)}")
-            print(f"Chyba vyhledávání: {str(e)}")
-            import traceback
-            traceback.print_exc()
-        finally:
-            self.search_completed.emit()
+    def _limit_reached(self):
+        """
+        Zjistí, zda výsledky už naplnily limit. Při výběru podle relevance
+        stačí víc kandidátů, než je limit - nejlepší se vyberou z nich.
+        """
+        if self.max_results is None:
+            return False
+        if self._pool is not None:
+            return len(self._pool) > self.max_results
+        return self.results_count >= self.max_results
+
+    def _emit_batch(self, batch):
+        """Zkrátí dávku výsledků na zbývající limit a odešle ji"""
+        if self._pool is not None:
+            # Výběr podle relevance - kandidáti se zatím jen sbírají
+            if not self.is_cancelled:
+                self._pool.extend(batch)
+            return
+        if self.max_results is not None:
+            remaining = max(0, self.max_results - self.results_count)
+            if len(batch) > remaining:
+                batch = batch[:remaining]
+                self.truncated = True
+
+        if batch and not self.is_cancelled:
+            # Výňatky se sestaví ještě ve vlákně vyhledávání
+            LazySnippet.prefetch([result[-1] for result, _ in batch
+                                  if isinstance(result[-1], LazySnippet)])
+            self.results_count += len(batch)
+            self._collected.extend(batch)
+            self.results_batch.emit(batch)
+
+    def _advance_progress(self):
+        """Posune průběh o jeden dokončený krok"""
+        self.current_step += 1
+        self.update_progress()
 
     def update_progress(self):
         """Aktualizuje progress bar"""
@@ -4480,156 +7611,626 @@ class SearchWorker(QThread):
             progress = int((self.current_step / self.total_steps) * 100)
             self.progress.emit(min(progress, 100))
 
-    def _generate_cache_key(self):
-        """Vygeneruje klíč pro cache na základě parametrů vyhledávání"""
-        params = sorted(
-            (k, v) for k, v in self.search_params.items() 
-            if k not in ['timestamp']
-        )
-        return tuple(params)
+    def _shutdown_executor(self):
+        """Ukončí pool procesů včetně rozběhnutých úloh"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            terminate_pdf_executor(executor)
 
     def cancel(self):
         """Zruší probíhající vyhledávání"""
         self.is_cancelled = True
+        self._shutdown_executor()
+
+
+def _lower_process_priority():
+    """Sníží prioritu pomocného procesu (jen na systémech s os.nice)"""
+    if hasattr(os, 'nice'):
+        try:
+            os.nice(10)
+        except OSError:
+            pass
+
+
+class BackgroundIndexer(QThread):
+    """
+    Nízkoprioritní indexace nových a změněných publikací na pozadí.
+    Text PDF se extrahuje v samostatném procesu, aby nebrzdil GUI,
+    a během interaktivního vyhledávání se indexace pozastaví.
+    """
+    progress = pyqtSignal(int, int)  # Zpracováno, celkem
+
+    def __init__(self, db_path='publications.db', parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._pending_ids = []
+        self._full_scan = False
+        self._stopped = False
+        self._wake_event = threading.Event()
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+
+    @staticmethod
+    def notify(widget, pub_id):
+        """Předá publikaci k indexaci indexeru hlavního okna nadřazeného widgetu"""
+        while widget is not None and not hasattr(widget, 'background_indexer'):
+            widget = widget.parent()
+        if widget is not None:
+            widget.background_indexer.enqueue(pub_id)
+
+    def request_scan(self):
+        """Naplánuje kontrolu celé složky publications"""
+        with self._lock:
+            self._full_scan = True
+        self._wake_event.set()
+
+    def enqueue(self, pub_id):
+        """Naplánuje indexaci jedné publikace"""
+        with self._lock:
+            if pub_id not in self._pending_ids:
+                self._pending_ids.append(pub_id)
+        self._wake_event.set()
+
+    def pause(self):
+        """Pozastaví indexaci (např. během vyhledávání)"""
+        self._resume_event.clear()
+
+    def resume(self):
+        """Obnoví pozastavenou indexaci"""
+        self._resume_event.set()
+
+    def stop(self):
+        """Ukončí vlákno indexeru"""
+        self._stopped = True
+        self._wake_event.set()
+        self._resume_event.set()
+
+    def restart(self):
+        """Znovu spustí zastavený indexer a naplánuje kontrolu celé složky"""
+        if self.isRunning():
+            return
+        self._stopped = False
+        self.start(QThread.LowestPriority)
+        self.request_scan()
+
+    def run(self):
+        """Čeká na požadavky a zpracovává je"""
+        file_manifest = FileManifest(self.db_path)
+        search_index = SearchIndex(self.db_path)
+        pdf_text_cache = PdfTextCache(self.db_path)
+        executor = create_pdf_executor(1, initializer=_lower_process_priority)
+
+        try:
+            while not self._stopped:
+                self._wake_event.wait()
+                with self._lock:
+                    self._wake_event.clear()
+                    full_scan, self._full_scan = self._full_scan, False
+                    pub_ids, self._pending_ids = self._pending_ids, []
+                if self._stopped:
+                    break
+
+                # Chyba jedné dávky (zamčená databáze, chyba disku) indexer
+                # neukončí, další požadavky se zpracují
+                try:
+                    self._index_batch(full_scan, pub_ids, file_manifest, search_index,
+                                      pdf_text_cache, executor)
+                except BrokenProcessPool as e:
+                    print(f"Chyba indexeru na pozadí: {e}")
+                    terminate_pdf_executor(executor)
+                    executor = create_pdf_executor(1, initializer=_lower_process_priority)
+                except Exception as e:
+                    print(f"Chyba indexeru na pozadí: {e}")
+        finally:
+            terminate_pdf_executor(executor)
+
+    def _index_batch(self, full_scan, pub_ids, file_manifest, search_index, pdf_text_cache, executor):
+        """Zpracuje jednu dávku - kontrolu celé složky nebo vybrané publikace"""
+        # Evidence souborů, metadata a popisy
+        if full_scan:
+            file_manifest.reconcile()
+            search_index.sync(check_changes=True)
+            pdf_files = file_manifest.pdf_files()
+            # Slovník pro opravy překlepů se sestaví předem
+            if search_index.available:
+                FuzzyVocabulary.refresh(self.db_path)
+        else:
+            for pub_id in pub_ids:
+                search_index.update_publication(pub_id)
+            pdf_files = []
+            for pub_id in pub_ids:
+                pdf_path = file_manifest.get_pdf(pub_id)
+                if pdf_path:
+                    pdf_files.append((pub_id, pdf_path))
+
+        # Text PDF souborů
+        stale_files = pdf_text_cache.stale_files(pdf_files)
+        for index, (pub_id, pdf_path) in enumerate(stale_files):
+            self._resume_event.wait()
+            if self._stopped:
+                return
+            self.progress.emit(index, len(stale_files))
+
+            future = executor.submit(extract_pdf_pages, pdf_path)
+            while not future.done() and not self._stopped:
+                futures_wait([future], timeout=0.2)
+            if self._stopped:
+                return
+            try:
+                pages = future.result()
+            except BrokenProcessPool:
+                # Pool procesů je nepoužitelný, vytvoří se znovu
+                raise
+            except Exception as e:
+                print(f"Chyba při indexaci PDF {pdf_path}: {e}")
+                continue
+            pdf_text_cache.store_pages(pub_id, pdf_path, pages)
+
+        self.progress.emit(len(stale_files), len(stale_files))
 
     
+class DataTaskSignals(QObject):
+    """Signály úlohy datové vrstvy, vznikají ve vlákně GUI"""
+    finished = pyqtSignal(object)  # Výsledek úlohy
+    failed = pyqtSignal(str)  # Popis chyby
+
+class DataTask(QRunnable):
+    """Jedna úloha DataService, běží ve vlákně fondu"""
+    def __init__(self, func, args, kwargs):
+        super().__init__()
+        # Úlohu drží DataService až do doručení výsledku
+        self.setAutoDelete(False)
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = DataTaskSignals()
+
+    def run(self):
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
+
+class DataService(QObject):
+    """
+    Čtení z databáze a disku mimo vlákno GUI. Úlohy běží ve fondu vláken
+    (každé vlákno má vlastní připojení z Database) a výsledek se doručí
+    signálem zpět do vlákna GUI. Nový požadavek se stejným klíčem zneplatní
+    starší, jeho výsledek se zahodí, stejně jako výsledek pro zrušený widget.
+    """
+    MAX_THREADS = 4
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """Sdílená instance pro celou aplikaci (vytváří se ve vlákně GUI)"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(self.MAX_THREADS)
+        # Vlákna se neukončují, aby si držela otevřená připojení k databázím
+        self.pool.setExpiryTimeout(-1)
+        self._tasks = {}   # číslo požadavku -> DataTask
+        self._latest = {}  # klíč -> číslo posledního požadavku
+        self._next_ticket = 0
+
+    def submit(self, func, *args, key=None, owner=None, on_result=None, on_error=None, **kwargs):
+        """
+        Spustí func(*args, **kwargs) ve fondu vláken.
+
+        Args:
+            key: Klíč požadavku, novější požadavek se stejným klíčem starší nahradí
+            owner: Widget, po jehož zrušení se výsledek zahodí
+            on_result: Volá se ve vlákně GUI s výsledkem
+            on_error: Volá se ve vlákně GUI s popisem chyby
+
+        Returns:
+            int: Číslo požadavku
+        """
+        self._next_ticket += 1
+        ticket = self._next_ticket
+        if key is not None:
+            self._latest[key] = ticket
+
+        task = DataTask(func, args, kwargs)
+        task.signals.finished.connect(
+            lambda result: self._deliver(ticket, key, owner, on_result, result))
+        task.signals.failed.connect(
+            lambda message: self._deliver(ticket, key, owner, on_error, message, failed=True))
+        self._tasks[ticket] = task
+        self.pool.start(task)
+        return ticket
+
+    def cancel(self, key):
+        """Zahodí výsledek čekajícího požadavku s daným klíčem"""
+        ticket = self._latest.pop(key, None)
+        task = self._tasks.get(ticket)
+        if task is not None and self.pool.tryTake(task):
+            del self._tasks[ticket]
+
+    def is_pending(self, key):
+        """Zjistí, zda se čeká na výsledek požadavku s daným klíčem"""
+        return key in self._latest
+
+    def _deliver(self, ticket, key, owner, callback, value, failed=False):
+        """Předá výsledek ve vlákně GUI, pokud je stále aktuální"""
+        self._tasks.pop(ticket, None)
+        if key is not None:
+            if self._latest.get(key) != ticket:
+                return
+            del self._latest[key]
+        if owner is not None and sip.isdeleted(owner):
+            return
+        if failed:
+            print(f"Chyba při načítání dat: {value}")
+        if callback is not None:
+            callback(value)
+
+    def wait(self, timeout=5000):
+        """Počká na dokončení všech úloh, výsledky se doručí později. Vrátí False při vypršení"""
+        return self.pool.waitForDone(timeout)
+
+    def shutdown(self, timeout=3000):
+        """Zahodí čekající úlohy a počká na dokončení běžících (při zavření aplikace)"""
+        self.pool.clear()
+        self._latest.clear()
+        self.pool.waitForDone(timeout)
+
 class CategoryManager:
     def __init__(self, db_name='categories.db'):
         self.db_name = db_name
-        self.init_database()
-        self.init_publications_database()
-        self.add_sort_order_column()
-    
-    def init_database(self):
-        """Inicializace databáze a vytvoření tabulky pro každý typ publikace"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        # Vytvoření tabulek pro různé typy publikací
-        publication_types = ['books', 'magazines', 'datasheets', 'others']
-        
-        for pub_type in publication_types:
-            cursor.execute(f'''
-                CREATE TABLE IF NOT EXISTS {pub_type}_categories (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    parent_id INTEGER,
-                    FOREIGN KEY (parent_id) REFERENCES {pub_type}_categories (id)
-                )
-            ''')
+        SchemaMigrations.categories(db_name)
+        SchemaMigrations.publications()
+        # Dokončení přeřazení přerušeného pádem aplikace
+        self.apply_pending_remap()
 
-        conn.commit()
-        conn.close()
-        
-    def add_sort_order_column(self):
-        """Přidá sloupec pro řazení do všech tabulek kategorií"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        for category_type in ['books', 'magazines', 'datasheets', 'others']:
-            try:
-                # Kontrola existence sloupce
-                cursor.execute(f"PRAGMA table_info({category_type}_categories)")
-                columns = [column[1] for column in cursor.fetchall()]
-                
-                if 'sort_order' not in columns:
-                    cursor.execute(f"""
-                        ALTER TABLE {category_type}_categories
-                        ADD COLUMN sort_order INTEGER DEFAULT 0
-                    """)
-                    
-                    # Inicializace hodnot
-                    cursor.execute(f"""
-                        UPDATE {category_type}_categories
-                        SET sort_order = (
-                            SELECT COUNT(*)
-                            FROM {category_type}_categories AS t2
-                            WHERE t2.id <= {category_type}_categories.id
-                        )
-                    """)
-                    
-                    conn.commit()
-                    print(f"Added sort_order column to {category_type}_categories")
-                    
-            except Exception as e:
-                print(f"Error adding sort_order to {category_type}_categories: {str(e)}")
-                conn.rollback()
-        
-        conn.close()
-        
-    def init_publications_database(self):
-        # Vytvoření tabulky pro publikace v samostatné databázi
-        pub_conn = sqlite3.connect('publications.db')
-        pub_cursor = pub_conn.cursor()
+    # Ochrana před zacyklenou hierarchií v datech
+    MAX_TREE_DEPTH = 32
+    # Rozestup klíčů sort_order mezi sourozenci
+    ORDER_GAP = 1024
 
-        # Vytvoření tabulky pro publikace, pokud neexistuje
-        pub_cursor.execute('''
-            CREATE TABLE IF NOT EXISTS publications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                author TEXT,
-                year INTEGER,
-                category_id INTEGER,
-                category_type TEXT
-            )
-        ''')
+    def load_category_tree(self, category_type):
+        """
+        Načte celý strom kategorií záložky jedním rekurzivním dotazem.
 
-        pub_conn.commit()
-        pub_conn.close()
-    
-    def load_categories(self, category_type):
-        """Načte kategorie pro daný typ publikace"""
-        conn = sqlite3.connect(self.db_name)
+        Returns:
+            list: Řádky (id, name, parent_id, depth) po úrovních, sourozenci
+            podle sort_order - rodič je vždy před svými potomky
+        """
+        conn = Database.connect(self.db_name)
         cursor = conn.cursor()
-        
-        # Načtení hlavních kategorií
-        cursor.execute(f"SELECT id, name FROM {category_type}_categories WHERE parent_id IS NULL")
-        categories = cursor.fetchall()
-        
+        try:
+            cursor.execute(f"""
+                WITH RECURSIVE tree(id, name, parent_id, depth, sort_order) AS (
+                    SELECT id, name, parent_id, 0, sort_order
+                    FROM {category_type}_categories
+                    WHERE parent_id IS NULL
+                    UNION ALL
+                    SELECT c.id, c.name, c.parent_id, t.depth + 1, c.sort_order
+                    FROM {category_type}_categories c
+                    JOIN tree t ON c.parent_id = t.id
+                    WHERE t.depth < ?
+                )
+                SELECT id, name, parent_id, depth FROM tree
+                ORDER BY depth, sort_order, id
+            """, (self.MAX_TREE_DEPTH,))
+            return cursor.fetchall()
+        finally:
+            conn.close()
+
+    def load_categories(self, category_type):
+        """Načte hlavní kategorie typu publikace s jejich přímými podkategoriemi"""
         result = []
-        for cat_id, cat_name in categories:
-            # Načtení podkategorií
-            cursor.execute(f"SELECT id, name FROM {category_type}_categories WHERE parent_id = ?", (cat_id,))
-            subcategories = cursor.fetchall()
-            
-            result.append({
-                'id': cat_id,
-                'name': cat_name,
-                'subcategories': subcategories
-            })
-        
-        conn.close()
+        by_id = {}
+        for cat_id, name, parent_id, depth in self.load_category_tree(category_type):
+            if depth == 0:
+                by_id[cat_id] = {'id': cat_id, 'name': name, 'subcategories': []}
+                result.append(by_id[cat_id])
+            elif depth == 1:
+                by_id[parent_id]['subcategories'].append((cat_id, name))
         return result
     
     def add_category(self, category_type, name, parent_id=None):
         """Přidá novou kategorii"""
-        conn = sqlite3.connect(self.db_name)
+        conn = Database.connect(self.db_name)
         cursor = conn.cursor()
         
-        cursor.execute(f"INSERT INTO {category_type}_categories (name, parent_id) VALUES (?, ?)", 
-                      (name, parent_id))
+        # Nová kategorie se zařadí na konec svých sourozenců
+        cursor.execute(f"""
+            INSERT INTO {category_type}_categories (name, parent_id, sort_order)
+            SELECT ?, ?, COALESCE(MAX(sort_order), 0) + ?
+            FROM {category_type}_categories WHERE parent_id IS ?
+        """, (name, parent_id, self.ORDER_GAP, parent_id))
         new_id = cursor.lastrowid
         
         conn.commit()
         conn.close()
         return new_id
     
+    @classmethod
+    def _order_between(cls, previous, following):
+        """Vrátí klíč pořadí mezi dvěma sousedy (None = okraj), nebo None když mezi nimi není místo"""
+        if previous is None and following is None:
+            return cls.ORDER_GAP
+        if previous is None:
+            return following - cls.ORDER_GAP
+        if following is None:
+            return previous + cls.ORDER_GAP
+        if following - previous > 1:
+            return (previous + following) // 2
+        return None
+
+    def _rebalance_siblings(self, cursor, category_type, parent_id, exclude_id):
+        """
+        Rozloží klíče pořadí sourozenců znovu s rozestupem ORDER_GAP (jedním dávkovým zápisem).
+
+        Returns:
+            dict: ID kategorie -> nový klíč pořadí
+        """
+        cursor.execute(f"""
+            SELECT id FROM {category_type}_categories
+            WHERE parent_id IS ? AND id != ?
+            ORDER BY sort_order, id
+        """, (parent_id, exclude_id))
+        orders = {cat_id: (index + 1) * self.ORDER_GAP for index, (cat_id,) in enumerate(cursor.fetchall())}
+        cursor.executemany(f"UPDATE {category_type}_categories SET sort_order = ? WHERE id = ?",
+                           [(order, cat_id) for cat_id, order in orders.items()])
+        return orders
+
+    def reorder_category(self, category_type, category_id, parent_id, previous_id=None, next_id=None):
+        """
+        Umístí kategorii pod parent_id mezi sourozence previous_id a next_id
+        (None = začátek/konec). Nový klíč pořadí leží mezi klíči sousedů, zapíše
+        se tak jediný řádek. Jen když mezi sousedy není místo, se sourozenci
+        nejdřív rozloží znovu.
+
+        Returns:
+            int: Počet zapsaných řádků
+        """
+        conn = Database.connect(self.db_name)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            neighbours = [cat_id for cat_id in (previous_id, next_id) if cat_id is not None]
+            orders = {}
+            if neighbours:
+                cursor.execute(f"""
+                    SELECT id, sort_order FROM {category_type}_categories
+                    WHERE id IN ({', '.join('?' * len(neighbours))})
+                """, neighbours)
+                orders = dict(cursor.fetchall())
+            written = 1
+            order = self._order_between(orders.get(previous_id), orders.get(next_id))
+            if order is None:
+                orders = self._rebalance_siblings(cursor, category_type, parent_id, category_id)
+                written += len(orders)
+                order = self._order_between(orders.get(previous_id), orders.get(next_id))
+            cursor.execute(f"""
+                UPDATE {category_type}_categories SET parent_id = ?, sort_order = ?
+                WHERE id = ?
+            """, (parent_id, order, category_id))
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        DataGeneration.bump()
+        return written
+
+    def _collect_subtree(self, cursor, category_type, category_id):
+        """
+        Naplní dočasnou tabulku category_subtree kategorií a všemi jejími
+        potomky (old_id, old_parent, name, sort_order, depth). Kořen má
+        old_parent NULL, position čísluje uzly od 1 po úrovních.
+
+        Returns:
+            int: Počet kategorií podstromu (0 pokud kategorie neexistuje)
+        """
+        cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS category_subtree (
+                old_id INTEGER PRIMARY KEY,
+                position INTEGER,
+                old_parent INTEGER,
+                name TEXT,
+                sort_order INTEGER,
+                depth INTEGER
+            )
+        """)
+        cursor.execute("DELETE FROM category_subtree")
+        cursor.execute(f"""
+            WITH RECURSIVE subtree(id, parent_id, name, sort_order, depth) AS (
+                SELECT id, NULL, name, sort_order, 0
+                FROM {category_type}_categories WHERE id = ?
+                UNION ALL
+                SELECT c.id, c.parent_id, c.name, c.sort_order, s.depth + 1
+                FROM {category_type}_categories c
+                JOIN subtree s ON c.parent_id = s.id
+                WHERE s.depth < ?
+            )
+            INSERT INTO category_subtree (old_id, position, old_parent, name, sort_order, depth)
+            SELECT id, ROW_NUMBER() OVER (ORDER BY depth, id), parent_id, name, sort_order, depth
+            FROM subtree
+        """, (category_id, self.MAX_TREE_DEPTH))
+        cursor.execute("SELECT COUNT(*) FROM category_subtree")
+        return cursor.fetchone()[0]
+
+    def _transaction(self):
+        """
+        Zahájí zápis do databáze kategorií. Nejdřív se dokončí případné
+        nedokončené přeřazení publikací, v žurnálu je tak vždy jen jedna úprava.
+        """
+        self.apply_pending_remap()
+        conn = Database.connect(self.db_name)
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    def apply_pending_remap(self):
+        """
+        Přeřadí publikace podle žurnálu category_remap a žurnál vyprázdní.
+
+        Kategorie a publikace jsou ve dvou databázích, které v režimu WAL
+        nejde zapsat jednou atomickou transakcí. Úprava kategorií se proto
+        zapíše spolu se žurnálem starých a nových ID, publikace se přeřadí
+        v samostatné transakci a žurnál se smaže až po ní. Po pádu mezi
+        kroky se přeřazení dokončí znovu - ID kategorií se díky AUTOINCREMENT
+        nepoužijí podruhé, opakované přeřazení tak nic dalšího nezmění.
+
+        Returns:
+            int: Počet přeřazených publikací
+        """
+        conn = Database.connect(self.db_name)
+        try:
+            remap = conn.execute("SELECT old_type, old_id, new_type, new_id FROM category_remap").fetchall()
+        finally:
+            conn.close()
+        if not remap:
+            return 0
+
+        pub_conn = Database.connect('publications.db')
+        try:
+            pub_conn.execute("BEGIN IMMEDIATE")
+            pub_conn.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS remap (
+                    old_type TEXT,
+                    old_id INTEGER,
+                    new_type TEXT,
+                    new_id INTEGER,
+                    PRIMARY KEY (old_type, old_id)
+                )
+            """)
+            pub_conn.execute("DELETE FROM temp.remap")
+            pub_conn.executemany("INSERT INTO temp.remap VALUES (?, ?, ?, ?)", remap)
+            # Publikace celého podstromu se přeřadí jedním příkazem
+            cursor = pub_conn.execute("""
+                UPDATE publications SET category_type = r.new_type, category_id = r.new_id
+                FROM temp.remap r
+                WHERE publications.category_type = r.old_type
+                  AND publications.category_id = r.old_id
+            """)
+            reassigned = cursor.rowcount
+            pub_conn.commit()
+        except sqlite3.Error:
+            pub_conn.rollback()
+            raise
+        finally:
+            pub_conn.close()
+
+        conn = Database.connect(self.db_name)
+        try:
+            conn.executemany("DELETE FROM category_remap WHERE old_type = ? AND old_id = ?",
+                             [(old_type, old_id) for old_type, old_id, _, _ in remap])
+            conn.commit()
+        finally:
+            conn.close()
+        DataGeneration.bump()
+        return reassigned
+
     def delete_category(self, category_type, category_id):
-        """Smaže kategorii a její podkategorie"""
-        conn = sqlite3.connect(self.db_name)
+        """
+        Smaže kategorii se všemi podkategoriemi v jedné transakci. Publikace
+        smazaných kategorií se přeřadí do nadřazené kategorie, u hlavní
+        kategorie zůstanou bez kategorie (přes žurnál, viz apply_pending_remap).
+
+        Returns:
+            int: Počet přeřazených publikací
+        """
+        conn = self._transaction()
         cursor = conn.cursor()
-        
-        # Nejprve smažeme všechny podkategorie
-        cursor.execute(f"DELETE FROM {category_type}_categories WHERE parent_id = ?", (category_id,))
-        # Pak smažeme samotnou kategorii
-        cursor.execute(f"DELETE FROM {category_type}_categories WHERE id = ?", (category_id,))
-        
-        conn.commit()
-        conn.close()
+        try:
+            cursor.execute(f"SELECT parent_id FROM {category_type}_categories WHERE id = ?", (category_id,))
+            row = cursor.fetchone()
+            if row is None:
+                conn.rollback()
+                return 0
+            self._collect_subtree(cursor, category_type, category_id)
+            cursor.execute("""
+                INSERT INTO category_remap (old_type, old_id, new_type, new_id)
+                SELECT ?, old_id, ?, ? FROM category_subtree
+            """, (category_type, category_type, row[0]))
+            cursor.execute(f"""
+                DELETE FROM {category_type}_categories
+                WHERE id IN (SELECT old_id FROM category_subtree)
+            """)
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        DataGeneration.bump()
+        return self.apply_pending_remap()
+
+    def move_category(self, source_type, category_id, target_type, target_parent_id=None):
+        """
+        Přesune kategorii s celým podstromem do jiné záložky (pod target_parent_id,
+        nebo jako hlavní kategorii). Kategorie se vloží jedním INSERT ... SELECT
+        v jedné transakci, publikace se pak přeřadí přes žurnál (viz
+        apply_pending_remap).
+
+        Returns:
+            int: Nové ID přesunuté kategorie
+        """
+        conn = self._transaction()
+        cursor = conn.cursor()
+        try:
+            if not self._collect_subtree(cursor, source_type, category_id):
+                raise ValueError(f"Kategorie {category_id} neexistuje")
+
+            # Nová ID navazují na nejvyšší dosud použité ID cílové tabulky
+            cursor.execute(f"""
+                SELECT MAX(
+                    COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0),
+                    COALESCE((SELECT MAX(id) FROM {target_type}_categories), 0)
+                )
+            """, (f"{target_type}_categories",))
+            base_id = cursor.fetchone()[0]
+            # Přesunutá kategorie se zařadí na konec svých nových sourozenců
+            cursor.execute(f"""
+                SELECT COALESCE(MAX(sort_order), 0) + ? FROM {target_type}_categories
+                WHERE parent_id IS ?
+            """, (self.ORDER_GAP, target_parent_id))
+            root_sort_order = cursor.fetchone()[0]
+
+            cursor.execute(f"""
+                INSERT INTO {target_type}_categories (id, name, parent_id, sort_order)
+                SELECT :base + m.position, m.name,
+                       CASE WHEN m.depth = 0 THEN :parent ELSE :base + p.position END,
+                       CASE WHEN m.depth = 0 THEN :sort_order ELSE m.sort_order END
+                FROM category_subtree m
+                LEFT JOIN category_subtree p ON p.old_id = m.old_parent
+                ORDER BY m.position
+            """, {'base': base_id, 'parent': target_parent_id, 'sort_order': root_sort_order})
+            cursor.execute("""
+                INSERT INTO category_remap (old_type, old_id, new_type, new_id)
+                SELECT ?, old_id, ?, ? + position FROM category_subtree
+            """, (source_type, target_type, base_id))
+            cursor.execute(f"""
+                DELETE FROM {source_type}_categories
+                WHERE id IN (SELECT old_id FROM category_subtree)
+            """)
+            new_id = base_id + 1
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        DataGeneration.bump()
+        self.apply_pending_remap()
+        return new_id
     
     def get_category_id(self, category_type, name):
         """Získá ID kategorie podle jejího jména"""
-        conn = sqlite3.connect(self.db_name)
+        conn = Database.connect(self.db_name)
         cursor = conn.cursor()
         
         cursor.execute(f"SELECT id FROM {category_type}_categories WHERE name = ?", (name,))
@@ -4849,7 +8450,7 @@ class PublicationItem(QtGui.QStandardItem):
     Třída reprezentující jednu publikaci v seznamu.
     Obsahuje informace o obrázku a názvu publikace.
     """
-    def __init__(self, image_path, title, pub_id):
+    def __init__(self, image_path, title, pub_id, image=None):
         super().__init__()
         self.image_path = image_path
         self.title = title
@@ -4864,8 +8465,11 @@ class PublicationItem(QtGui.QStandardItem):
         self.setData(self.truncated_title, QtCore.Qt.DisplayRole)  # Zobrazovaný text
         self.setData(self.full_title, QtCore.Qt.ToolTipRole)      # Text tooltipu
         
-        # Načtení a nastavení náhledového obrázku
-        self.original_pixmap = load_scaled_image(image_path)
+        # Náhled načtený na pozadí (QImage), jinak se načte ze souboru
+        if image is not None:
+            self.original_pixmap = QPixmap.fromImage(image)
+        else:
+            self.original_pixmap = load_scaled_image(image_path) if image_path else None
         if self.original_pixmap and not self.original_pixmap.isNull():
             self.setData(self.original_pixmap, QtCore.Qt.DecorationRole)  # Obrázek pro zobrazení
         else:
@@ -4877,6 +8481,38 @@ class PublicationItem(QtGui.QStandardItem):
         # Nastavení velikosti položky v seznamu
         self.setSizeHint(QtCore.QSize(120, 180))
 
+def build_category_tree(tree_widget, rows, expand_depth=-1):
+    """
+    Naplní QTreeWidget řádky (id, name, parent_id, depth) z load_category_tree.
+    Položky se vytvoří mimo strom a vloží najednou s pozastaveným překreslováním,
+    rozbalí se úrovně do expand_depth (-1 žádná).
+
+    Returns:
+        dict: ID kategorie -> QTreeWidgetItem
+    """
+    items = {}
+    top_level = []
+    for cat_id, name, parent_id, depth in rows:
+        item = QTreeWidgetItem([name])
+        item.setData(0, Qt.UserRole, cat_id)
+        items[cat_id] = item
+        if depth == 0:
+            top_level.append(item)
+        elif parent_id in items:
+            items[parent_id].addChild(item)
+
+    tree_widget.setUpdatesEnabled(False)
+    try:
+        tree_widget.clear()
+        tree_widget.addTopLevelItems(top_level)
+        # Rozbalit lze až položky vložené do stromu
+        for cat_id, name, parent_id, depth in rows:
+            if depth <= expand_depth and cat_id in items:
+                items[cat_id].setExpanded(True)
+    finally:
+        tree_widget.setUpdatesEnabled(True)
+    return items
+
 @lru_cache(maxsize=1000)
 def load_scaled_image(image_path, width=100, height=150):
     """
@@ -4898,6 +8534,24 @@ def load_scaled_image(image_path, width=100, height=150):
         )
     return QtGui.QPixmap()
 
+@lru_cache(maxsize=1000)
+def read_scaled_image(image_path, width=100, height=150):
+    """
+    Obdoba load_scaled_image pro vlákna mimo GUI - QPixmap lze vytvořit
+    jen ve vlákně GUI, QImage se načte a zmenší kdekoli.
+
+    Returns:
+        QImage: Škálovaný obrázek nebo prázdný QImage, pokud obrázek neexistuje
+    """
+    image = QImage(image_path) if image_path else QImage()
+    if image.isNull():
+        return image
+    return image.scaled(
+        width, height,
+        QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+        QtCore.Qt.TransformationMode.SmoothTransformation
+    )
+
 class PublicationDelegate(QtWidgets.QStyledItemDelegate):
     """
     Delegate třída určující způsob vykreslování jednotlivých položek v seznamu.
@@ -5172,16 +8826,16 @@ class AddPublications(QDialog, StyleHelper):
             StyleHelper.create_message_box("Chyba", "Vyberte prosím kategorii pro publikaci.", "warning", self)
             return
 
-        conn = sqlite3.connect('publications.db')
+        conn = Database.connect('publications.db')
         cursor = conn.cursor()
 
         try:
             category_id = self.category_manager.get_category_id(self.selected_tab, self.selected_category)
 
             cursor.execute('''
-                INSERT INTO publications (title, author, year, category_id, category_type)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (title, author or None, year, category_id, self.selected_tab))
+                INSERT INTO publications (title, author, year, category_id, category_type, description)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (title, author or None, year, category_id, self.selected_tab, description))
 
             publication_id = cursor.lastrowid
             conn.commit()
@@ -5190,11 +8844,6 @@ class AddPublications(QDialog, StyleHelper):
             pub_dir = f"publications/{publication_id}"
             os.makedirs(pub_dir, exist_ok=True)
 
-            # Uložení popisu
-            desc_file = f"{pub_dir}/description.txt"
-            with open(desc_file, 'w', encoding='utf-8') as f:
-                f.write(description)
-
             # Kopírování obálky
             if self.cover_path:
                 cover_file = f"{pub_dir}/cover{os.path.splitext(self.cover_path)[1]}"
@@ -5205,6 +8854,13 @@ class AddPublications(QDialog, StyleHelper):
                 pdf_file = f"{pub_dir}/{os.path.basename(self.pdf_path)}"
                 shutil.copy2(self.pdf_path, pdf_file)
 
+            # Zařazení nové publikace do evidence souborů a fulltextového indexu,
+            # text PDF zpracuje indexer na pozadí
+            FileManifest().update_publication(publication_id)
+            SearchIndex().update_publication(publication_id)
+            DataGeneration.bump()
+            BackgroundIndexer.notify(self, publication_id)
+
             self.close()
 
         except Exception as e:
@@ -5383,21 +9039,9 @@ class PublicationDetailsWindow(QDialog, StyleHelper):
         content_frame_layout.setContentsMargins(10, 10, 10, 10)
         content_frame_layout.setSpacing(15)
 
-        # --- Načtení dat publikace ---
-        conn = sqlite3.connect('publications.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT title, author, year, category_id, category_type
-            FROM publications
-            WHERE id = ?
-        ''', (self.publication_id,))
-        publication_data = cursor.fetchone()
-        conn.close()
-
-        title, author, year, category_id, category_type = publication_data
-
-        # --- Nadpis publikace ---
-        title_label = QLabel(title)
+        # --- Nadpis publikace (data se načtou na pozadí) ---
+        self.title_label = QLabel("Načítání...")
+        title_label = self.title_label
         title_label.setAlignment(Qt.AlignCenter)
         title_label.setWordWrap(True)
         title_label.setStyleSheet("""
@@ -5411,19 +9055,7 @@ class PublicationDetailsWindow(QDialog, StyleHelper):
             }
         """)
         content_frame_layout.addWidget(title_label)
-
-        # --- Náhled publikace ---
-        cover_path = self.find_cover_image(self.publication_id)
-        preview_section = self.create_preview_section(cover_path)
-        content_frame_layout.addWidget(preview_section)
-
-        # --- Informace o publikaci ---
-        info_section = self.create_info_section(author, year)
-        content_frame_layout.addWidget(info_section)
-
-        # --- Popis publikace ---
-        desc_section = self.create_description_section()
-        content_frame_layout.addWidget(desc_section)
+        content_frame_layout.addStretch()
 
         framed_content = StyleHelper.apply_frame_style(
             self.content_frame,
@@ -5452,14 +9084,73 @@ class PublicationDetailsWindow(QDialog, StyleHelper):
         buttons_layout.addWidget(self.close_button)
         buttons_layout.addWidget(self.edit_button)
 
-        # --- Sestavení layoutu ---
-        container_layout.addWidget(framed_content, stretch=1)
-        container_layout.addWidget(buttons_container)
-        main_layout.addWidget(container)
+        # --- Sestavení layoutu ---
+        container_layout.addWidget(framed_content, stretch=1)
+        container_layout.addWidget(buttons_container)
+        main_layout.addWidget(container)
+
+        StyleHelper.make_draggable(self)
+
+        self.load_details()
+
+    def load_details(self):
+        """Načte údaje publikace na pozadí, sekce se doplní po načtení"""
+        self.edit_button.setEnabled(False)
+        DataService.instance().submit(
+            self.fetch_details, self.publication_id,
+            key=(id(self), 'details'),
+            owner=self,
+            on_result=self.show_details,
+            on_error=lambda message: self.show_details(None)
+        )
+
+    @classmethod
+    def fetch_details(cls, pub_id):
+        """Načte údaje, náhled a popis publikace (běží mimo vlákno GUI)"""
+        conn = Database.connect('publications.db')
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT title, author, year
+                FROM publications
+                WHERE id = ?
+            ''', (pub_id,))
+            publication_data = cursor.fetchone()
+        finally:
+            conn.close()
+        if publication_data is None:
+            return None
+
+        cover_path = cls.find_cover_image(pub_id)
+        cover_image = QImage(cover_path) if cover_path else QImage()
+        if not cover_image.isNull():
+            cover_image = cover_image.scaled(150, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        description = DescriptionStore().get(pub_id)
+        return publication_data, cover_image, description
+
+    def show_details(self, details):
+        """Sestaví sekce detailu z údajů načtených na pozadí"""
+        content_layout = self.content_frame.layout()
+
+        # Vyčistíme layout kromě title_label
+        while content_layout.count() > 1:
+            item = content_layout.takeAt(1)
+            if item.widget():
+                item.widget().deleteLater()
+
+        if details is None:
+            self.title_label.setText("Publikace nebyla nalezena")
+            content_layout.addStretch()
+            return
 
-        StyleHelper.make_draggable(self)
+        (title, author, year), cover_image, description = details
+        self.title_label.setText(title)
+        content_layout.addWidget(self.create_preview_section(cover_image))
+        content_layout.addWidget(self.create_info_section(author, year))
+        content_layout.addWidget(self.create_description_section(description))
+        self.edit_button.setEnabled(True)
         
-    def create_preview_section(self, cover_path):
+    def create_preview_section(self, cover_image):
         """Vytvoří sekci s náhledem publikace"""
         preview_section = QWidget()
         layout = QVBoxLayout(preview_section)
@@ -5501,14 +9192,9 @@ class PublicationDetailsWindow(QDialog, StyleHelper):
         # Náhled bez rámečku
         cover_label = QLabel()
         cover_label.setAlignment(Qt.AlignCenter)
-        if cover_path:
-            pixmap = QPixmap(cover_path)
-            scaled_pixmap = pixmap.scaled(
-                150, 200,
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
-            cover_label.setPixmap(scaled_pixmap)
+        if not cover_image.isNull():
+            # Obrázek je už zmenšený na 150x200
+            cover_label.setPixmap(QPixmap.fromImage(cover_image))
             cover_label.setStyleSheet("border: none;")
         else:
             cover_label.setText("Žádný náhled")
@@ -5575,7 +9261,7 @@ class PublicationDetailsWindow(QDialog, StyleHelper):
 
         return info_section
 
-    def create_description_section(self):
+    def create_description_section(self, description):
         """Vytvoří sekci s popisem publikace"""
         desc_section = QWidget()
         layout = QVBoxLayout(desc_section)
@@ -5594,13 +9280,7 @@ class PublicationDetailsWindow(QDialog, StyleHelper):
             }
         """)
 
-        # Načtení popisu
-        description_file = f"publications/{self.publication_id}/description.txt"
-        if os.path.exists(description_file):
-            with open(description_file, 'r') as f:
-                description = f.read()
-        else:
-            description = "Žádný popis není k dispozici"
+        description = description or "Žádný popis není k dispozici"
 
         # Text popisu
         description_text = QLabel(description)
@@ -5622,23 +9302,16 @@ class PublicationDetailsWindow(QDialog, StyleHelper):
 
         return desc_section
 
-    def find_cover_image(self, pub_id):
+    @staticmethod
+    def find_cover_image(pub_id):
         """Najde obrázek obálky pro danou publikaci"""
-        pub_dir = f"publications/{pub_id}"
-        if os.path.exists(pub_dir):
-            for file in os.listdir(pub_dir):
-                if file.startswith("cover"):
-                    return os.path.join(pub_dir, file)
-        return None
+        return FileManifest().get_cover(pub_id)
 
     def open_pdf(self):
         """Otevře PDF soubor publikace"""
-        pub_dir = f"publications/{self.publication_id}"
-        if os.path.exists(pub_dir):
-            for file in os.listdir(pub_dir):
-                if file.endswith(".pdf"):
-                    os.startfile(os.path.join(pub_dir, file))
-                    break
+        pdf_path = FileManifest().get_pdf(self.publication_id)
+        if pdf_path:
+            os.startfile(pdf_path)
 
     def open_description_window(self, description):
         description_window = QDialog(self)
@@ -5715,49 +9388,7 @@ class PublicationDetailsWindow(QDialog, StyleHelper):
 
     def refresh_data(self):
         """Obnoví data v detailu po editaci"""
-        # Načtení aktuálních dat z databáze
-        conn = sqlite3.connect('publications.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT title, author, year, category_id, category_type
-            FROM publications
-            WHERE id = ?
-        ''', (self.publication_id,))
-        publication_data = cursor.fetchone()
-        conn.close()
-
-        if publication_data:
-            title, author, year, _, _ = publication_data
-
-            # Najdeme a aktualizujeme title_label
-            for i in range(self.content_frame.layout().count()):
-                widget = self.content_frame.layout().itemAt(i).widget()
-                if isinstance(widget, QLabel) and "font-size: 18pt" in widget.styleSheet():
-                    widget.setText(title)
-                    break
-
-            # Aktualizace jednotlivých sekcí
-            content_layout = self.content_frame.layout()
-            
-            # Uložíme title_label
-            title_label = content_layout.itemAt(0).widget()
-            
-            # Vyčistíme layout kromě title_label
-            while content_layout.count() > 1:
-                item = content_layout.takeAt(1)
-                if item.widget():
-                    item.widget().deleteLater()
-
-            # Znovu vytvoření sekcí
-            cover_path = self.find_cover_image(self.publication_id)
-            preview_section = self.create_preview_section(cover_path)
-            info_section = self.create_info_section(author, year)
-            desc_section = self.create_description_section()
-
-            # Přidání aktualizovaných sekcí
-            content_layout.addWidget(preview_section)
-            content_layout.addWidget(info_section)
-            content_layout.addWidget(desc_section)
+        self.load_details()
         
 class EditPublication(QDialog, StyleHelper):
     def __init__(self, parent=None, publication_id=None, category_manager=None):
@@ -5766,6 +9397,8 @@ class EditPublication(QDialog, StyleHelper):
         self.category_manager = category_manager
         self.cover_path = None
         self.pdf_path = None
+        # Kategorie záložek načtené na pozadí spolu s daty publikace
+        self.category_cache = {}
         
         # Přidáme mapování záložek
         self.tab_mapping = {
@@ -5864,19 +9497,65 @@ class EditPublication(QDialog, StyleHelper):
         StyleHelper.make_draggable(self)
 
     def load_publication_data(self):
-        """Načte existující data publikace"""
-        conn = sqlite3.connect('publications.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT title, author, year, category_id, category_type
-            FROM publications
-            WHERE id = ?
-        ''', (self.publication_id,))
-        publication_data = cursor.fetchone()
-        conn.close()
+        """Načte existující data publikace na pozadí, do té doby nelze ukládat"""
+        self.save_button.setEnabled(False)
+        self.title_input.setPlaceholderText("Načítání...")
+        DataService.instance().submit(
+            self.fetch_publication_data, self.publication_id, self.category_manager,
+            self.cover_preview.minimumSize(),
+            key=(id(self), 'publication'),
+            owner=self,
+            on_result=self.show_publication_data,
+            on_error=lambda message: self.title_input.setPlaceholderText("Zadejte název publikace")
+        )
+
+    @staticmethod
+    def fetch_publication_data(pub_id, category_manager, cover_size):
+        """Načte data publikace, soubory a kategorie všech záložek (běží mimo vlákno GUI)"""
+        conn = Database.connect('publications.db')
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT title, author, year, category_id, category_type
+                FROM publications
+                WHERE id = ?
+            ''', (pub_id,))
+            publication_data = cursor.fetchone()
+        finally:
+            conn.close()
+
+        file_manifest = FileManifest()
+        cover_path = file_manifest.get_cover(pub_id)
+        cover_image = QImage(cover_path) if cover_path else QImage()
+        if not cover_image.isNull():
+            cover_image = cover_image.scaled(cover_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        return {
+            'publication': publication_data,
+            'description': DescriptionStore().get(pub_id),
+            'cover_path': cover_path,
+            'cover_image': cover_image,
+            'pdf_path': file_manifest.get_pdf(pub_id),
+            'categories': {
+                category_type: category_manager.load_categories(category_type)
+                for category_type in SchemaMigrations.CATEGORY_TYPES
+            }
+        }
+
+    def get_categories(self, category_type):
+        """Kategorie záložky, přednostně z dat načtených na pozadí"""
+        if category_type not in self.category_cache:
+            self.category_cache[category_type] = self.category_manager.load_categories(category_type)
+        return self.category_cache[category_type]
+
+    def show_publication_data(self, data):
+        """Vyplní formulář daty načtenými na pozadí"""
+        self.title_input.setPlaceholderText("Zadejte název publikace")
+        self.category_cache = data['categories']
+        publication_data = data['publication']
 
         if publication_data:
             title, author, year, category_id, category_type = publication_data
+            self.save_button.setEnabled(True)
             
             # Nastavení základních informací
             self.title_input.setText(title)
@@ -5885,7 +9564,7 @@ class EditPublication(QDialog, StyleHelper):
             
             # Načtení kategorií současného umístění
             if category_type:
-                categories = self.category_manager.load_categories(category_type)
+                categories = self.get_categories(category_type)
                 current_category = None
                 parent_category = None
                 
@@ -5917,27 +9596,18 @@ class EditPublication(QDialog, StyleHelper):
                     self.category_combo.setCurrentText(current_category)
 
             # Načtení popisu
-            description_file = f"publications/{self.publication_id}/description.txt"
-            if os.path.exists(description_file):
-                with open(description_file, 'r') as f:
-                    description = f.read()
-                    self.description_input.setText(description)
+            self.description_input.setText(data['description'])
 
             # Načtení náhledu
-            cover_path = self.find_cover_image()
+            cover_path = data['cover_path']
             if cover_path:
                 self.cover_path = cover_path
-                pixmap = QPixmap(cover_path)
-                scaled_pixmap = pixmap.scaled(
-                    self.cover_preview.minimumSize(),
-                    Qt.KeepAspectRatio,
-                    Qt.SmoothTransformation
-                )
-                self.cover_preview.setPixmap(scaled_pixmap)
+                # Obrázek je už zmenšený na velikost náhledu
+                self.cover_preview.setPixmap(QPixmap.fromImage(data['cover_image']))
                 self.cover_info_label.setText(f"Nahrán náhled: {os.path.basename(cover_path)}")
 
             # Načtení PDF
-            pdf_path = self.find_pdf_file()
+            pdf_path = data['pdf_path']
             if pdf_path:
                 self.pdf_path = pdf_path
                 self.pdf_info_label.setText(f"Nahrán PDF soubor: {os.path.basename(pdf_path)}")
@@ -5950,7 +9620,7 @@ class EditPublication(QDialog, StyleHelper):
                         self.tab_combo.setCurrentText(tab_name)
                         
                         # Načtení kategorií pro vybranou záložku
-                        categories = self.category_manager.load_categories(category_type)
+                        categories = self.get_categories(category_type)
                         
                         # Najít aktuální kategorii a její případnou nadřazenou kategorii
                         current_category = None
@@ -5980,24 +9650,6 @@ class EditPublication(QDialog, StyleHelper):
                         
                         break
 
-    def find_cover_image(self):
-        """Najde cestu k náhledovému obrázku"""
-        pub_dir = f"publications/{self.publication_id}"
-        if os.path.exists(pub_dir):
-            for file in os.listdir(pub_dir):
-                if file.startswith("cover"):
-                    return os.path.join(pub_dir, file)
-        return None
-
-    def find_pdf_file(self):
-        """Najde cestu k PDF souboru"""
-        pub_dir = f"publications/{self.publication_id}"
-        if os.path.exists(pub_dir):
-            for file in os.listdir(pub_dir):
-                if file.endswith(".pdf"):
-                    return os.path.join(pub_dir, file)
-        return None
-
     def setup_cover_preview(self):
         """Vytvoří a nastaví widget pro náhled obálky publikace"""
         # Vytvoření QLabel pro náhled s větší fixní velikostí
@@ -6163,7 +9815,7 @@ class EditPublication(QDialog, StyleHelper):
         category_type = self.tab_mapping.get(tab_name)
         if category_type:
             # Načtení kategorií pro vybranou záložku
-            categories = self.category_manager.load_categories(category_type)
+            categories = self.get_categories(category_type)
             
             # Přidání kategorií do comboboxu
             for category in categories:
@@ -6184,7 +9836,7 @@ class EditPublication(QDialog, StyleHelper):
 
         category_type = self.tab_mapping.get(self.tab_combo.currentText())
         if category_type:
-            categories = self.category_manager.load_categories(category_type)
+            categories = self.get_categories(category_type)
             
             # Najít vybranou kategorii a její podkategorie
             selected_category = next(
@@ -6209,7 +9861,7 @@ class EditPublication(QDialog, StyleHelper):
             return
 
         # Načtení původních dat pro případ, že uživatel nevybral nové umístění
-        conn = sqlite3.connect('publications.db')
+        conn = Database.connect('publications.db')
         cursor = conn.cursor()
         cursor.execute('''
             SELECT category_id, category_type
@@ -6246,39 +9898,47 @@ class EditPublication(QDialog, StyleHelper):
         # Aktualizace databáze
         cursor.execute('''
             UPDATE publications 
-            SET title = ?, author = ?, year = ?, category_id = ?, category_type = ?
+            SET title = ?, author = ?, year = ?, category_id = ?, category_type = ?, description = ?
             WHERE id = ?
-        ''', (title, author, year, new_category_id, new_category_type, self.publication_id))
+        ''', (title, author, year, new_category_id, new_category_type, description, self.publication_id))
         conn.commit()
         conn.close()
 
         # Aktualizace souborů
         pub_dir = f"publications/{self.publication_id}"
 
-        # Aktualizace popisu
-        desc_file = f"{pub_dir}/description.txt"
-        with open(desc_file, 'w') as f:
-            f.write(description)
+        # Dříve exportovaný soubor popisu se přepíše, aby nezůstal zastaralý
+        description_store = DescriptionStore()
+        if os.path.exists(description_store.file_path(self.publication_id)):
+            description_store.export_publication(self.publication_id, description)
+
+        manifest = FileManifest()
 
         # Aktualizace náhledu
         if self.cover_path and not self.cover_path.startswith(pub_dir):
-            # Najít a smazat starý náhled
-            for file in os.listdir(pub_dir):
-                if file.startswith("cover"):
-                    os.remove(os.path.join(pub_dir, file))
+            # Smazat staré náhledy - podle složky na disku, evidence může být zastaralá
+            for old_cover in FileManifest.list_files(pub_dir, 'cover'):
+                os.remove(old_cover)
             # Kopírovat nový náhled
             cover_file = f"{pub_dir}/cover{os.path.splitext(self.cover_path)[1]}"
             shutil.copy2(self.cover_path, cover_file)
 
         # Aktualizace PDF
         if self.pdf_path and not self.pdf_path.startswith(pub_dir):
-            # Najít a smazat staré PDF
-            for file in os.listdir(pub_dir):
-                if file.endswith(".pdf"):
-                    os.remove(os.path.join(pub_dir, file))
+            # Smazat stará PDF - podle složky na disku, evidence může být zastaralá
+            for old_pdf in FileManifest.list_files(pub_dir, 'pdf'):
+                os.remove(old_pdf)
             # Kopírovat nové PDF
             pdf_file = f"{pub_dir}/{os.path.basename(self.pdf_path)}"
             shutil.copy2(self.pdf_path, pdf_file)
+            # Uložený text starého PDF už neplatí
+            PdfTextCache().invalidate(self.publication_id)
+
+        # Aktualizace evidence souborů a fulltextového indexu, text PDF zpracuje indexer na pozadí
+        manifest.update_publication(self.publication_id)
+        SearchIndex().update_publication(self.publication_id)
+        DataGeneration.bump()
+        BackgroundIndexer.notify(self, self.publication_id)
 
         self.close()
         
@@ -6374,7 +10034,8 @@ class SettingsMenuWidget(QWidget):
             "Uživatelské rozhraní",
             "Správa kategorií",
             "Publikace",
-            "Vzhled aplikace"
+            "Vzhled aplikace",
+            "Vyhledávání"
         ])
         
         self.settings_menu.currentRowChanged.connect(self.pageChanged.emit)
@@ -6398,6 +10059,8 @@ class SettingsContentWidget(QWidget):
             self.show_publication_settings()
         elif index == 4:
             self.show_appearance_settings()
+        elif index == 5:
+            self.show_search_settings()
 
     def clear_content(self):
         while self.content_layout.count():
@@ -6405,6 +10068,18 @@ class SettingsContentWidget(QWidget):
             if item.widget():
                 item.widget().deleteLater()
 
+    def _suspend_background_work(self):
+        """Zastaví práci s databází na pozadí před kopírováním nebo výměnou jejích souborů"""
+        main_window = self.window()
+        if isinstance(main_window, MainWindow):
+            main_window.suspend_background_work()
+
+    def _resume_background_work(self):
+        """Obnoví práci na pozadí po dokončení operace se soubory databází"""
+        main_window = self.window()
+        if isinstance(main_window, MainWindow):
+            main_window.resume_background_work()
+
     def export_database(self):
         file_path, _ = QFileDialog.getSaveFileName(None, "Export databáze", "", "ZIP archiv (*.zip)")
         if not file_path:
@@ -6455,9 +10130,11 @@ class SettingsContentWidget(QWidget):
             total_steps = 3  # DB, JSON, Publications
             current_step = 0
 
-            # Databáze
-            shutil.copy2("publications.db", temp_dir)
-            shutil.copy2("categories.db", temp_dir)
+            # Databáze - kopie přes SQLite včetně obsahu WAL, práce na pozadí
+            # stojí, aby databáze odpovídaly složce publikací
+            self._suspend_background_work()
+            for db in ["publications.db", "categories.db"]:
+                Database.snapshot(db, os.path.join(temp_dir, db))
             current_step += 1
             progress_bar.setValue(int(current_step/total_steps * 100))
 
@@ -6484,6 +10161,18 @@ class SettingsContentWidget(QWidget):
             progress_dialog.close()
             StyleHelper.create_message_box("Chyba", f"Při exportu došlo k chybě: {str(e)}", "warning")
 
+        finally:
+            self._resume_background_work()
+
+    def export_descriptions(self):
+        """Zapíše popisy všech publikací do souborů description.txt"""
+        try:
+            count = DescriptionStore().export_all()
+            FileManifest().reload()
+            StyleHelper.create_message_box("Export", f"Exportováno popisů: {count}", "info")
+        except OSError as e:
+            StyleHelper.create_message_box("Chyba", f"Při exportu popisů došlo k chybě: {str(e)}", "warning")
+
     def import_database(self):
         file_path, _ = QFileDialog.getOpenFileName(None, "Import databáze", "", "ZIP archiv (*.zip)")
         if not file_path:
@@ -6521,6 +10210,9 @@ class SettingsContentWidget(QWidget):
         progress_dialog.show()
         QApplication.processEvents()
 
+        # Ze zálohy se obnovuje, jen pokud ji vytvořil tento import celou
+        backup_dir = "backup_before_import"
+        backup_created = False
         try:
             temp_dir = "temp_import"
             if os.path.exists(temp_dir):
@@ -6538,27 +10230,40 @@ class SettingsContentWidget(QWidget):
                 if not os.path.exists(os.path.join(temp_dir, file)):
                     raise FileNotFoundError(f"Chybí požadovaný soubor: {file}")
 
-            # Záloha současných dat
-            backup_dir = "backup_before_import"
+            # Záloha současných dat, soubory databází se vymění až po zastavení
+            # práce na pozadí a zavření všech připojení
+            self._suspend_background_work()
+            Database.close_all()
             if os.path.exists(backup_dir):
                 shutil.rmtree(backup_dir)
             os.makedirs(backup_dir)
             
             for file in os.listdir("."):
-                if file.endswith(".db") or file.endswith(".json"):
+                if file.endswith(".db"):
+                    Database.snapshot(file, os.path.join(backup_dir, file))
+                elif file.endswith(".json"):
                     shutil.copy2(file, backup_dir)
             if os.path.exists("publications"):
                 shutil.copytree("publications", os.path.join(backup_dir, "publications"))
+            backup_created = True
             progress_bar.setValue(66)
 
             # Import nových dat
             for file in os.listdir(temp_dir):
-                if file.endswith(".db") or file.endswith(".json"):
+                if file.endswith(".db"):
+                    Database.replace_file(os.path.join(temp_dir, file), file)
+                elif file.endswith(".json"):
                     shutil.copy2(os.path.join(temp_dir, file), ".")
             
             if os.path.exists("publications"):
                 shutil.rmtree("publications")
             shutil.copytree(os.path.join(temp_dir, "publications"), "publications")
+
+            # Starší databáze se převedou na aktuální schéma, evidence souborů
+            # musí odpovídat importované složce publikací
+            SchemaMigrations.upgrade_all()
+            FileManifest().reload()
+            DataGeneration.bump()
             
             progress_bar.setValue(100)
             shutil.rmtree(temp_dir)
@@ -6575,20 +10280,35 @@ class SettingsContentWidget(QWidget):
             StyleHelper.create_message_box("Chyba", f"Při importu došlo k chybě: {str(e)}", "warning")
             
             # Obnovení ze zálohy v případě chyby
-            if os.path.exists(backup_dir):
-                for file in os.listdir(backup_dir):
-                    source = os.path.join(backup_dir, file)
-                    if os.path.isdir(source):
-                        if os.path.exists(file):
-                            shutil.rmtree(file)
-                        shutil.copytree(source, file)
-                    else:
-                        shutil.copy2(source, ".")
-                shutil.rmtree(backup_dir)
+            if backup_created:
+                try:
+                    Database.close_all()
+                    for file in os.listdir(backup_dir):
+                        source = os.path.join(backup_dir, file)
+                        if os.path.isdir(source):
+                            if os.path.exists(file):
+                                shutil.rmtree(file)
+                            shutil.copytree(source, file)
+                        elif file.endswith(".db"):
+                            Database.replace_file(source, file)
+                        else:
+                            shutil.copy2(source, ".")
+                    shutil.rmtree(backup_dir)
+                    SchemaMigrations.upgrade_all()
+                    FileManifest().reload()
+                    DataGeneration.bump()
+                except Exception as restore_error:
+                    StyleHelper.create_message_box(
+                        "Chyba",
+                        f"Původní data se nepodařilo obnovit: {str(restore_error)}\n"
+                        f"Záloha zůstala ve složce '{backup_dir}'.",
+                        "warning"
+                    )
 
         finally:
             if os.path.exists(temp_dir):
                 shutil.rmtree(temp_dir)
+            self._resume_background_work()
 
     def create_backup(self):
         backup_dir = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -6630,10 +10350,12 @@ class SettingsContentWidget(QWidget):
             current_step = 0
             total_steps = 3
 
-            # Zálohování databází
+            # Zálohování databází - kopie přes SQLite včetně obsahu WAL, práce
+            # na pozadí stojí, aby databáze odpovídaly složce publikací
+            self._suspend_background_work()
             for db in ["publications.db", "categories.db"]:
                 if os.path.exists(db):
-                    shutil.copy2(db, os.path.join(backup_dir, db))
+                    Database.snapshot(db, os.path.join(backup_dir, db))
             current_step += 1
             progress_bar.setValue(int(current_step/total_steps * 100))
 
@@ -6661,6 +10383,9 @@ class SettingsContentWidget(QWidget):
             progress_dialog.close()
             StyleHelper.create_message_box("Chyba", f"Při vytváření zálohy došlo k chybě: {str(e)}", "warning")
 
+        finally:
+            self._resume_background_work()
+
     def restore_backup(self):
         # Dialog pro výběr složky se zálohou
         backup_dir = QFileDialog.getExistingDirectory(None, "Vyberte složku se zálohou", "",
@@ -6715,11 +10440,12 @@ class SettingsContentWidget(QWidget):
             current_step = 0
             total_steps = 3
 
-            # Obnova databází
+            # Obnova databází, soubory se vymění až po zastavení práce na pozadí
+            # a zavření všech připojení
+            self._suspend_background_work()
+            Database.close_all()
             for db in required_files:
-                if os.path.exists(db):
-                    os.remove(db)
-                shutil.copy2(os.path.join(backup_dir, db), ".")
+                Database.replace_file(os.path.join(backup_dir, db), db)
             current_step += 1
             progress_bar.setValue(int(current_step/total_steps * 100))
 
@@ -6738,6 +10464,11 @@ class SettingsContentWidget(QWidget):
                 if os.path.exists("publications"):
                     shutil.rmtree("publications")
                 shutil.copytree(backup_publications, "publications")
+            # Starší záloha se převede na aktuální schéma, evidence souborů
+            # musí odpovídat obnovené složce publikací
+            SchemaMigrations.upgrade_all()
+            FileManifest().reload()
+            DataGeneration.bump()
             current_step += 1
             progress_bar.setValue(100)
 
@@ -6752,11 +10483,15 @@ class SettingsContentWidget(QWidget):
             progress_dialog.close()
             StyleHelper.create_message_box("Chyba", f"Při obnovování ze zálohy došlo k chybě: {str(e)}", "warning")
 
+        finally:
+            self._resume_background_work()
+
     def clear_cache(self):
         files_to_clear = {
             'search_history.json': 'Historie vyhledávání',
             'search_favorites.json': 'Oblíbené položky vyhledávání',
-            'search_favorites_settings.json': 'Nastavení vyhledávání'
+            'search_favorites_settings.json': 'Nastavení vyhledávání',
+            'search_results': 'Uložené výsledky vyhledávání'
         }
 
         # Dialog pro výběr co vyčistit
@@ -6814,7 +10549,11 @@ class SettingsContentWidget(QWidget):
         if dialog.exec_() == QDialog.Accepted:
             cleared = []
             for file, cb in checkboxes.items():
-                if cb.isChecked() and os.path.exists(file):
+                if cb.isChecked() and file == 'search_results':
+                    # Výsledky vyhledávání jsou jen v paměti
+                    SearchManager.clear_cache()
+                    cleared.append(files_to_clear[file])
+                elif cb.isChecked() and os.path.exists(file):
                     try:
                         if file.endswith('.json'):
                             with open(file, 'w') as f:
@@ -6872,10 +10611,17 @@ class SettingsContentWidget(QWidget):
 
         export_btn = QPushButton("Exportovat databázi")
         import_btn = QPushButton("Importovat databázi")
+        export_descriptions_btn = QPushButton("Exportovat popisy do souborů")
+        export_descriptions_btn.setToolTip(
+            "Popisy jsou uložené v databázi, export je zapíše také do souborů "
+            "publications/<id>/description.txt v kódování UTF-8"
+        )
         StyleHelper.apply_button_style(export_btn)
         StyleHelper.apply_button_style(import_btn)
+        StyleHelper.apply_button_style(export_descriptions_btn)
         db_layout.addWidget(export_btn)
         db_layout.addWidget(import_btn)
+        db_layout.addWidget(export_descriptions_btn)
 
         backup_group = QGroupBox("Zálohování")
         backup_group.setStyleSheet(db_group.styleSheet())
@@ -6892,6 +10638,15 @@ class SettingsContentWidget(QWidget):
         cache_group.setStyleSheet(db_group.styleSheet())
         cache_layout = QVBoxLayout(cache_group)
 
+        # Statistika cache výsledků vyhledávání
+        stats = SearchManager.cache_stats()
+        cache_stats_label = QLabel(
+            f"Uložené výsledky vyhledávání: {stats['entries']}/{stats['max_entries']}, "
+            f"úspěšnost {stats['hit_rate']} % ({stats['hits']} z {stats['hits'] + stats['misses']})"
+        )
+        cache_stats_label.setStyleSheet("color: white; font-weight: normal;")
+        cache_layout.addWidget(cache_stats_label)
+
         clear_cache_btn = QPushButton("Vyčistit mezipaměť")
         StyleHelper.apply_button_style(clear_cache_btn)
         cache_layout.addWidget(clear_cache_btn)
@@ -6905,6 +10660,7 @@ class SettingsContentWidget(QWidget):
 
         export_btn.clicked.connect(self.export_database)
         import_btn.clicked.connect(self.import_database)
+        export_descriptions_btn.clicked.connect(self.export_descriptions)
         create_backup_btn.clicked.connect(self.create_backup)
         restore_backup_btn.clicked.connect(self.restore_backup)
         clear_cache_btn.clicked.connect(self.clear_cache)
@@ -7297,14 +11053,109 @@ class SettingsContentWidget(QWidget):
         history_layout.addWidget(history_label)
         history_layout.addWidget(self.history_size_spin)
 
+        # Výkon vyhledávání v PDF
+        performance_group = QGroupBox("Výkon vyhledávání")
+        performance_group.setStyleSheet(checkboxes_group.styleSheet())
+        performance_layout = QVBoxLayout(performance_group)
+
+        workers_label = QLabel("Počet procesů pro zpracování PDF (1 = bez paralelizace):")
+        workers_label.setStyleSheet("color: white;")
+
+        self.pdf_workers_spin = QSpinBox()
+        self.pdf_workers_spin.setRange(1, max(os.cpu_count() or 1, 1) * 2)
+        self.pdf_workers_spin.setStyleSheet(self.history_size_spin.styleSheet())
+
+        performance_layout.addWidget(workers_label)
+        performance_layout.addWidget(self.pdf_workers_spin)
+
+        # Živé vyhledávání při psaní (pouze názvy a popisy)
+        self.live_search_check = QCheckBox("Vyhledávat při psaní (názvy a popisy)")
+        self.live_search_check.setStyleSheet(checkbox_style)
+        performance_layout.addWidget(self.live_search_check)
+
+        live_delay_label = QLabel("Prodleva před spuštěním vyhledávání (ms):")
+        live_delay_label.setStyleSheet("color: white;")
+
+        self.live_delay_spin = QSpinBox()
+        self.live_delay_spin.setRange(100, 2000)
+        self.live_delay_spin.setSingleStep(50)
+        self.live_delay_spin.setStyleSheet(self.history_size_spin.styleSheet())
+
+        performance_layout.addWidget(live_delay_label)
+        performance_layout.addWidget(self.live_delay_spin)
+
+        # Výňatky nálezů
+        snippet_group = QGroupBox("Výňatky nálezů")
+        snippet_group.setStyleSheet(checkboxes_group.styleSheet())
+        snippet_layout = QVBoxLayout(snippet_group)
+
+        context_label = QLabel("Počet znaků před a za nálezem:")
+        context_label.setStyleSheet("color: white;")
+        self.context_size_spin = QSpinBox()
+        self.context_size_spin.setRange(10, 500)
+        self.context_size_spin.setSingleStep(10)
+        self.context_size_spin.setStyleSheet(self.history_size_spin.styleSheet())
+
+        windows_label = QLabel("Počet úseků s nálezy v jednom výsledku:")
+        windows_label.setStyleSheet("color: white;")
+        self.snippet_windows_spin = QSpinBox()
+        self.snippet_windows_spin.setRange(1, 5)
+        self.snippet_windows_spin.setStyleSheet(self.history_size_spin.styleSheet())
+
+        snippet_layout.addWidget(context_label)
+        snippet_layout.addWidget(self.context_size_spin)
+        snippet_layout.addWidget(windows_label)
+        snippet_layout.addWidget(self.snippet_windows_spin)
+
+        # Řazení podle relevance
+        ranking_group = QGroupBox("Řazení podle relevance")
+        ranking_group.setStyleSheet(checkboxes_group.styleSheet())
+        ranking_layout = QGridLayout(ranking_group)
+
+        self.ranking_check = QCheckBox("Řadit výsledky podle relevance")
+        self.ranking_check.setStyleSheet(checkbox_style)
+        ranking_layout.addWidget(self.ranking_check, 0, 0, 1, 2)
+
+        ranking_labels = {
+            'title': "Váha nálezu v názvu:",
+            'description': "Váha nálezu v popisu:",
+            'pdf': "Váha nálezu v PDF:",
+            'frequency': "Váha četnosti výskytů:",
+            'position': "Váha pozice prvního výskytu:",
+            'proximity': "Váha blízkosti hledaných slov:"
+        }
+        self.ranking_spins = {}
+        for row, (name, text) in enumerate(ranking_labels.items(), 1):
+            label = QLabel(text)
+            label.setStyleSheet("color: white;")
+            spin = QDoubleSpinBox()
+            spin.setRange(0.0, 10.0)
+            spin.setSingleStep(0.5)
+            spin.setDecimals(1)
+            spin.setStyleSheet(self.history_size_spin.styleSheet().replace("QSpinBox", "QDoubleSpinBox"))
+            ranking_layout.addWidget(label, row, 0)
+            ranking_layout.addWidget(spin, row, 1)
+            self.ranking_spins[name] = spin
+
         # Načtení hodnot
         settings_manager = self.window().settings_manager
-        search_settings = settings_manager.get_setting('ui', 'search')
+        search_settings = settings_manager.get_setting('ui', 'search', default={})
+        default_checkboxes = search_settings.get('default_checkboxes', {})
         
-        self.title_check.setChecked(search_settings['default_checkboxes'].get('title', True))
-        self.desc_check.setChecked(search_settings['default_checkboxes'].get('description', False))
-        self.pdf_check.setChecked(search_settings['default_checkboxes'].get('pdf', False))
+        self.title_check.setChecked(default_checkboxes.get('title', True))
+        self.desc_check.setChecked(default_checkboxes.get('description', False))
+        self.pdf_check.setChecked(default_checkboxes.get('pdf', False))
         self.history_size_spin.setValue(search_settings.get('history_size', 100))
+        self.pdf_workers_spin.setValue(search_settings.get('pdf_workers', os.cpu_count() or 1))
+        self.live_search_check.setChecked(search_settings.get('live_search', False))
+        self.live_delay_spin.setValue(search_settings.get('live_delay', 300))
+        self.context_size_spin.setValue(search_settings.get('context_size', 50))
+        self.snippet_windows_spin.setValue(search_settings.get('snippet_windows', 1))
+        self.ranking_check.setChecked(search_settings.get('ranking_enabled', True))
+        ranking_weights = {**RelevanceScorer.DEFAULT_WEIGHTS, **search_settings.get('ranking_weights', {})}
+        for name, spin in self.ranking_spins.items():
+            spin.setValue(ranking_weights[name])
+            spin.setEnabled(self.ranking_check.isChecked())
 
         # Připojení signálů
         self.title_check.stateChanged.connect(
@@ -7319,12 +11170,44 @@ class SettingsContentWidget(QWidget):
         self.history_size_spin.valueChanged.connect(
             lambda value: settings_manager.set_setting(value, 'ui', 'search', 'history_size')
         )
+        self.pdf_workers_spin.valueChanged.connect(
+            lambda value: settings_manager.set_setting(value, 'ui', 'search', 'pdf_workers')
+        )
+        self.live_search_check.stateChanged.connect(
+            lambda state: settings_manager.set_setting(bool(state), 'ui', 'search', 'live_search')
+        )
+        self.live_delay_spin.valueChanged.connect(
+            lambda value: settings_manager.set_setting(value, 'ui', 'search', 'live_delay')
+        )
+        self.context_size_spin.valueChanged.connect(self.on_context_size_changed)
+        self.snippet_windows_spin.valueChanged.connect(self.on_snippet_windows_changed)
+        self.ranking_check.stateChanged.connect(
+            lambda state: settings_manager.set_setting(bool(state), 'ui', 'search', 'ranking_enabled')
+        )
+        for name, spin in self.ranking_spins.items():
+            self.ranking_check.toggled.connect(spin.setEnabled)
+            spin.valueChanged.connect(
+                lambda value, name=name: settings_manager.set_setting(value, 'ui', 'search', 'ranking_weights', name)
+            )
 
         layout.addWidget(checkboxes_group)
         layout.addWidget(history_group)
+        layout.addWidget(performance_group)
+        layout.addWidget(snippet_group)
+        layout.addWidget(ranking_group)
         layout.addStretch()
 
         self.content_layout.addWidget(container)
+
+    def on_context_size_changed(self, value):
+        """Uloží délku kontextu výňatků, projeví se při dalším zobrazení výsledků"""
+        self.window().settings_manager.set_setting(value, 'ui', 'search', 'context_size')
+        LazySnippet.context_size = value
+
+    def on_snippet_windows_changed(self, value):
+        """Uloží počet úseků s nálezy ve výňatku"""
+        self.window().settings_manager.set_setting(value, 'ui', 'search', 'snippet_windows')
+        LazySnippet.max_windows = value
         
     def show_dialog_settings(self):
         container = QWidget()
@@ -7420,7 +11303,14 @@ class SettingsManager:
                         'description': False,
                         'pdf': False
                     },
-                    'history_size': 100
+                    'history_size': 100,
+                    'pdf_workers': os.cpu_count() or 1,
+                    'live_search': False,
+                    'live_delay': 300,
+                    'context_size': 50,
+                    'snippet_windows': 1,
+                    'ranking_enabled': True,
+                    'ranking_weights': dict(RelevanceScorer.DEFAULT_WEIGHTS)
                 },
                 'dialogs': {
                     'confirm_delete': True,
@@ -7568,137 +11458,71 @@ class CategoryManagementWidget(QWidget):
 
     def handle_item_moved(self, item, parent, old_index=None, new_index=None):
         """
-        Zpracuje přesun položky ve stromě.
-        Pokud jsou zadány indexy, jde o přeuspořádání.
-        Pokud ne, jde o změnu hierarchie.
+        Zpracuje přesun položky ve stromě. Položka už je ve stromě na novém
+        místě, do databáze se zapíše jen její rodič a klíč pořadí mezi sousedy.
         """
         if not item:
             return
-                
+
         category_type = self.tab_mapping[self.tab_combo.currentText()]
-        conn = sqlite3.connect('categories.db')
-        cursor = conn.cursor()
-        
+        if parent is None or parent == self.categories_tree.invisibleRootItem():
+            parent = self.categories_tree.invisibleRootItem()
+            parent_id = None
+        else:
+            parent_id = parent.data(0, Qt.UserRole)
+
+        index = parent.indexOfChild(item)
+        previous_item = parent.child(index - 1) if index > 0 else None
+        next_item = parent.child(index + 1) if index + 1 < parent.childCount() else None
+
         try:
-            cursor.execute("BEGIN TRANSACTION")
-            
-            if old_index is not None and new_index is not None:
-                # Změna pořadí
-                items = []
-                if parent == self.categories_tree.invisibleRootItem():
-                    for i in range(self.categories_tree.topLevelItemCount()):
-                        items.append(self.categories_tree.topLevelItem(i))
-                else:
-                    for i in range(parent.childCount()):
-                        items.append(parent.child(i))
-                
-                # Aktualizace pořadí
-                for i, current_item in enumerate(items):
-                    cursor.execute(f"""
-                        UPDATE {category_type}_categories
-                        SET sort_order = ?
-                        WHERE id = ?
-                    """, (i, current_item.data(0, Qt.UserRole)))
-                    
-                print(f"Updated order for {len(items)} items")
-            else:
-                # Změna hierarchie
-                if parent and parent != self.categories_tree.invisibleRootItem():
-                    # Přesun pod jinou kategorii
-                    parent_id = parent.data(0, Qt.UserRole)
-                    cursor.execute(f"""
-                        UPDATE {category_type}_categories
-                        SET parent_id = ?, sort_order = (
-                            SELECT COALESCE(MAX(sort_order) + 1, 0)
-                            FROM {category_type}_categories
-                            WHERE parent_id = ?
-                        )
-                        WHERE id = ?
-                    """, (parent_id, parent_id, item.data(0, Qt.UserRole)))
-                else:
-                    # Přesun na nejvyšší úroveň
-                    cursor.execute(f"""
-                        UPDATE {category_type}_categories
-                        SET parent_id = NULL, sort_order = (
-                            SELECT COALESCE(MAX(sort_order) + 1, 0)
-                            FROM {category_type}_categories
-                            WHERE parent_id IS NULL
-                        )
-                        WHERE id = ?
-                    """, (item.data(0, Qt.UserRole),))
-                
-                print(f"Updated hierarchy for item {item.text(0)}")
-                    
-            conn.commit()
-            # Obnovení pohledu ve správci kategorií
-            self.load_categories()
-            
-            # Obnovení kategorií pro všechny záložky stejného typu
-            for tab_name, db_type in self.tab_mapping.items():
-                if db_type == category_type:
-                    self.main_window.load_categories_for_current_tab(db_type)
-                    
-        except Exception as e:
-            conn.rollback()
+            written = self.category_manager.reorder_category(
+                category_type,
+                item.data(0, Qt.UserRole),
+                parent_id,
+                previous_item.data(0, Qt.UserRole) if previous_item else None,
+                next_item.data(0, Qt.UserRole) if next_item else None
+            )
+            print(f"Updated position of {item.text(0)} ({written} rows written)")
+        except sqlite3.Error as e:
             print(f"Error details: {e}")
-            print(f"Error type: {type(e)}")
-            import traceback
-            traceback.print_exc()  # Tento řádek poskytne kompletní stack trace
             StyleHelper.create_message_box(
                 "Chyba",
                 f"Nepodařilo se aktualizovat pozici kategorie: {str(e)}",
                 "warning",
                 self
             )
-        finally:
-            conn.close()
-        
+            # Strom se vrátí do stavu uloženého v databázi
+            self.load_categories()
+            if self.main_window:
+                self.main_window.load_categories_for_current_tab(category_type)
+            return
+
+        # Strom v hlavním okně se upraví na místě
+        if self.main_window:
+            self.main_window.move_category_item(category_type, item.data(0, Qt.UserRole), parent_id, index)
+
     def load_categories(self, tab=None):
-        """Načte kategorie pro vybranou záložku"""
-        self.categories_tree.clear()
-        
+        """Načte kategorie pro vybranou záložku (na pozadí)"""
         tab_name = tab if tab else self.tab_combo.currentText()
         category_type = self.tab_mapping.get(tab_name)
-        
-        if category_type:
-            conn = sqlite3.connect('categories.db')
-            cursor = conn.cursor()
-            
-            try:
-                # Načtení hlavních kategorií seřazených podle sort_order
-                cursor.execute(f"""
-                    SELECT id, name 
-                    FROM {category_type}_categories 
-                    WHERE parent_id IS NULL 
-                    ORDER BY sort_order
-                """)
-                
-                categories = cursor.fetchall()
-                
-                for cat_id, cat_name in categories:
-                    category_item = QTreeWidgetItem([cat_name])
-                    category_item.setData(0, Qt.UserRole, cat_id)
-                    self.categories_tree.addTopLevelItem(category_item)
-                    
-                    # Načtení podkategorií seřazených podle sort_order
-                    cursor.execute(f"""
-                        SELECT id, name 
-                        FROM {category_type}_categories 
-                        WHERE parent_id = ? 
-                        ORDER BY sort_order
-                    """, (cat_id,))
-                    
-                    subcategories = cursor.fetchall()
-                    
-                    for sub_id, sub_name in subcategories:
-                        subcategory_item = QTreeWidgetItem([sub_name])
-                        subcategory_item.setData(0, Qt.UserRole, sub_id)
-                        category_item.addChild(subcategory_item)
-                    
-                    category_item.setExpanded(True)
-                    
-            finally:
-                conn.close()
+
+        self.categories_tree.clear()
+        if not category_type:
+            DataService.instance().cancel((id(self), 'categories'))
+            return
+
+        placeholder = QTreeWidgetItem(self.categories_tree, ["Načítání..."])
+        placeholder.setFlags(Qt.NoItemFlags)
+
+        # Celý strom jedním dotazem, hlavní kategorie rozbalené
+        DataService.instance().submit(
+            self.category_manager.load_category_tree, category_type,
+            key=(id(self), 'categories'),
+            owner=self,
+            on_result=lambda rows: build_category_tree(self.categories_tree, rows, expand_depth=0),
+            on_error=lambda message: self.categories_tree.clear()
+        )
 
     def rename_category(self):
         """Přejmenuje vybranou kategorii nebo podkategorii"""
@@ -7722,7 +11546,7 @@ class CategoryManagementWidget(QWidget):
             category_type = self.tab_mapping[self.tab_combo.currentText()]
             category_id = selected_item.data(0, Qt.UserRole)
             
-            conn = sqlite3.connect('categories.db')
+            conn = Database.connect('categories.db')
             cursor = conn.cursor()
             
             try:
@@ -7733,6 +11557,7 @@ class CategoryManagementWidget(QWidget):
                 """, (new_name, category_id))
                 
                 conn.commit()
+                DataGeneration.bump()
                 selected_item.setText(0, new_name)
                 
             except Exception as e:
@@ -7870,38 +11695,33 @@ class CategoryManagementWidget(QWidget):
         if dialog.exec_() == QDialog.Accepted:
             target_tab = tab_combo.currentText()
             move_as_subcategory = make_subcategory.isChecked()
-            target_category = self.target_category_combo.currentText() if move_as_subcategory else None
+            target_parent_id = self.target_category_combo.currentData() if move_as_subcategory else None
             
             self._move_category_to_tab(
                 selected_item,
                 target_tab,
-                target_category
+                target_parent_id
             )
 
     def _update_target_categories(self, tab_name, combo):
+        """Naplní výběr cílové kategorie hlavními kategoriemi záložky (na pozadí)"""
         combo.clear()
         category_type = self.tab_mapping[tab_name]
-        
-        conn = sqlite3.connect('categories.db')
-        cursor = conn.cursor()
-        
-        try:
-            # Získat všechny hlavní kategorie
-            cursor.execute(f"""
-                SELECT id, name 
-                FROM {category_type}_categories 
-                WHERE parent_id IS NULL
-            """)
-            
-            categories = cursor.fetchall()
-            for cat_id, cat_name in categories:
-                # Odstraňte omezení, které vylučuje kategorie s podkategoriemi
-                combo.addItem(cat_name)
-        finally:
-            conn.close()
 
-    def _move_category_to_tab(self, item, target_tab, target_category=None):
-        """Přesune kategorii do jiné záložky"""
+        def fill(categories):
+            combo.clear()
+            for category in categories:
+                combo.addItem(category['name'], category['id'])
+
+        DataService.instance().submit(
+            self.category_manager.load_categories, category_type,
+            key=(id(combo), 'target_categories'),
+            owner=combo,
+            on_result=fill
+        )
+
+    def _move_category_to_tab(self, item, target_tab, target_parent_id=None):
+        """Přesune kategorii do jiné záložky (pod hlavní kategorii target_parent_id)"""
         source_type = self.tab_mapping[self.tab_combo.currentText()]
         target_type = self.tab_mapping[target_tab]
         
@@ -7910,98 +11730,27 @@ class CategoryManagementWidget(QWidget):
         
         print(f"Moving category: {category_name} (ID: {category_id})")
         print(f"From: {source_type} to: {target_type}")
-        print(f"Target category: {target_category}")
+        print(f"Target category ID: {target_parent_id}")
 
-        # Připojení k databázím
-        cat_conn = sqlite3.connect('categories.db')
-        cat_cursor = cat_conn.cursor()
-        
-        pub_conn = sqlite3.connect('publications.db')  # Samostatné připojení pro publikace
-        pub_cursor = pub_conn.cursor()
-        
         try:
-            cat_cursor.execute("BEGIN TRANSACTION")
-            pub_cursor.execute("BEGIN TRANSACTION")
-            
-            # Získání cílové kategorie ID
-            target_parent_id = None
-            if target_category:
-                cat_cursor.execute(f"""
-                    SELECT id FROM {target_type}_categories 
-                    WHERE name = ? AND parent_id IS NULL
-                """, (target_category,))
-                result = cat_cursor.fetchone()
-                if result:
-                    target_parent_id = result[0]
-                    print(f"Target parent ID: {target_parent_id}")
-            
-            # Vložení nové kategorie
-            cat_cursor.execute(f"""
-                INSERT INTO {target_type}_categories (name, parent_id)
-                VALUES (?, ?)
-            """, (category_name, target_parent_id))
-            
-            new_category_id = cat_cursor.lastrowid
+            # Kategorie s podkategoriemi se přesunou v jedné transakci,
+            # publikace se přeřadí podle žurnálu
+            new_category_id = self.category_manager.move_category(
+                source_type, category_id, target_type, target_parent_id
+            )
             print(f"New category ID: {new_category_id}")
-            
-            # Přesun podkategorií
-            if item.childCount() > 0:
-                subcategories = []
-                for i in range(item.childCount()):
-                    child = item.child(i)
-                    subcategories.append((child.text(0), child.data(0, Qt.UserRole)))
-                
-                for subcat_name, old_subcat_id in subcategories:
-                    # Vložení nové podkategorie
-                    cat_cursor.execute(f"""
-                        INSERT INTO {target_type}_categories (name, parent_id)
-                        VALUES (?, ?)
-                    """, (subcat_name, new_category_id))
-                    
-                    new_subcat_id = cat_cursor.lastrowid
-                    print(f"Moving subcategory: {subcat_name} ({old_subcat_id} -> {new_subcat_id})")
-                    
-                    # Aktualizace publikací pro podkategorii
-                    pub_cursor.execute("""
-                        UPDATE publications 
-                        SET category_type = ?, category_id = ?
-                        WHERE category_type = ? AND category_id = ?
-                    """, (target_type, new_subcat_id, source_type, old_subcat_id))
-            
-            # Aktualizace publikací hlavní kategorie
-            pub_cursor.execute("""
-                UPDATE publications 
-                SET category_type = ?, category_id = ?
-                WHERE category_type = ? AND category_id = ?
-            """, (target_type, new_category_id, source_type, category_id))
-            
-            # Smazání původních kategorií
-            cat_cursor.execute(f"""
-                DELETE FROM {source_type}_categories
-                WHERE id = ? OR parent_id = ?
-            """, (category_id, category_id))
-            
-            cat_conn.commit()
-            pub_conn.commit()
-            print("Transaction committed successfully")
-            
+
             # Obnovení zobrazení
             self.load_categories()
-            
+
         except Exception as e:
-            cat_conn.rollback()
-            pub_conn.rollback()
             print(f"Error during category move: {str(e)}")
-            print(f"SQL State: {e.__cause__}")
             StyleHelper.create_message_box(
                 "Chyba",
                 f"Nepodařilo se přesunout kategorii: {str(e)}",
                 "warning",
                 self
             )
-        finally:
-            cat_conn.close()
-            pub_conn.close()
 
     def handle_item_drop(self, event):
         """Zpracuje přetažení položky v stromě"""
@@ -8015,7 +11764,7 @@ class CategoryManagementWidget(QWidget):
             
         category_type = self.tab_mapping[self.tab_combo.currentText()]
         
-        conn = sqlite3.connect('categories.db')
+        conn = Database.connect('categories.db')
         cursor = conn.cursor()
         
         try:
@@ -8204,6 +11953,13 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.settings_manager = SettingsManager()
         self.category_manager = CategoryManager()
+        # Evidence souborů se poprvé načte (a případně porovná se složkou
+        # publikací) ve fondu vláken, úlohy zobrazení na ni počkají tam
+        DataService.instance().submit(FileManifest, key=(id(self), 'file_manifest'))
+        # Vybraná kategorie v levém okně
+        self.selected_category = None
+        self.selected_category_id = None
+        self.selected_tab = None
         self.setWindowFlags(Qt.FramelessWindowHint)
         self.setAttribute(Qt.WA_TranslucentBackground)
         
@@ -8415,6 +12171,18 @@ class MainWindow(QMainWindow):
         self.control_widget.setParent(self)
         self.control_widget.move(1090, 10)
 
+        # Stav indexace na pozadí
+        self.index_status_label = QLabel()
+        self.index_status_label.setStyleSheet("color: #888888; font-size: 9pt;")
+        self.index_status_label.hide()
+        top_layout.addWidget(self.index_status_label, alignment=Qt.AlignRight | Qt.AlignBottom)
+
+        # Indexer na pozadí - při startu zkontroluje změněné soubory
+        self.background_indexer = BackgroundIndexer(parent=self)
+        self.background_indexer.progress.connect(self.update_index_status)
+        self.background_indexer.start(QThread.LowestPriority)
+        self.background_indexer.request_scan()
+
         # Connect signálů
         self.publications_tree.itemSelectionChanged.connect(self.update_add_publication_button_state)
         self.publications_tree.itemSelectionChanged.connect(self.save_last_category)
@@ -8513,9 +12281,12 @@ class MainWindow(QMainWindow):
         else:
             # Voláno ze standardního seznamu publikací
             item = self.publications_model.itemFromIndex(index_or_id)
-            pub_id = item.data(QtCore.Qt.UserRole)
+            pub_id = item.data(QtCore.Qt.UserRole) if item else None
+        if pub_id is None:
+            # Zástupná položka během načítání seznamu
+            return
         
-        # Otevření okna s detaily
+        # Otevření okna s detaily (data si okno načte na pozadí)
         publication_details_window = PublicationDetailsWindow(
             self,
             publication_id=pub_id,
@@ -8524,41 +12295,60 @@ class MainWindow(QMainWindow):
         publication_details_window.exec_()
         
         # Obnovení zobrazení po zavření okna
-        if hasattr(self, 'selected_category') and hasattr(self, 'selected_tab'):
-            if self.selected_category and self.selected_tab:
-                category_id = self.category_manager.get_category_id(self.selected_tab, self.selected_category)
-                self.load_publications_for_category(category_id, self.selected_tab)
+        if self.selected_category_id is not None and self.selected_tab:
+            self.load_publications_for_category(self.selected_category_id, self.selected_tab)
         
         # Zrušení focusu a výběru po zavření okna
         self.publications_view.clearSelection()
         self.publications_view.clearFocus()
         
     def load_publications_for_category(self, category_id, category_type):
+        """
+        Načte publikace kategorie na pozadí, do té doby seznam ukazuje
+        zástupnou položku. Výsledek dřívějšího výběru se zahodí.
+        """
         self.publications_model.clear()
+        placeholder = PublicationItem(None, "Načítání...", None)
+        placeholder.setEnabled(False)
+        self.publications_model.appendRow(placeholder)
+
+        DataService.instance().submit(
+            self.fetch_publications, category_id, category_type,
+            key=(id(self), 'publications'),
+            owner=self,
+            on_result=self.show_publications,
+            on_error=lambda message: self.publications_model.clear()
+        )
 
-        conn = sqlite3.connect('publications.db')
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT id, title 
-            FROM publications
-            WHERE category_id = ? AND category_type = ?
-        ''', (category_id, category_type))
+    def fetch_publications(self, category_id, category_type):
+        """Načte publikace kategorie s náhledy (běží mimo vlákno GUI)"""
+        conn = Database.connect('publications.db')
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, title 
+                FROM publications
+                WHERE category_id = ? AND category_type = ?
+            ''', (category_id, category_type))
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
 
-        for pub_id, title in cursor.fetchall():
+        publications = []
+        for pub_id, title in rows:
             cover_path = self.find_cover_image(pub_id)
-            item = PublicationItem(cover_path, title, pub_id)  # Předání ID publikace
-            self.publications_model.appendRow(item)
+            publications.append((pub_id, title, cover_path, read_scaled_image(cover_path)))
+        return publications
 
-        conn.close()
+    def show_publications(self, publications):
+        """Zobrazí publikace načtené na pozadí"""
+        self.publications_model.clear()
+        for pub_id, title, cover_path, image in publications:
+            item = PublicationItem(cover_path, title, pub_id, image=image)  # Předání ID publikace
+            self.publications_model.appendRow(item)
 
     def find_cover_image(self, pub_id):
-        pub_dir = f"publications/{pub_id}"
-        if os.path.exists(pub_dir):
-            for file in os.listdir(pub_dir):
-                if file.startswith("cover"):
-                    return os.path.join(pub_dir, file)
-        return None  # Pokud obrázek neexistuje
+        return FileManifest().get_cover(pub_id)  # None, pokud obrázek neexistuje
  
     
     def init_tree_widget(self):
@@ -8640,11 +12430,17 @@ class MainWindow(QMainWindow):
             self
         )
         if reply == QDialog.Accepted:
-            category_id = self.category_manager.get_category_id(category_type, item.text(0))
-            self.category_manager.delete_category(category_type, category_id)
-            self.load_categories_for_current_tab(category_type)
+            self._delete_category_item(category_type, item)
 
 
+    def _delete_category_item(self, category_type, item):
+        """Smaže kategorii položky stromu, publikace přeřadí do nadřazené kategorie"""
+        try:
+            self.category_manager.delete_category(category_type, item.data(0, Qt.UserRole))
+        except sqlite3.Error as e:
+            StyleHelper.create_message_box("Chyba", f"Nepodařilo se smazat kategorii: {str(e)}", "warning", self)
+        self.load_categories_for_current_tab(category_type)
+
     def delete_subcategory(self):
         """Smaže vybranou podkategorii"""
         category_type = self.tabs.get_current_category_type()
@@ -8665,14 +12461,12 @@ class MainWindow(QMainWindow):
         # Potvrzovací dialog
         reply = StyleHelper.create_message_box(
             "Potvrzení",
-            "Opravdu chcete smazat tuto podkategorii?",
+            "Opravdu chcete smazat tuto podkategorii?\nJejí publikace se přesunou do nadřazené kategorie.",
             "question",
             self
         )
         if reply == QDialog.Accepted:
-            category_id = self.category_manager.get_category_id(category_type, item.text(0))
-            self.category_manager.delete_category(category_type, category_id)
-            self.load_categories_for_current_tab(category_type)
+            self._delete_category_item(category_type, item)
 
     def open_add_publication_window(self):
         """Otevře nové externí okno pro přidání publikace."""
@@ -8687,8 +12481,7 @@ class MainWindow(QMainWindow):
             add_publication_window.exec_()
 
             # Po zavření okna pro přidání publikace obnovíme seznam
-            category_id = self.category_manager.get_category_id(self.selected_tab, self.selected_category)
-            self.load_publications_for_category(category_id, self.selected_tab)
+            self.load_publications_for_category(self.selected_category_id, self.selected_tab)
 
     def update_add_publication_button_state(self):
         """Aktualizuje stav tlačítka 'Přidat publikaci' na základě výběru v stromu."""
@@ -8697,16 +12490,18 @@ class MainWindow(QMainWindow):
             item = selected_items[0]
             # Uložení vybrané kategorie a záložky
             self.selected_category = item.text(0)
+            self.selected_category_id = item.data(0, Qt.UserRole)
             self.selected_tab = self.tabs.get_current_category_type()
             self.add_publication_button.setEnabled(True)
 
             # Načtení publikací pro vybranou kategorii/podkategorii
-            category_id = self.category_manager.get_category_id(self.selected_tab, self.selected_category)
-            self.load_publications_for_category(category_id, self.selected_tab)
+            self.load_publications_for_category(self.selected_category_id, self.selected_tab)
         else:
             self.selected_category = None
+            self.selected_category_id = None
             self.selected_tab = None
             self.add_publication_button.setEnabled(False)
+            DataService.instance().cancel((id(self), 'publications'))
             self.publications_model.clear()
             
     def open_search_results_window(self, results, search_type):
@@ -8846,70 +12641,63 @@ class MainWindow(QMainWindow):
                 elif tab_name == "Nastavení":
                     self.show_settings_content()
 
+    def move_category_item(self, category_type, category_id, parent_id, index):
+        """
+        Přesune kategorii ve stromu levého okna na místě (bez nového načtení),
+        pokud je zobrazena záložka daného typu.
+        """
+        if self.tabs.get_current_category_type() != category_type:
+            return
+        items = {}
+        iterator = QTreeWidgetItemIterator(self.publications_tree)
+        while iterator.value():
+            items[iterator.value().data(0, Qt.UserRole)] = iterator.value()
+            iterator += 1
+        item = items.get(category_id)
+        parent = self.publications_tree.invisibleRootItem() if parent_id is None else items.get(parent_id)
+        if item is None or parent is None:
+            # Strom neodpovídá databázi, načte se znovu
+            self.load_categories_for_current_tab(category_type)
+            return
+        was_current = self.publications_tree.currentItem() is item
+        old_parent = item.parent() or self.publications_tree.invisibleRootItem()
+        old_parent.removeChild(item)
+        parent.insertChild(min(index, parent.childCount()), item)
+        if was_current:
+            self.publications_tree.setCurrentItem(item)
+
     def load_categories_for_current_tab(self, category_type):
-        """Načte kategorie pro aktuální záložku do levého okna"""
+        """Načte kategorie pro aktuální záložku do levého okna (na pozadí)"""
         self.publications_tree.clear()
-        
-        conn = sqlite3.connect('categories.db')
-        cursor = conn.cursor()
-        
-        try:
-            # Načtení hlavních kategorií seřazených podle sort_order
-            cursor.execute(f"""
-                SELECT id, name 
-                FROM {category_type}_categories 
-                WHERE parent_id IS NULL 
-                ORDER BY sort_order
-            """)
-            
-            categories = cursor.fetchall()
-            
-            for cat_id, cat_name in categories:
-                category_item = QTreeWidgetItem([cat_name])
-                category_item.setData(0, Qt.UserRole, cat_id)
-                self.publications_tree.addTopLevelItem(category_item)
-                
-                # Načtení podkategorií seřazených podle sort_order
-                cursor.execute(f"""
-                    SELECT id, name 
-                    FROM {category_type}_categories 
-                    WHERE parent_id = ? 
-                    ORDER BY sort_order
-                """, (cat_id,))
-                
-                subcategories = cursor.fetchall()
-                
-                for sub_id, sub_name in subcategories:
-                    subcategory_item = QTreeWidgetItem([sub_name])
-                    subcategory_item.setData(0, Qt.UserRole, sub_id)
-                    category_item.addChild(subcategory_item)
-                
-                # Automatické rozbalení pokud je nastaveno
-                if self.settings_manager.get_setting('ui', 'navigation', 'auto_expand_categories', default=False):
-                    category_item.setExpanded(True)
-            
-        except Exception as e:
-            print(f"Chyba při načítání kategorií: {e}")
-        finally:
-            conn.close()
+        placeholder = QTreeWidgetItem(self.publications_tree, ["Načítání..."])
+        placeholder.setFlags(Qt.NoItemFlags)
+
+        # Celý strom jedním dotazem
+        DataService.instance().submit(
+            self.category_manager.load_category_tree, category_type,
+            key=(id(self), 'categories'),
+            owner=self,
+            on_result=lambda rows: self.show_categories(category_type, rows),
+            on_error=lambda message: self.show_categories(category_type, [])
+        )
+
+    def show_categories(self, category_type, rows):
+        """Zobrazí strom kategorií načtený na pozadí, automaticky se rozbalí hlavní kategorie"""
+        auto_expand = self.settings_manager.get_setting('ui', 'navigation', 'auto_expand_categories', default=False)
+        build_category_tree(self.publications_tree, rows, expand_depth=0 if auto_expand else -1)
 
         # Obnovení poslední vybrané kategorie pokud je nastaveno
         if self.settings_manager.get_setting('ui', 'navigation', 'remember_last_category', default=False):
             last_category = self.settings_manager.get_setting('ui', 'navigation', f'last_category_{category_type}')
             if last_category:
-                # Projdeme všechny položky a najdeme odpovídající
-                for i in range(self.publications_tree.topLevelItemCount()):
-                    top_item = self.publications_tree.topLevelItem(i)
-                    if top_item.text(0) == last_category:
-                        self.publications_tree.setCurrentItem(top_item)
-                        break
-                    # Kontrola podkategorií
-                    for j in range(top_item.childCount()):
-                        child_item = top_item.child(j)
-                        if child_item.text(0) == last_category:
-                            top_item.setExpanded(True)
-                            self.publications_tree.setCurrentItem(child_item)
-                            break
+                # Kategorie se hledá v celém stromu, nadřazené úrovně se rozbalí
+                found = self.publications_tree.findItems(last_category, Qt.MatchExactly | Qt.MatchRecursive)
+                if found:
+                    parent = found[0].parent()
+                    while parent is not None:
+                        parent.setExpanded(True)
+                        parent = parent.parent()
+                    self.publications_tree.setCurrentItem(found[0])
                 
     def show_standard_content(self):
         """Zobrazí standardní obsah pro knihy, časopisy atd."""
@@ -8960,6 +12748,14 @@ class MainWindow(QMainWindow):
             
             self.search_results_widget.result_double_clicked.connect(self.open_publication_details)
             self.search_widget.search_results.connect(self.search_results_widget.show_results)
+            self.search_widget.results_started.connect(self.search_results_widget.begin_results)
+            self.search_widget.results_appended.connect(self.search_results_widget.append_results)
+            self.search_widget.results_finished.connect(self.search_results_widget.finish_results)
+            self.search_widget.results_ranked.connect(self.search_results_widget.apply_ranking)
+
+            # Indexace na pozadí ustoupí interaktivnímu vyhledávání
+            self.search_widget.search_started.connect(self.background_indexer.pause)
+            self.search_widget.search_completed.connect(self.background_indexer.resume)
             self.search_widget.search_results_widget = self.search_results_widget
             
             # Vytvoření informačního labelu pro externí okno
@@ -9105,6 +12901,42 @@ class MainWindow(QMainWindow):
             matches = text.lower() in item.full_title.lower()
             self.publications_view.setRowHidden(row, not matches)
             
+    def update_index_status(self, done, total):
+        """Zobrazí průběh indexace na pozadí"""
+        if total and done < total:
+            self.index_status_label.setText(f"Indexace PDF: {done}/{total}")
+            self.index_status_label.show()
+        else:
+            self.index_status_label.hide()
+
+    def suspend_background_work(self):
+        """
+        Zastaví vlákna pracující s databází (indexer, vyhledávání, DataService,
+        sestavení slovníku), aby šlo soubory databází zkopírovat nebo vyměnit.
+        Po dokončení se volá resume_background_work.
+        """
+        self.background_indexer.stop()
+        if hasattr(self, 'search_widget'):
+            self.search_widget.stop_workers(5000)
+        if not self.background_indexer.wait(5000):
+            raise RuntimeError("Indexaci na pozadí se nepodařilo zastavit")
+        if not DataService.instance().wait(5000):
+            raise RuntimeError("Načítání dat na pozadí se nepodařilo dokončit")
+        FuzzyVocabulary.wait_for_refresh()
+
+    def resume_background_work(self):
+        """Obnoví práci na pozadí zastavenou suspend_background_work"""
+        self.background_indexer.restart()
+
+    def closeEvent(self, event):
+        """Před zavřením okna ukončí indexer, vyhledávání a načítání dat na pozadí"""
+        self.background_indexer.stop()
+        if hasattr(self, 'search_widget'):
+            self.search_widget.stop_workers(3000)
+        self.background_indexer.wait(3000)
+        DataService.instance().shutdown()
+        super().closeEvent(event)
+
     def show_initial_tab(self):
         """Zobrazí výchozí záložku při startu aplikace"""
         default_tab = self.settings_manager.get_setting('ui', 'default_tab')
@@ -9187,6 +13019,9 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == "__main__":
+    # Nutné pro procesy zpracovávající PDF ve zkompilované verzi
+    multiprocessing.freeze_support()
+
     current_dir = os.path.dirname(os.path.abspath(__file__))
     icons_dir = os.path.join(current_dir, 'icons')
     